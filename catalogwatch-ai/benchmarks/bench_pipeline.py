@@ -0,0 +1,168 @@
+"""Time every ingest and scoring stage on a synthetic catalog.
+
+Each stage is run on the output of the previous one and reports wall time and
+rows/sec. With `--memory` it also reports the peak heap allocation during each
+stage (tracemalloc, which numpy and pandas report to); tracing slows the
+Python-heavy stages several-fold, so compare timings only between runs with
+the same setting. The scalar per-record functions are timed on a sample of
+`--scalar-rows` rows. Results are written as JSON together with the git commit
+and library versions; pass `--compare` an earlier result file to print
+per-stage speedups.
+
+Usage:
+    python benchmarks/bench_pipeline.py --rows 1000000 --output results/pipeline.json
+    python benchmarks/bench_pipeline.py --rows 1000000 --compare results/pipeline.json
+    python benchmarks/bench_pipeline.py --rows 100000 --memory --output results/pipeline_mem.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import numpy as np
+import pandas as pd
+
+from synthetic import write_catalog_csv
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.eligibility.rules import classify_years_batch, explain_classification, years_since_release_batch
+from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+from catalogwatch.modeling.explainability import compute_contributions_batch
+from catalogwatch.modeling.feature_matrix import FeatureMatrix
+from catalogwatch.modeling.features import features_from_columns
+from catalogwatch.modeling.scoring import simple_score_batch
+from catalogwatch.nlp.cache import NoteCache
+from catalogwatch.nlp.parser import KEYWORDS, parse_ownership_notes, parse_ownership_notes_batch
+from catalogwatch.pipeline import annotate_frame
+from catalogwatch.registry import current_rules
+from catalogwatch.services.store import write_dataset
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_stage(results: List[Dict[str, Any]], name: str, rows: int, fn: Callable[[], Any], trace: bool = False) -> Any:
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    if trace:
+        tracemalloc.stop()
+    results.append({
+        "stage": name,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_mb": round(peak / 2**20, 1) if trace else None,
+    })
+    print(f"{name:<34} {seconds:>9.3f}s {rows / seconds if seconds > 0 else 0:>14,.0f} rows/s"
+          + (f" {peak / 2**20:>9.1f} MB" if trace else ""))
+    return out
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as fh:
+        baseline = {s["stage"]: s for s in json.load(fh)["stages"]}
+    print(f"\nvs {baseline_path}")
+    print(f"{'stage':<34} {'before':>9} {'after':>9} {'speedup':>8}")
+    for stage in results:
+        before = baseline.get(stage["stage"])
+        if before is None:
+            continue
+        ratio = before["seconds"] / stage["seconds"] if stage["seconds"] else float("inf")
+        print(f"{stage['stage']:<34} {before['seconds']:>8.3f}s {stage['seconds']:>8.3f}s {ratio:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scalar-rows", type=int, default=20_000)
+    parser.add_argument("--memory", action="store_true", help="record per-stage peak allocation (slower)")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+    trace = args.memory
+
+    windows = load_windows(os.path.join(ROOT, "configs", "eligibility_windows.yml"))
+    n = args.rows
+    stages: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_catalog_csv(os.path.join(tmp, "catalog.csv"), n, seed=args.seed)
+
+        raw = run_stage(stages, "load_csv", n, lambda: load_csv(csv_path), trace)
+        df = run_stage(stages, "canonicalize", n, lambda: canonicalize(raw), trace)
+
+        def eligibility():
+            years = years_since_release_batch(pd.to_numeric(df["release_year"]).to_numpy(dtype=float, na_value=np.nan))
+            return years, classify_years_batch(years, windows)
+
+        years, _ = run_stage(stages, "eligibility (batch)", n, eligibility, trace)
+        nlp = run_stage(stages, "parse_notes (batch)", n, lambda: parse_ownership_notes_batch(df["ownership_notes"]), trace)
+        note_cache = NoteCache(current_rules().keywords_version)
+        for label in ("parse_notes (cold cache)", "parse_notes (warm cache)"):
+            run_stage(stages, label, n, lambda: parse_ownership_notes_batch(df["ownership_notes"], cache=note_cache), trace)
+
+        def featurize():
+            years_col = pd.Series(years, index=df.index).round().astype("Int64")
+            return FeatureMatrix.from_features(features_from_columns(years_col, nlp[list(KEYWORDS)]))
+
+        feats = run_stage(stages, "featurize", n, featurize, trace)
+        run_stage(stages, "score", n, lambda: simple_score_batch(feats), trace)
+        run_stage(stages, "contributions", n, lambda: compute_contributions_batch(feats, index=df.index), trace)
+        adf = run_stage(stages, "annotate_frame (end to end)", n, lambda: annotate_frame(df, windows), trace)
+        run_stage(stages, "write_dataset (parquet)", n, lambda: write_dataset(adf, "bench", path=tmp), trace)
+
+        sample = df.head(args.scalar_rows)
+        m = len(sample)
+        sample_years = [None if pd.isna(y) else int(y) for y in sample["release_year"]]
+        sample_notes = sample["ownership_notes"].tolist()
+        run_stage(stages, "explain_classification (scalar)", m,
+                  lambda: [explain_classification(y, None, windows) for y in sample_years], trace)
+        run_stage(stages, "parse_ownership_notes (scalar)", m,
+                  lambda: [parse_ownership_notes(t) for t in sample_notes], trace)
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "rows": n,
+            "seed": args.seed,
+            "tracemalloc": trace,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "stages": stages,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+    if args.compare:
+        compare(stages, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark `NNScorer` training and inference against `simple_score_batch`.
+
+The model is trained to reproduce the configured composite score on synthetic
+features, then both scorers are timed over the same matrix.
+
+Usage:
+    python benchmarks/bench_scorer.py --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import numpy as np
+
+from catalogwatch.modeling.engine import FEATURE_COLUMNS
+from catalogwatch.modeling.scoring import NNScorer, simple_score_batch
+
+
+def make_features(rows: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, len(FEATURE_COLUMNS)))
+    X[:, 0] = np.where(rng.random(rows) < 0.05, -1, rng.integers(0, 70, size=rows))
+    X[:, 1:] = rng.random((rows, len(FEATURE_COLUMNS) - 1)) < 0.3
+    return X
+
+
+def best_of(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--train-rows", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    X_train = make_features(args.train_rows, seed=1)
+    y_train = simple_score_batch(X_train)
+    t0 = time.perf_counter()
+    model = NNScorer().fit(X_train, y_train)
+    t_fit = time.perf_counter() - t0
+
+    X = make_features(args.rows)
+    t_simple = best_of(lambda: simple_score_batch(X), args.repeats)
+    t_nn = best_of(lambda: model.predict(X), args.repeats)
+    single = X[:1]
+    t_one = best_of(lambda: model.predict(single), 100)
+
+    mae = float(np.abs(model.predict(X) - simple_score_batch(X)).mean())
+    print(f"rows:               {args.rows}")
+    print(f"fit:                {t_fit:8.2f}s ({len(model.history['val_loss'])} epochs on {args.train_rows} rows)")
+    print(f"simple_score_batch: {t_simple:8.3f}s ({args.rows / t_simple:,.0f} rows/s)")
+    print(f"NNScorer.predict:   {t_nn:8.3f}s ({args.rows / t_nn:,.0f} rows/s)")
+    print(f"single-row predict: {t_one * 1e6:8.1f}us")
+    print(f"mean abs error vs simple_score: {mae:.4f}")
+
+
+if __name__ == "__main__":
+    main()
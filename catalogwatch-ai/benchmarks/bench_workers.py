@@ -0,0 +1,57 @@
+"""Measure `catalogwatch ingest --workers N` scaling on a synthetic catalog.
+
+Usage:
+    python benchmarks/bench_workers.py --rows 1000000 --workers 1 2 4 8 --output workers.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from synthetic import write_catalog_csv
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.ingest.csv_loader import iter_csv_chunks
+from catalogwatch.pipeline import annotate_chunks
+from catalogwatch.services.store import ParquetChunkWriter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    windows = load_windows(os.path.join(ROOT, "configs", "eligibility_windows.yml"))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_catalog_csv(os.path.join(tmp, "catalog.csv"), args.rows)
+
+        for workers in args.workers:
+            started = time.perf_counter()
+            with ParquetChunkWriter(f"out_{workers}", path=tmp) as writer:
+                for annotated in annotate_chunks(iter_csv_chunks(csv_path, args.chunksize), windows, workers=workers):
+                    writer.write(annotated)
+            elapsed = time.perf_counter() - started
+            results.append({"workers": workers, "rows": args.rows, "seconds": elapsed, "rows_per_sec": args.rows / elapsed})
+
+    base = results[0]["seconds"]
+    print(f"{'workers':>7} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['seconds']:>9.2f} {r['rows_per_sec']:>12,.0f} {base / r['seconds']:>7.2f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"cpu_count": os.cpu_count(), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Seeded synthetic catalog generator for benchmarks.
+
+Produces catalogs in the input CSV schema with a skewed release-year
+distribution (mostly recent releases, a long tail back to the 1950s), weighted
+territories and rights holders, and `ownership_notes` assembled from 1-3
+contract phrases of the kind seen in real notes. About 1% of release years and
+4% of notes are missing. The same `(rows, seed)` always gives the same data.
+
+Usage:
+    python benchmarks/synthetic.py --rows 10000000 --output catalog_10m.csv
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+
+TERRITORIES = ["US", "WW", "UK", "CA", "DE", "FR", "JP", "AU", "BR", "SE", "NL", "MX"]
+TERRITORY_WEIGHTS = [0.38, 0.14, 0.1, 0.06, 0.06, 0.05, 0.05, 0.04, 0.03, 0.03, 0.03, 0.03]
+
+HOLDERS = [
+    "BigLabel US", "Global Music Group", "Harbor Records", "SmallLabel", "LegacyRecords",
+    "NewLabel", "Northern Sound", "Blue Room Publishing", "Indie Collective", "Artist (self)",
+    "Catalog Partners LLC", "Crescent Rights", "Meridian Audio", "Old Town Masters",
+]
+HOLDER_WEIGHTS = np.array([12, 10, 7, 6, 6, 5, 5, 4, 4, 4, 3, 3, 2, 2], dtype=float)
+
+# `{y}` is replaced with a year and `{h}` with a rights holder
+PHRASES = [
+    "Reverted to artist in {y}",
+    "rights reverted {y} per clause 14",
+    "reversion requested {y}; awaiting response",
+    "termination notice served {y}",
+    "Exclusive license to {h} until {y}",
+    "exclusive rights held by {h}",
+    "sole license granted for territory",
+    "Artist-owned masters",
+    "artist owned since {y}",
+    "self-released on indie label",
+    "Self released; distributed by {h}",
+    "Legacy contract; ambiguous language about reversion",
+    "legacy agreement with {h}",
+    "disputed ownership between {h} and estate",
+    "rights unclear after {h} acquisition",
+    "distribution deal renewed annually",
+    "publishing administered by {h}",
+    "work for hire per {y} agreement",
+    "co-owned with producer",
+    "no notes on file",
+]
+
+_SYLLABLES = ["ka", "lo", "mi", "ra", "ven", "tor", "sa", "el", "dan", "ri", "mo", "che", "ly", "bre", "na", "jo"]
+
+
+def _phrase_pool(rng: np.random.Generator, variants: int = 40) -> np.ndarray:
+    pool = []
+    for template in PHRASES:
+        for _ in range(variants if "{" in template else 1):
+            pool.append(template.format(y=int(rng.integers(1965, 2025)), h=rng.choice(HOLDERS)))
+    return np.array(pool, dtype=object)
+
+
+def _names(rng: np.random.Generator, n: int, words: int) -> np.ndarray:
+    out = np.full(n, "", dtype=object)
+    for w in range(words):
+        parts = rng.choice(_SYLLABLES, size=(n, 2))
+        word = np.char.capitalize(np.char.add(parts[:, 0].astype(str), parts[:, 1].astype(str))).astype(object)
+        out = word if w == 0 else out + " " + word
+    return out
+
+
+def make_catalog(rows: int, seed: int = 0, start_id: int = 0) -> pd.DataFrame:
+    """Return `rows` synthetic catalog rows in the input CSV schema."""
+    rng = np.random.default_rng([seed, start_id])
+
+    # 70% recent (1990-2024), 30% older tail (1955-1990)
+    recent = rng.random(rows) < 0.7
+    years = np.where(
+        recent,
+        rng.triangular(1990, 2024, 2024, size=rows),
+        rng.uniform(1955, 1990, size=rows),
+    ).round().astype(float)
+    years[rng.random(rows) < 0.01] = np.nan
+
+    pool = _phrase_pool(rng)
+    counts = rng.choice([1, 2, 3], p=[0.45, 0.4, 0.15], size=rows)
+    picks = rng.integers(0, len(pool), size=(rows, 3))
+    notes = pool[picks[:, 0]].copy()
+    for k in (1, 2):
+        more = counts > k
+        notes[more] = notes[more] + "; " + pool[picks[more, k]]
+    notes[rng.random(rows) < 0.04] = None
+
+    return pd.DataFrame({
+        "catalog_id": [f"CAT-{i:09d}" for i in range(start_id, start_id + rows)],
+        "artist_name": _names(rng, rows, 2),
+        "track_title": _names(rng, rows, 3),
+        "release_year": pd.array(years, dtype="Float64").astype("Int64"),
+        "rights_holder": rng.choice(HOLDERS, size=rows, p=HOLDER_WEIGHTS / HOLDER_WEIGHTS.sum()),
+        "territory": rng.choice(TERRITORIES, size=rows, p=TERRITORY_WEIGHTS),
+        "ownership_notes": notes,
+    })
+
+
+def iter_catalog(rows: int, seed: int = 0, chunk_rows: int = 500_000) -> Iterator[pd.DataFrame]:
+    """Yield the catalog in chunks so very large catalogs never sit in memory at once."""
+    for start in range(0, rows, chunk_rows):
+        yield make_catalog(min(chunk_rows, rows - start), seed=seed, start_id=start)
+
+
+def write_catalog_csv(path: str, rows: int, seed: int = 0, chunk_rows: int = 500_000) -> str:
+    """Write a synthetic catalog CSV chunk by chunk and return its path."""
+    for i, chunk in enumerate(iter_catalog(rows, seed, chunk_rows)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    write_catalog_csv(args.output, args.rows, args.seed)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
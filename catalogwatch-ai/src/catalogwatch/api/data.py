@@ -0,0 +1,210 @@
+"""Cached data layer for the Streamlit dashboard.
+
+Streamlit re-executes the whole script on every widget interaction. The
+functions here make those reruns cheap: the annotated catalog is built once
+per (CSV content hash, windows-config hash, config registry version, as-of
+year) and shared read-only through `st.cache_resource`, so edits to the
+windows, keywords or scoring files are picked up on the next rerun, and detail lookups go through a hash index on
+`catalog_id` instead of a boolean scan of the frame. Similar-contract lookups
+use a note embedding index built on first use, and eligibility forecasts are
+kept for the most recently used year ranges.
+
+An already-ingested dataset can be browsed instead (`get_stored_catalog`): its
+Arrow copy is memory-mapped and shared by every session and worker process
+through the OS page cache, whole columns are converted to pandas only when a
+filter or index needs them (once per process), and rows only for the slice
+being shown or exported. Similar-contract lookups use the note index ingest
+saved next to the dataset (memory-mapped as well) instead of rebuilding it. Per-session memory is then the filter mask and the
+visible rows, whatever the catalog size.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from catalogwatch.api.query import IdSearch
+from catalogwatch.eligibility.classifier import get_classifier
+from catalogwatch.eligibility.forecast import Forecast, forecast
+from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+from catalogwatch.nlp.ann import IVFIndex, build_note_index, load_note_index
+from catalogwatch.nlp.parser import parse_ownership_notes
+from catalogwatch.pipeline import annotate_frame
+from catalogwatch.registry import current_rules, load_file, parse_windows
+from catalogwatch.services.export import ensure_arrow_copy
+from catalogwatch.services.mapped import MappedFrame, open_mapped
+
+
+# year ranges whose forecast a catalog keeps (about one per slider position in use)
+MAX_FORECASTS = 16
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+class AnnotatedCatalog:
+    """An annotated frame plus an O(1) `catalog_id` index.
+
+    `frame` is a DataFrame or a `MappedFrame` over a stored dataset. Pass
+    `note_index` to use an existing note index; otherwise one is built on
+    first use. Instances are shared between reruns and sessions, so the frame
+    must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        windows: Optional[Dict[str, Any]] = None,
+        note_index: Optional[IVFIndex] = None,
+    ):
+        self.frame = frame
+        self.windows = windows
+        ids = frame["catalog_id"]
+        first = ~ids.duplicated(keep="first").to_numpy()
+        # positions of the first row for each catalog_id
+        self._index = pd.Index(ids[first])
+        self._positions = np.flatnonzero(first)
+        self._evidence: Dict[Optional[str], List[str]] = {}
+        self._window_counts: Optional[pd.DataFrame] = None
+        self._id_search: Optional[IdSearch] = None
+        self._note_index = note_index
+        self._forecasts: "OrderedDict[tuple, Forecast]" = OrderedDict()
+        self._forecasts_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def row(self, catalog_id: str) -> pd.Series:
+        """Return the annotated row for `catalog_id` (first one if duplicated)."""
+        return self.frame.iloc[self._positions[self._index.get_loc(catalog_id)]]
+
+    def window_counts(self) -> pd.DataFrame:
+        """Non-empty eligibility windows with their row counts, computed once.
+
+        Windows are listed in config order when the catalog has a windows
+        config; stored datasets come back with them in partition path order.
+        """
+        if self._window_counts is None:
+            counts = self.frame["eligibility_window"].value_counts(sort=False)
+            counts = counts[counts > 0]
+            if self.windows is not None:
+                rank = {label: i for i, label in enumerate(get_classifier(self.windows).labels)}
+                counts = counts.iloc[np.argsort([rank.get(w, len(rank)) for w in counts.index], kind="stable")]
+            counts = counts.reset_index()
+            counts.columns = ["window", "count"]
+            self._window_counts = counts
+        return self._window_counts
+
+    def search_ids(self, query: str, limit: int = 50) -> List[str]:
+        """Prefix search over catalog ids; the sorted index is built on first use."""
+        if self._id_search is None:
+            self._id_search = IdSearch(self.frame["catalog_id"])
+        return self._id_search.search(query, limit)
+
+    def similar(self, catalog_id: str, k: int = 5) -> pd.DataFrame:
+        """Up to `k` other catalogs with the most similar ownership notes.
+
+        Returns their rows with a `similarity` column, most similar first; empty
+        if the catalog has no notes. Without a given index one is built on
+        first use.
+        """
+        if self._note_index is None:
+            self._note_index = build_note_index(self.frame["catalog_id"], self.frame["ownership_notes"])
+        try:
+            hits = self._note_index.top_k_similar(str(catalog_id), k)
+        except KeyError:
+            hits = []
+        ids = [item_id for item_id, _ in hits]
+        rows = self.frame.iloc[self._positions[self._index.get_indexer(ids)]] if ids else self.frame.iloc[:0]
+        return rows.assign(similarity=[score for _, score in hits])
+
+    def forecast(self, start_year: int, end_year: int) -> Forecast:
+        """Eligibility windows projected over `[start_year, end_year]`.
+
+        The last `MAX_FORECASTS` ranges are kept, shared by every session.
+        """
+        if self.windows is None:
+            raise ValueError("catalog was built without a windows config")
+        key = (start_year, end_year)
+        with self._forecasts_lock:
+            cached = self._forecasts.get(key)
+            if cached is not None:
+                self._forecasts.move_to_end(key)
+                return cached
+        result = forecast(self.frame["release_year"], start_year, end_year, self.windows, ids=self.frame["catalog_id"])
+        with self._forecasts_lock:
+            self._forecasts[key] = result
+            while len(self._forecasts) > MAX_FORECASTS:
+                self._forecasts.popitem(last=False)
+        return result
+
+    def evidence(self, catalog_id: str) -> List[str]:
+        """Evidence patterns for the catalog's notes, parsed at most once per distinct note."""
+        notes = self.row(catalog_id).get("ownership_notes")
+        key = notes if isinstance(notes, str) else None
+        if key not in self._evidence:
+            self._evidence[key] = parse_ownership_notes(notes)["evidence"]
+        return self._evidence[key]
+
+
+def build_catalog(data: bytes, windows: Dict[str, Any], current_year: Optional[int] = None) -> AnnotatedCatalog:
+    """Parse, canonicalize and annotate CSV bytes. Uncached; see `load_catalog`."""
+    df = canonicalize(load_csv(io.BytesIO(data)))
+    return AnnotatedCatalog(annotate_frame(df, windows, current_year), windows)
+
+
+@st.cache_resource(show_spinner="Annotating catalog…", max_entries=4)
+def load_catalog(
+    content_key: str, windows_key: str, rules_version: str, current_year: int, _data: bytes, _windows: Dict[str, Any]
+) -> AnnotatedCatalog:
+    """Annotated catalog cached on content and config hashes.
+
+    Arguments starting with an underscore are not hashed by Streamlit; the keys
+    stand in for them.
+    """
+    return build_catalog(_data, _windows, current_year)
+
+
+def get_catalog(data: bytes, windows_path: str) -> AnnotatedCatalog:
+    """Return the cached annotated catalog for CSV `data` and the windows file."""
+    windows, windows_key = load_file(windows_path, parse_windows)
+    rules = current_rules()
+    return load_catalog(content_hash(data), windows_key, rules.version, datetime.date.today().year, data, windows)
+
+
+def build_stored_catalog(path: str, windows: Optional[Dict[str, Any]] = None) -> AnnotatedCatalog:
+    """Catalog over the memory-mapped Arrow copy of the stored dataset at `path`. Uncached.
+
+    Uses the note index saved next to the dataset when there is one.
+    """
+    frame = MappedFrame(open_mapped(ensure_arrow_copy(path)))
+    root, name = os.path.split(os.path.splitext(os.path.normpath(path))[0])
+    return AnnotatedCatalog(frame, windows, note_index=load_note_index(name, root))
+
+
+@st.cache_resource(show_spinner="Mapping stored catalog…", max_entries=2)
+def load_stored_catalog(copy_key: str, windows_key: str, _path: str, _windows: Dict[str, Any]) -> AnnotatedCatalog:
+    """Stored catalog cached on the Arrow copy's path and stamp and the windows hash."""
+    return build_stored_catalog(_path, _windows)
+
+
+def get_stored_catalog(path: str, windows_path: str) -> AnnotatedCatalog:
+    """Return the cached catalog for the stored dataset at `path`, refreshing its Arrow copy if stale."""
+    windows, windows_key = load_file(windows_path, parse_windows)
+    copy = ensure_arrow_copy(path)
+    st_ = os.stat(copy)
+    return load_stored_catalog(f"{copy}:{st_.st_mtime_ns}:{st_.st_size}", windows_key, path, windows)
@@ -0,0 +1,90 @@
+"""Server-side filtering, ranking and paging for the dashboard.
+
+Everything here works on positions into the shared annotated frame, so the
+browser only ever receives the slice it displays. Exports go through
+`services.export`.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch.pipeline import SIGNAL_COLUMNS
+
+
+def filter_mask(
+    frame: pd.DataFrame,
+    windows: Optional[Sequence[str]] = None,
+    territories: Optional[Sequence[str]] = None,
+    rights_holder: Optional[str] = None,
+    score_range: Optional[Tuple[float, float]] = None,
+    signals: Optional[Iterable[str]] = None,
+) -> np.ndarray:
+    """Boolean mask of rows matching every given filter.
+
+    Empty or None filters are ignored. `rights_holder` is a case-insensitive
+    substring match and `signals` lists signal names that must all be present.
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    if windows:
+        mask &= frame["eligibility_window"].isin(list(windows)).to_numpy()
+    if territories:
+        mask &= frame["territory"].isin(list(territories)).to_numpy()
+    if rights_holder:
+        holders = frame["rights_holder"].astype(str)
+        mask &= holders.str.contains(rights_holder, case=False, regex=False).to_numpy(dtype=bool)
+    if score_range is not None:
+        lo, hi = score_range
+        score = frame["score"].to_numpy(dtype=float)
+        mask &= (score >= lo) & (score <= hi)
+    for signal in signals or []:
+        mask &= frame[SIGNAL_COLUMNS[signal]].to_numpy(dtype=bool)
+    return mask
+
+
+def top_k(frame: pd.DataFrame, k: int = 10, by: str = "score", mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Return the `k` rows with the largest `by` values, largest first.
+
+    Uses `np.argpartition` so only the selected rows are sorted. Missing values
+    rank last.
+    """
+    positions = np.arange(len(frame)) if mask is None else np.flatnonzero(mask)
+    values = frame[by].to_numpy(dtype=float, na_value=np.nan)[positions]
+    values = np.where(np.isnan(values), -np.inf, values)
+    if k < len(positions):
+        chosen = np.argpartition(-values, k - 1)[:k]
+    else:
+        chosen = np.arange(len(positions))
+    chosen = chosen[np.argsort(-values[chosen], kind="stable")]
+    return frame.iloc[positions[chosen]]
+
+
+def page(frame: pd.DataFrame, mask: np.ndarray, number: int, size: int) -> Tuple[pd.DataFrame, int]:
+    """Return page `number` (0-based) of the rows selected by `mask` and the page count."""
+    positions = np.flatnonzero(mask)
+    pages = max(1, -(-len(positions) // size))
+    number = min(max(0, number), pages - 1)
+    return frame.iloc[positions[number * size:(number + 1) * size]], pages
+
+
+class IdSearch:
+    """Case-insensitive prefix search over catalog ids using a sorted array."""
+
+    def __init__(self, ids: pd.Series):
+        keys = ids.astype(str).str.casefold().to_numpy(dtype=object)
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = ids.astype(str).to_numpy(dtype=object)[order]
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """Return up to `limit` ids starting with `query`, in sorted order."""
+        q = query.strip().casefold()
+        start = np.searchsorted(self._keys, q, side="left")
+        out: List[str] = []
+        for i in range(start, min(start + limit, len(self._keys))):
+            if not self._keys[i].startswith(q):
+                break
+            out.append(self._ids[i])
+        return out
@@ -14,90 +14,173 @@ for p in (SRC_DIR, PROJECT_ROOT):
 import streamlit as st
 import pandas as pd
 import altair as alt
-import json
+import datetime
+import tempfile
+from typing import Callable
 
-from catalogwatch.ingest.csv_loader import load_csv, canonicalize
-from catalogwatch.eligibility.config import load_windows
-from catalogwatch.eligibility.rules import explain_classification
-from catalogwatch.nlp.parser import parse_ownership_notes
-from catalogwatch.modeling.features import feature_from_record
-from catalogwatch.modeling.scoring import simple_score
-from catalogwatch.modeling.explainability import compute_contributions
+from catalogwatch.api.data import get_catalog, get_stored_catalog, read_bytes
+from catalogwatch.api.query import filter_mask, top_k, page
+from catalogwatch.modeling.attribution import component_frame
+from catalogwatch.pipeline import SIGNAL_COLUMNS, signals_from_row, contributions_from_row
+from catalogwatch.services.export import FORMATS, MIME_TYPES, export_frame
 
 import os
 
 
 CFG_PATH = os.path.join("configs", "eligibility_windows.yml")
+STORE_PATH = os.path.join("data", "ingested", "canonical_catalogs")
 
 
-def main() -> None:
-    st.set_page_config(page_title="CatalogWatch AI — Demo", layout="wide")
-    st.title("CatalogWatch AI — Demo")
+def export_filtered(adf: pd.DataFrame, mask, fmt: str) -> bytes:
+    """The filtered rows exported in `fmt`; the temporary file is removed before returning."""
+    with tempfile.TemporaryDirectory(prefix="catalogwatch-export-") as tmp:
+        path = os.path.join(tmp, f"export.{fmt}")
+        export_frame(adf, path, fmt, mask)
+        with open(path, "rb") as fh:
+            return fh.read()
 
-    st.sidebar.header("Ingest")
-    sample = st.sidebar.checkbox("Load sample data", value=True)
 
-    if sample:
-        df = load_csv("data/samples/sample_catalogs.csv")
-    else:
-        uploaded = st.sidebar.file_uploader("Upload CSV", type=["csv"]) 
-        if uploaded is None:
-            st.info("Upload a CSV or check 'Load sample data' to proceed.")
-            return
-        df = pd.read_csv(uploaded)
+def _deferred_downloads() -> bool:
+    try:
+        from streamlit.runtime.media_file_manager import MediaFileManager
+    except ImportError:
+        return False
+    return hasattr(MediaFileManager, "add_deferred")
 
-    df = canonicalize(df)
 
-    windows = load_windows(CFG_PATH)
+# Streamlit builds callable download data only when the button is clicked
+DEFERRED_DOWNLOADS = _deferred_downloads()
 
-    # annotate
-    annotated = []
-    for _, row in df.iterrows():
-        release_year_val = int(row.release_year) if pd.notna(row.release_year) else None
-        expl = explain_classification(release_year_val, None, windows)
-        nlp = parse_ownership_notes(row.ownership_notes)
-        rec = dict(row)
-        rec.update(expl)
-        rec["ownership_signals"] = nlp.get("signals")
-        rec["ownership_confidence"] = nlp.get("confidence")
 
-        # features and score
-        feats = feature_from_record({
-            **rec,
-            "years_since_release": expl.get("years_since_release"),
-            "ownership_signals": nlp.get("signals"),
-        })
-        rec["features"] = feats
-        rec["score"] = simple_score(feats)
-        rec["explainability"] = compute_contributions(feats)
+def download_on_click(label: str, build: Callable[[], bytes], file_name: str, mime: str, key: str) -> None:
+    """Offer a download whose contents are built by `build` only when asked for.
 
-        annotated.append(rec)
+    `build` closes over the current filters, so a download always matches the
+    page it was clicked on and nothing is kept in session state between runs.
+    Streamlit serves download data from memory; the `catalogwatch export`
+    command streams large datasets to disk instead.
+    """
+    if DEFERRED_DOWNLOADS:
+        st.download_button(label, data=build, file_name=file_name, mime=mime, key=key)
+    elif st.button(label.replace("Download", "Prepare", 1), key=f"prepare_{key}"):
+        st.download_button(label, data=build(), file_name=file_name, mime=mime, key=key)
 
-    adf = pd.DataFrame(annotated)
+
+def main() -> None:
+    st.set_page_config(page_title="CatalogWatch AI — Demo", layout="wide")
+    st.title("CatalogWatch AI — Demo")
+
+    st.sidebar.header("Ingest")
+    source = st.sidebar.radio("Source", options=["Sample data", "Upload CSV", "Ingested dataset"])
+
+    if source == "Ingested dataset":
+        store_path = st.sidebar.text_input("Dataset path", value=STORE_PATH)
+        if not os.path.exists(store_path):
+            st.info("No ingested dataset at that path; run `catalogwatch ingest` first.")
+            return
+        # memory-mapped and shared by all sessions; rows are converted per visible slice
+        catalog = get_stored_catalog(store_path, CFG_PATH)
+    else:
+        if source == "Sample data":
+            data = read_bytes("data/samples/sample_catalogs.csv")
+        else:
+            uploaded = st.sidebar.file_uploader("Upload CSV", type=["csv"])
+            if uploaded is None:
+                st.info("Upload a CSV or pick 'Sample data' to proceed.")
+                return
+            data = uploaded.getvalue()
+        # annotated once per CSV content + windows config; reruns reuse it
+        catalog = get_catalog(data, CFG_PATH)
+    adf = catalog.frame
+
+    st.sidebar.header("Filters")
+    window_opts = catalog.window_counts()["window"].tolist()
+    sel_windows = st.sidebar.multiselect("Eligibility window", options=window_opts)
+    territory_opts = sorted(adf["territory"].dropna().astype(str).unique().tolist())
+    sel_territories = st.sidebar.multiselect("Territory", options=territory_opts)
+    holder_query = st.sidebar.text_input("Rights holder contains")
+    score_range = st.sidebar.slider("Score range", 0.0, 1.0, (0.0, 1.0), step=0.05)
+    sel_signals = st.sidebar.multiselect("Required signals", options=list(SIGNAL_COLUMNS))
+    mask = filter_mask(
+        adf,
+        windows=sel_windows,
+        territories=sel_territories,
+        rights_holder=holder_query,
+        score_range=score_range,
+        signals=sel_signals,
+    )
 
     st.header("Overview")
-    st.metric("Total catalogs", len(adf))
+    c1, c2 = st.columns(2)
+    c1.metric("Total catalogs", len(adf))
+    c2.metric("Matching filters", int(mask.sum()))
 
     st.subheader("Eligibility distribution")
-    dist = adf["eligibility_window"].value_counts().reset_index()
-    dist.columns = ["window", "count"]
+    dist = catalog.window_counts()
     st.bar_chart(dist.set_index("window"))
 
+    st.subheader("Eligibility forecast")
+    this_year = datetime.date.today().year
+    span = st.slider("As-of years", this_year, this_year + 30, (this_year, this_year + 10))
+    fc = catalog.forecast(*span)
+    timeline = fc.timeline()
+    metric = st.radio("Show", options=["count", "entering"], horizontal=True,
+                      format_func=lambda m: "Catalogs in window" if m == "count" else "Catalogs entering window")
+    st.altair_chart(
+        alt.Chart(timeline)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("year:O", title="As-of year"),
+            y=alt.Y(f"{metric}:Q", title="Catalogs"),
+            color=alt.Color("window:N", sort=fc.counts.index.tolist(), title="Window"),
+            tooltip=["year", "window", "count", "entering"],
+        ),
+        use_container_width=True,
+    )
+    st.caption("Catalogs entering each window per year")
+    st.dataframe(fc.entries)
+
+    table_cols = ["catalog_id", "artist_name", "track_title", "release_year", "eligibility_window", "ownership_confidence", "score"]
+
     st.subheader("Top catalogs approaching eligibility")
-    # sort by years_since_release desc
-    top = adf.sort_values(by="years_since_release", ascending=False).head(10)
-    st.dataframe(top[["catalog_id", "artist_name", "track_title", "release_year", "eligibility_window", "ownership_confidence", "score"]])
+    rank_by = st.radio("Rank by", options=["years_since_release", "score"], horizontal=True)
+    k = int(st.number_input("How many", min_value=1, max_value=1000, value=10))
+    top = top_k(adf, k=k, by=rank_by, mask=mask)
+    st.dataframe(top[table_cols])
+
+    st.subheader("Filtered catalogs")
+    page_size = int(st.selectbox("Rows per page", options=[25, 50, 100, 500], index=1))
+    page_no = int(st.number_input("Page", min_value=1, value=1)) - 1
+    rows, pages = page(adf, mask, page_no, page_size)
+    st.caption(f"Page {min(page_no, pages - 1) + 1} of {pages}")
+    st.dataframe(rows[table_cols])
+
+    export_fmt = st.selectbox("Export format", options=list(FORMATS), index=FORMATS.index("csv"))
+    download_on_click(
+        f"Download filtered catalogs ({export_fmt}, {int(mask.sum())} rows)",
+        lambda: export_filtered(adf, mask, export_fmt),
+        file_name=f"catalogwatch_filtered.{export_fmt}",
+        mime=MIME_TYPES[export_fmt],
+        key="export_filtered",
+    )
+    if source == "Ingested dataset":
+        st.caption("For large exports run `catalogwatch export`, which streams the stored dataset to a file.")
 
     st.subheader("Catalog detail")
-    sel = st.selectbox("Select catalog", options=adf["catalog_id"].tolist())
-    detail = adf[adf["catalog_id"] == sel].iloc[0]
+    query = st.text_input("Search catalog ID", help="Prefix match; leave empty to pick from the top list")
+    options = catalog.search_ids(query) if query else top["catalog_id"].tolist()
+    if not options:
+        st.info("No catalog IDs match that search.")
+        return
+    sel = st.selectbox("Select catalog", options=options)
+    detail = catalog.row(sel)
     detail_obj = {
         "catalog_id": detail["catalog_id"],
         "artist_name": detail["artist_name"],
         "track_title": detail["track_title"],
         "release_year": int(detail["release_year"]) if pd.notna(detail["release_year"]) else None,
         "eligibility_window": detail.get("eligibility_window"),
-        "ownership_signals": detail.get("ownership_signals"),
+        "ownership_signals": signals_from_row(detail),
         "ownership_confidence": detail.get("ownership_confidence"),
         "score": detail.get("score"),
     }
@@ -108,20 +191,20 @@ def main() -> None:
     st.markdown("**Ownership notes & evidence**")
     st.write(detail.get("ownership_notes"))
     st.markdown("Evidence:")
-    evidence = parse_ownership_notes(detail.get("ownership_notes", ""))
-    for ev in evidence.get("evidence", []):
+    for ev in catalog.evidence(sel):
         st.write(f"- {ev}")
 
+    st.markdown("**Similar contract language**")
+    similar = catalog.similar(sel, k=5)
+    if len(similar):
+        st.dataframe(similar[["catalog_id", "artist_name", "track_title", "eligibility_window", "similarity"]])
+    else:
+        st.caption("No ownership notes to compare.")
+
     st.markdown("**Explainability (feature contributions)**")
-    expl = detail.get("explainability", {})
+    expl = contributions_from_row(detail)
     # show each contribution in a small table and horizontal bar chart
-    expl_df = pd.DataFrame(
-        [
-            {"component": "eligibility", "value": expl.get("eligibility_value"), "contribution": expl.get("eligibility_contribution")},
-            {"component": "ownership_clarity", "value": expl.get("ownership_clarity_value"), "contribution": expl.get("ownership_contribution")},
-            {"component": "exclusive_penalty", "value": expl.get("exclusive_penalty_value"), "contribution": expl.get("exclusive_contribution")},
-        ]
-    )
+    expl_df = component_frame(expl)
     st.table(expl_df)
     st.metric("Composite score", f"{expl.get('total', 0):.3f}")
 
@@ -188,23 +271,15 @@ def main() -> None:
         # If altair rendering fails, continue without chart
         pass
 
-    # Selected-catalog CSV export (single-record) — labeled as requested
-    try:
-        single = detail.to_dict()
-        # serialize nested objects as JSON strings for CSV
-        for k in ["ownership_signals", "features", "explainability", "ingestion_metadata"]:
-            if k in single:
-                single[k] = json.dumps(single[k]) if single[k] is not None else ""
-        single_df = pd.DataFrame([single])
-        single_csv = single_df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            label="Download enriched CSV (Phase-1 output)",
-            data=single_csv,
-            file_name=f"catalog_{single.get('catalog_id', 'record')}_enriched.csv",
-            mime="text/csv",
-        )
-    except Exception:
-        pass
+    # Selected-catalog export (single record) with the same flat columns as the bulk export
+    single_mask = (adf["catalog_id"] == sel).to_numpy()
+    download_on_click(
+        "Download enriched CSV (Phase-1 output)",
+        lambda: export_filtered(adf, single_mask, "csv"),
+        file_name=f"catalog_{sel}_enriched.csv",
+        mime="text/csv",
+        key="export_single",
+    )
 
 
 if __name__ == "__main__":
@@ -1,36 +1,267 @@
-"""Simple CLI entrypoints for ingest and scoring (Phase 1)."""
+"""Simple CLI entrypoints for ingest and scoring (Phase 1).
+
+Subcommands import their dependencies when they run, so `--help` and the
+pandas-free `score` path do not pay for pandas, pyarrow and the pipeline.
+"""
 from __future__ import annotations
 
 import argparse
-import pandas as pd
+import itertools
+import json
+import sys
+import time
+
+
+# shard size used by --workers when --chunksize is not given
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _partition_cols(args):
+    return [c.strip() for c in args.partition_by.split(",") if c.strip()]
+
+
+def ingest_chunked(args, rules):
+    """Stream the CSV through the pipeline `args.chunksize` rows at a time.
+
+    With `--workers N` the chunks double as shards annotated, and their notes
+    embedded, in a process pool; results are written back in input order.
+    """
+    from catalogwatch.eligibility.config import load_windows
+    from catalogwatch.ingest.csv_loader import iter_csv_chunks
+    from catalogwatch.ingest.incremental import discard_manifest
+    from catalogwatch.nlp.ann import NOTE_DIM, IVFIndex, save_note_index
+    from catalogwatch.pipeline import add_note_stats, annotate_chunks, format_note_stats
+    from catalogwatch.services.store import ParquetChunkWriter
+
+    windows = load_windows(args.windows)
+    chunks = (chunk for chunk in iter_csv_chunks(args.path, args.chunksize or DEFAULT_CHUNKSIZE) if len(chunk))
+    first = next(chunks, None)
+    if first is None:
+        _refuse_empty(args)
+    chunks = itertools.chain([first], chunks)
+    started = time.perf_counter()
+    index = IVFIndex(NOTE_DIM)
+    note_stats = {}
+    discard_manifest("canonical_catalogs", args.data_dir)
+    with ParquetChunkWriter(name="canonical_catalogs", path=args.data_dir, partition_cols=_partition_cols(args)) as writer:
+        shards = annotate_chunks(chunks, windows, workers=args.workers, rules=rules, embed_notes=True)
+        for annotated, note_ids, vectors in shards:
+            writer.write(annotated)
+            index.add(note_ids, vectors)
+            add_note_stats(note_stats, annotated.attrs.get("note_stats"))
+    save_note_index(index, "canonical_catalogs", args.data_dir)
+    elapsed = time.perf_counter() - started
+    rate = writer.rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Ingested {writer.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    print(format_note_stats(note_stats))
+    print(f"Wrote canonical dataset to: {writer.path}")
+
 
-from catalogwatch.ingest.csv_loader import load_csv, canonicalize
-from catalogwatch.eligibility.config import load_windows
-from catalogwatch.eligibility.rules import explain_classification
-from catalogwatch.nlp.parser import parse_ownership_notes
-from catalogwatch.services.store import write_parquet
+def _refuse_empty(args):
+    # an empty input must not replace a good snapshot and its note index
+    raise SystemExit(f"ingest: {args.path} has no data rows; the stored dataset was left unchanged")
+
+
+def ingest_incremental(args, rules):
+    """Re-annotate only rows whose content changed since the last snapshot."""
+    from catalogwatch.eligibility.config import load_windows
+    from catalogwatch.ingest.incremental import incremental_ingest
+    from catalogwatch.pipeline import format_note_stats
+
+    windows = load_windows(args.windows)
+    started = time.perf_counter()
+    try:
+        manifest = incremental_ingest(
+            args.path, windows, path=args.data_dir, partition_cols=_partition_cols(args), rules=rules
+        )
+    except ValueError as exc:
+        raise SystemExit(f"ingest: {exc}")
+    elapsed = time.perf_counter() - started
+    counts = manifest["counts"]
+    print(
+        f"Incremental ingest of {manifest['rows']} rows in {elapsed:.2f}s: "
+        f"{counts['added']} added, {counts['changed']} changed, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+    )
+    print(format_note_stats(manifest["note_stats"]))
 
 
 def ingest(args):
-    df = load_csv(args.path)
+    """Run `_ingest`, optionally profiled, with the note parse cache loaded and saved around it.
+
+    The whole run uses one config snapshot, so edits to the keywords or
+    scoring files take effect on the next run. Worker processes start from
+    the cache as loaded; notes first parsed in a worker are not added to the
+    saved cache.
+    """
+    from catalogwatch.nlp.cache import note_cache_path
+    from catalogwatch.nlp.parser import get_note_cache
+    from catalogwatch.registry import current_rules
+
+    rules = current_rules()
+    cache = get_note_cache(rules)
+    cache.load(note_cache_path(args.data_dir))
+    _run_ingest(args, rules)
+    cache.save(note_cache_path(args.data_dir))
+
+
+def _run_ingest(args, rules):
+    if args.profile or args.cprofile:
+        from catalogwatch.services.instrumentation import Profiler, profiling
+
+        profiler = Profiler(cprofile=args.cprofile)
+        with profiling(profiler):
+            _ingest(args, rules)
+        print(profiler.summary())
+        if args.cprofile:
+            print(profiler.cprofile_stats())
+        if args.profile_output:
+            print(f"Wrote profile to: {profiler.write_json(args.profile_output)}")
+        return
+    _ingest(args, rules)
+
+
+def _ingest(args, rules):
+    if args.incremental:
+        ingest_incremental(args, rules)
+        return
+    if args.chunksize or args.workers > 1:
+        ingest_chunked(args, rules)
+        return
+
+    from catalogwatch.eligibility.config import load_windows
+    from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+    from catalogwatch.ingest.incremental import discard_manifest
+    from catalogwatch.ingest.schema import COLUMN_DTYPES
+    from catalogwatch.nlp.ann import build_note_index, save_note_index
+    from catalogwatch.nlp.embeddings import embedding_cache_dir
+    from catalogwatch.pipeline import annotate_frame, format_note_stats
+    from catalogwatch.services.store import write_dataset
+
+    # same read dtypes as chunked and incremental ingest, so stored row hashes agree
+    df = load_csv(args.path, dtype=COLUMN_DTYPES)
+    if not len(df):
+        _refuse_empty(args)
     c = canonicalize(df)
     windows = load_windows(args.windows)
 
-    annotated = []
-    for _, row in c.iterrows():
-        expl = explain_classification(int(row.release_year) if pd.notna(row.release_year) else None, None, windows)
-        nlp = parse_ownership_notes(row.ownership_notes)
-        rec = dict(row)
-        rec.update(expl)
-        rec["ownership_signals"] = nlp.get("signals")
-        rec["ownership_confidence"] = nlp.get("confidence")
-        annotated.append(rec)
-
-    out_df = pd.DataFrame(annotated)
-    out_path = write_parquet(out_df, name="canonical_catalogs")
+    out_df = annotate_frame(c, windows, rules=rules)
+    discard_manifest("canonical_catalogs", args.data_dir)
+    out_path = write_dataset(out_df, name="canonical_catalogs", path=args.data_dir, partition_cols=_partition_cols(args))
+    index = build_note_index(
+        out_df["catalog_id"], out_df["ownership_notes"], cache_dir=embedding_cache_dir(args.data_dir)
+    )
+    save_note_index(index, "canonical_catalogs", args.data_dir)
+    print(format_note_stats(out_df.attrs["note_stats"]))
     print(f"Wrote canonical dataset to: {out_path}")
 
 
+def serve(args):
+    """Run the ingest/scoring HTTP service until interrupted.
+
+    Windows, keywords and scoring weights are re-read when their files change.
+    """
+    from catalogwatch.modeling.scoring import NNScorer
+    from catalogwatch.registry import ConfigRegistry, set_registry
+    from catalogwatch.services.server import CatalogService, make_server
+
+    model = NNScorer.load(args.model) if args.model else None
+    registry = ConfigRegistry(windows_path=args.windows)
+    set_registry(registry)
+    service = CatalogService(
+        data_dir=args.data_dir,
+        workers=args.workers,
+        partition_cols=_partition_cols(args),
+        model=model,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (config {registry.current().version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+def score(args):
+    """Score JSON-lines records from a file or stdin, writing JSON lines to stdout."""
+    from catalogwatch.eligibility.config import load_windows
+    from catalogwatch.records import score_record
+
+    model = None
+    if args.model:
+        from catalogwatch.modeling.scoring import NNScorer
+        model = NNScorer.load(args.model)
+    windows = load_windows(args.windows)
+    source = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8")
+    out = sys.stdout
+    try:
+        for lineno, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise SystemExit(f"{args.path}:{lineno}: invalid JSON: {exc}")
+            out.write(json.dumps(score_record(record, windows, args.current_year, model)) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def export(args):
+    """Stream the stored enriched dataset to a file in the chosen format."""
+    from catalogwatch.services.export import export_dataset
+
+    filters = []
+    if args.window:
+        filters.append(("eligibility_window", "in", args.window))
+    if args.min_score is not None:
+        filters.append(("score", ">=", args.min_score))
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else None
+    try:
+        result = export_dataset(
+            args.dataset,
+            args.output,
+            fmt=args.format,
+            columns=columns,
+            filter=filters or None,
+            partition_cols=_partition_cols(args) if args.partition_by else (),
+            batch_size=args.batch_size,
+        )
+    except (ValueError, FileNotFoundError) as exc:
+        raise SystemExit(f"export: {exc}")
+    rate = result["rows"] / result["seconds"] if result["seconds"] > 0 else float("inf")
+    print(
+        f"Exported {result['rows']} rows as {result['format']} to {result['path']} "
+        f"in {result['seconds']:.2f}s ({rate:,.0f} rows/sec)"
+    )
+
+
+def forecast(args):
+    """Print window-by-year counts and entries for a catalog CSV over a range of as-of years."""
+    import pandas as pd
+
+    from catalogwatch.eligibility.config import load_windows
+    from catalogwatch.eligibility.forecast import forecast as project
+
+    df = pd.read_csv(args.path, usecols=["catalog_id", "release_year"], dtype={"catalog_id": "string"})
+    started = time.perf_counter()
+    fc = project(df["release_year"], args.start, args.end, load_windows(args.windows), ids=df["catalog_id"])
+    elapsed = time.perf_counter() - started
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(f"Catalogs per window, {args.start}-{args.end}:")
+        print(fc.counts.to_string())
+        print("\nCatalogs entering each window:")
+        print(fc.entries.to_string())
+    print(f"\nProjected {len(df)} catalogs over {len(fc.years)} years in {elapsed:.3f}s")
+    if args.output:
+        fc.entry_years.to_csv(args.output)
+        print(f"Wrote per-catalog entry years to: {args.output}")
+
+
 def main():
     parser = argparse.ArgumentParser(prog="catalogwatch")
     sub = parser.add_subparsers(dest="cmd")
@@ -38,10 +269,80 @@ def main():
     p_ingest = sub.add_parser("ingest")
     p_ingest.add_argument("path")
     p_ingest.add_argument("--windows", default="configs/eligibility_windows.yml")
+    p_ingest.add_argument("--data-dir", default="data/ingested", help="directory of the stored dataset")
+    p_ingest.add_argument(
+        "--chunksize", type=int, default=None,
+        help="stream the CSV in chunks of N rows with bounded memory",
+    )
+    p_ingest.add_argument(
+        "--workers", type=int, default=1,
+        help="annotate shards in a pool of N processes (implies chunked ingest)",
+    )
+    p_ingest.add_argument(
+        "--incremental", action="store_true",
+        help="re-annotate only new or changed rows and write a change manifest",
+    )
+    p_ingest.add_argument(
+        "--partition-by", default="eligibility_window",
+        help="comma-separated columns to partition the stored dataset by, e.g. eligibility_window,territory",
+    )
+    p_ingest.add_argument(
+        "--profile", action="store_true",
+        help="log per-stage time, rows and peak RSS as JSON and print a summary table",
+    )
+    p_ingest.add_argument("--profile-output", default=None, help="also write the stage records as JSON to this path")
+    p_ingest.add_argument("--cprofile", action="store_true", help="capture cProfile stats (implies --profile)")
+
+    p_score = sub.add_parser("score", help="score JSON-lines records without loading pandas")
+    p_score.add_argument("path", nargs="?", default="-", help="JSON-lines file, or - for stdin (default)")
+    p_score.add_argument("--windows", default="configs/eligibility_windows.yml")
+    p_score.add_argument("--current-year", type=int, default=None)
+    p_score.add_argument("--model", default=None, help="optional trained NNScorer (.npz) for learned scores")
+
+    p_export = sub.add_parser("export", help="export the enriched dataset as Arrow IPC, Feather, Parquet, CSV or JSON lines")
+    p_export.add_argument("output", help="output file, or directory for partitioned Parquet")
+    p_export.add_argument(
+        "--format", choices=["arrow", "feather", "parquet", "csv", "jsonl"], default=None,
+        help="output format (default: from the output extension)",
+    )
+    p_export.add_argument("--dataset", default="data/ingested/canonical_catalogs", help="stored dataset to export")
+    p_export.add_argument("--columns", default=None, help="comma-separated columns to export (default: all)")
+    p_export.add_argument("--window", action="append", default=None, help="only this eligibility window (repeatable)")
+    p_export.add_argument("--min-score", type=float, default=None, help="only rows with score >= this")
+    p_export.add_argument("--partition-by", default=None, help="comma-separated columns to partition Parquet output by")
+    p_export.add_argument("--batch-size", type=int, default=65_536, help="rows per record batch")
+
+    p_forecast = sub.add_parser("forecast", help="project eligibility windows over a range of as-of years")
+    p_forecast.add_argument("path", help="catalog CSV with catalog_id and release_year columns")
+    p_forecast.add_argument("--from", dest="start", type=int, required=True, help="first as-of year")
+    p_forecast.add_argument("--to", dest="end", type=int, required=True, help="last as-of year (inclusive)")
+    p_forecast.add_argument("--windows", default="configs/eligibility_windows.yml")
+    p_forecast.add_argument("--output", default=None, help="write per-catalog entry years as CSV to this path")
+
+    p_serve = sub.add_parser("serve", help="run a local HTTP ingest and scoring service")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--workers", type=int, default=2, help="concurrent ingest jobs")
+    p_serve.add_argument("--windows", default="configs/eligibility_windows.yml")
+    p_serve.add_argument("--data-dir", default="data/ingested")
+    p_serve.add_argument("--partition-by", default="eligibility_window")
+    p_serve.add_argument("--model", default=None, help="optional trained NNScorer (.npz) for learned scores")
 
     args = parser.parse_args()
+    if args.cmd == "ingest" and args.incremental and (args.chunksize or args.workers > 1):
+        parser.error("--incremental cannot be combined with --chunksize or --workers")
+    if args.cmd == "forecast" and args.end < args.start:
+        parser.error("--to must not be before --from")
     if args.cmd == "ingest":
         ingest(args)
+    elif args.cmd == "score":
+        score(args)
+    elif args.cmd == "export":
+        export(args)
+    elif args.cmd == "forecast":
+        forecast(args)
+    elif args.cmd == "serve":
+        serve(args)
     else:
         parser.print_help()
 
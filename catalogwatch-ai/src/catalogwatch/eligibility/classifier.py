@@ -0,0 +1,100 @@
+"""Precompiled eligibility window classifier.
+
+The windows from `configs/eligibility_windows.yml` are validated once and kept
+as sorted lower/upper bound arrays, so a whole array of years is classified
+with a single `np.searchsorted` call. Results are integer window codes into
+`WindowClassifier.labels`, which includes the "Unknown" (missing years) and
+"Unmatched" (outside every window) labels after the configured windows.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+UNKNOWN = "Unknown"
+UNMATCHED = "Unmatched"
+
+
+class WindowClassifier:
+    """Interval index over contiguous, non-overlapping eligibility windows."""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        validate_windows(rules)
+        self.rules = list(rules)
+        self.labels: List[str] = [r["name"] for r in self.rules] + [UNKNOWN, UNMATCHED]
+        self.unknown_code = len(self.rules)
+        self.unmatched_code = len(self.rules) + 1
+        self._mins = np.array([r["min_years"] for r in self.rules], dtype=float)
+        self._maxs = np.array([r["max_years"] for r in self.rules], dtype=float)
+
+    @classmethod
+    def from_config(cls, windows: Dict[str, Any]) -> "WindowClassifier":
+        """Build from the dict returned by `eligibility.config.load_windows`."""
+        return cls(windows.get("windows", []))
+
+    def codes(self, years: Any) -> np.ndarray:
+        """Return an int8 window code for each entry of `years` (NaN means unknown)."""
+        years = np.asarray(years, dtype=float)
+        idx = np.searchsorted(self._mins, years, side="right") - 1
+        safe = np.clip(idx, 0, max(len(self.rules) - 1, 0))
+        inside = (idx >= 0) & (years <= self._maxs[safe]) if len(self.rules) else np.zeros(years.shape, dtype=bool)
+        codes = np.where(inside, idx, self.unmatched_code)
+        codes = np.where(np.isnan(years), self.unknown_code, codes)
+        return codes.astype(np.int8)
+
+    def classify(self, years: Any) -> pd.Categorical:
+        """Classify an array of years into a categorical of window labels."""
+        import pandas as pd
+
+        return pd.Categorical.from_codes(self.codes(years), categories=self.labels)
+
+    def classify_one(self, years: Optional[int]) -> Dict[str, Any]:
+        """Scalar form returning `{"eligibility_window", "matched_rule"}` like `classify_years`."""
+        code = int(self.codes(np.nan if years is None else years))
+        rule = self.rules[code] if code < len(self.rules) else None
+        return {"eligibility_window": self.labels[code], "matched_rule": rule}
+
+
+def validate_windows(rules: List[Dict[str, Any]]) -> None:
+    """Check windows are well formed, sorted, non-overlapping and gap-free.
+
+    Raises ValueError describing the first problem found.
+    """
+    prev = None
+    for i, rule in enumerate(rules):
+        missing = [k for k in ("name", "min_years", "max_years") if k not in rule]
+        if missing:
+            raise ValueError(f"Window {i} is missing keys: {missing}")
+        if rule["name"] in (UNKNOWN, UNMATCHED):
+            raise ValueError(f"Window name {rule['name']!r} is reserved")
+        if rule["min_years"] > rule["max_years"]:
+            raise ValueError(f"Window {rule['name']!r} has min_years > max_years")
+        if prev is not None:
+            if rule["min_years"] < prev["min_years"]:
+                raise ValueError(f"Windows are not sorted: {rule['name']!r} comes after {prev['name']!r}")
+            if rule["min_years"] <= prev["max_years"]:
+                raise ValueError(f"Windows {prev['name']!r} and {rule['name']!r} overlap")
+            if rule["min_years"] != prev["max_years"] + 1:
+                raise ValueError(f"Gap between windows {prev['name']!r} and {rule['name']!r}")
+        prev = rule
+
+
+@lru_cache(maxsize=32)
+def _cached_classifier(key: Tuple[Tuple[Tuple[str, Any], ...], ...]) -> WindowClassifier:
+    return WindowClassifier([dict(items) for items in key])
+
+
+def get_classifier(windows: Dict[str, Any]) -> WindowClassifier:
+    """Return a classifier for `windows`, reusing one already built for the same config."""
+    key = tuple(tuple(sorted(rule.items())) for rule in windows.get("windows", []))
+    try:
+        return _cached_classifier(key)
+    except TypeError:
+        # unhashable values in a rule; build without caching
+        return WindowClassifier.from_config(windows)
@@ -1,12 +1,15 @@
 """Load eligibility window configuration."""
 from __future__ import annotations
 
-import yaml
 from typing import Dict, Any
 
+from catalogwatch.registry import load_file, parse_windows
+
 
 def load_windows(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as fh:
-        cfg = yaml.safe_load(fh)
-    return cfg
+    """Windows config at `path`, validated once and cached until the file changes.
 
+    The returned dict is shared between callers and must not be modified.
+    Raises `registry.ConfigError` if the file is missing or invalid.
+    """
+    return load_file(path, parse_windows)[0]
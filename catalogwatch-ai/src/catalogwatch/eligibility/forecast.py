@@ -0,0 +1,121 @@
+"""Eligibility projections across many as-of years at once.
+
+`forecast` classifies every catalog against a range of as-of years in one
+broadcast: an `(n, years)` matrix of years-since-release is turned into window
+codes with a single `WindowClassifier.codes` call per block of rows. From the
+code matrix it derives
+
+- `counts`: catalogs in each window for each as-of year,
+- `entries`: catalogs entering each window in each year (in the window that
+  year but not the year before; the year before the range is evaluated too),
+- `entry_years`: per catalog, the as-of year in the range in which it enters
+  each window, consistent with `entries` (missing if it does not enter that
+  window within the range, including when it is already in it the year
+  before the range).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+
+from catalogwatch.eligibility.classifier import get_classifier
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# rows classified per broadcast block, bounding the (rows, years) temporaries
+_BLOCK = 1_000_000
+
+
+@dataclass
+class Forecast:
+    """Result of `forecast`; see the module docstring."""
+
+    years: List[int]
+    counts: "pd.DataFrame"
+    entries: "pd.DataFrame"
+    entry_years: "pd.DataFrame"
+
+    def timeline(self) -> "pd.DataFrame":
+        """`counts` and `entries` in long form (`year`, `window`, `count`, `entering`) for charts."""
+        counts = self.counts.rename_axis(index="window", columns="year").stack().rename("count")
+        entering = self.entries.rename_axis(index="window", columns="year").stack().rename("entering")
+        return counts.to_frame().join(entering).reset_index()[["year", "window", "count", "entering"]]
+
+
+def window_codes_by_year(release_years: Any, as_of_years: Any, windows: Dict[str, Any]) -> np.ndarray:
+    """int8 window codes of shape `(len(release_years), len(as_of_years))`.
+
+    Missing release years (NaN) get the "Unknown" code in every column.
+    """
+    release = np.asarray(release_years, dtype=float)
+    years = np.asarray(as_of_years, dtype=float)
+    classifier = get_classifier(windows)
+    out = np.empty((len(release), len(years)), dtype=np.int8)
+    for start in range(0, len(release), _BLOCK):
+        block = release[start:start + _BLOCK]
+        out[start:start + _BLOCK] = classifier.codes(years[None, :] - block[:, None])
+    return out
+
+
+def forecast(
+    release_years: Any,
+    start_year: int,
+    end_year: int,
+    windows: Dict[str, Any],
+    ids: Optional[Any] = None,
+) -> Forecast:
+    """Project eligibility windows for every as-of year in `[start_year, end_year]`.
+
+    Args:
+        release_years: release year per catalog (NaN or None for unknown)
+        start_year, end_year: inclusive range of as-of years
+        windows: dict from `eligibility.config.load_windows`
+        ids: optional catalog ids used as the `entry_years` index
+
+    Raises ValueError if `end_year < start_year`.
+    """
+    import pandas as pd
+
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    years = list(range(start_year, end_year + 1))
+    release = pd.to_numeric(pd.Series(release_years), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    classifier = get_classifier(windows)
+    labels = list(classifier.labels)
+    n_labels = len(labels)
+
+    # one extra leading column for the year before the range
+    codes = window_codes_by_year(release, [start_year - 1] + years, windows)
+    current, previous = codes[:, 1:], codes[:, :-1]
+
+    counts = np.empty((n_labels, len(years)), dtype=np.int64)
+    entries = np.empty((n_labels, len(years)), dtype=np.int64)
+    entered = current != previous
+    for j in range(len(years)):
+        counts[:, j] = np.bincount(current[:, j], minlength=n_labels)
+        entries[:, j] = np.bincount(current[entered[:, j], j], minlength=n_labels)
+
+    entry = {}
+    year_arr = np.array(years)
+    for code, label in enumerate(labels[: len(classifier.rules)]):
+        entering = entered & (current == code)
+        first = pd.array(year_arr[entering.argmax(axis=1)], dtype="Int16")
+        first[~entering.any(axis=1)] = pd.NA
+        entry[label] = first
+
+    # the reserved Unknown/Unmatched rows are only kept when they occur
+    keep = [i for i, label in enumerate(labels) if i < len(classifier.rules) or counts[i].any()]
+    labels = [labels[i] for i in keep]
+    counts, entries = counts[keep], entries[keep]
+
+    index = pd.Index(ids if ids is not None else range(len(release)), name="catalog_id" if ids is not None else None)
+    return Forecast(
+        years=years,
+        counts=pd.DataFrame(counts, index=pd.Index(labels, name="window"), columns=years),
+        entries=pd.DataFrame(entries, index=pd.Index(labels, name="window"), columns=years),
+        entry_years=pd.DataFrame(entry, index=index),
+    )
@@ -1,9 +1,16 @@
 """Eligibility computation and explainability."""
 from __future__ import annotations
 
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 import datetime
 
+import numpy as np
+
+from catalogwatch.eligibility.classifier import get_classifier
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def years_since_release(release_year: Optional[int], current_year: Optional[int] = None) -> Optional[int]:
     if release_year is None:
@@ -20,19 +27,25 @@ def classify_years(years: Optional[int], windows: Dict[str, Any]) -> Dict[str, A
     """Classify a number of years into a window based on loaded windows config.
 
     windows: dict loaded from `configs/eligibility_windows.yml` with key `windows`.
-    Returns a dict with label and the matching rule.
+    Returns a dict with label and the matching rule. Raises ValueError if the
+    windows are unsorted, overlapping or leave gaps.
     """
-    if years is None:
-        return {"eligibility_window": "Unknown", "matched_rule": None}
-
-    for rule in windows.get("windows", []):
-        if rule["min_years"] <= years <= rule["max_years"]:
-            return {"eligibility_window": rule["name"], "matched_rule": rule}
-
-    return {"eligibility_window": "Unmatched", "matched_rule": None}
+    return get_classifier(windows).classify_one(years)
 
 
 def explain_classification(release_year: Optional[int], current_year: Optional[int], windows: Dict[str, Any]) -> Dict[str, Any]:
     yrs = years_since_release(release_year, current_year)
     classification = classify_years(yrs, windows)
     return {"release_year": release_year, "years_since_release": yrs, **classification}
+
+
+def years_since_release_batch(release_years: np.ndarray, current_year: Optional[int] = None) -> np.ndarray:
+    """Vectorized `years_since_release` over a float array (NaN marks a missing year)."""
+    if current_year is None:
+        current_year = datetime.date.today().year
+    return int(current_year) - np.asarray(release_years, dtype=float)
+
+
+def classify_years_batch(years: np.ndarray, windows: Dict[str, Any]) -> pd.Categorical:
+    """Classify an array of years (NaN for missing) into a categorical of window labels."""
+    return get_classifier(windows).classify(years)
@@ -2,35 +2,164 @@
 from __future__ import annotations
 
 import datetime
+import uuid
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 
-from catalogwatch.ingest.schema import validate_columns
+from catalogwatch.ingest.schema import (
+    COLUMN_DTYPES,
+    DERIVED_COLUMNS,
+    DERIVED_PREFIXES,
+    REQUIRED_COLUMNS,
+    validate_columns,
+)
+from catalogwatch.services.instrumentation import stage, timed
 
 
-def load_csv(path: str) -> pd.DataFrame:
+@timed("load")
+def load_csv(path: str, dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """Load CSV and validate required columns.
 
     Args:
         path: path to CSV file
+        dtype: optional column dtypes passed to `pd.read_csv`
 
     Returns:
         DataFrame with raw columns
     """
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, dtype=dtype)
     validate_columns(list(df.columns))
     return df
 
 
-def canonicalize(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
-    """Return canonical form with ingestion metadata and normalized types.
+def iter_csv_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield the CSV in chunks of `chunksize` rows with explicit column dtypes.
 
-    Adds `ingestion_metadata` column and ensures `release_year` is int when possible.
+    Required columns are validated against the first chunk before anything is
+    yielded, so a malformed file fails fast without being read in full.
     """
-    df = df.copy()
-    # normalize release_year
-    df["release_year"] = pd.to_numeric(df["release_year"], errors="coerce").astype("Int64")
-    df["ingestion_metadata"] = df.apply(
-        lambda row: {"source": source, "loaded_at": datetime.datetime.utcnow().isoformat()}, axis=1
+    reader = pd.read_csv(path, chunksize=chunksize, dtype=COLUMN_DTYPES)
+    with reader:
+        chunks = iter(reader)
+        first = True
+        while True:
+            with stage("load") as st:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    st.add_rows(len(chunk))
+            if chunk is None:
+                return
+            if first:
+                validate_columns(list(chunk.columns))
+                first = False
+            yield chunk
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Return a uint64 content hash per row over every input column.
+
+    Ingestion metadata, `row_hash` itself and the columns added by annotation
+    are left out, so annotating a frame does not change its hashes. Values
+    are hashed as given, with their dtypes: a value `canonicalize` rewrites
+    (trimmed text, upper-cased ids) hashes differently from the raw one, and
+    so does a column read with other dtypes, which is why every ingest path
+    reads with `COLUMN_DTYPES`. Required columns come first and any others
+    follow by name, so column order does not matter. `release_year` is
+    normalized first, so a raw year and its canonical integer hash identically.
+    """
+    skip = set(INGESTION_COLUMNS) | {"row_hash"} | set(DERIVED_COLUMNS)
+    extra = sorted(
+        c for c in df.columns
+        if c not in skip and c not in REQUIRED_COLUMNS and not str(c).startswith(DERIVED_PREFIXES)
     )
-    return df
+    key = df[[c for c in REQUIRED_COLUMNS if c in df.columns] + extra]
+    if "release_year" in key.columns:
+        key = key.assign(release_year=pd.to_numeric(key["release_year"], errors="coerce").astype("Int64"))
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+# one batch record's fields, stored as single-category categorical columns
+INGESTION_COLUMNS = ["ingestion_batch", "ingestion_source", "ingestion_loaded_at"]
+
+# identifier columns: trimmed and upper-cased
+ID_COLUMNS = ("catalog_id", "territory")
+# free-text columns: trimmed
+TEXT_COLUMNS = ("artist_name", "track_title", "rights_holder", "ownership_notes")
+# low-cardinality columns stored as categoricals
+CATEGORY_COLUMNS = ("territory", "rights_holder")
+
+
+def new_batch(source: str = "csv", loaded_at: Optional[str] = None, batch_id: Optional[str] = None) -> Dict[str, Any]:
+    """Ingestion record shared by every row of one load: source, timestamp and batch id."""
+    return {
+        "batch_id": batch_id or uuid.uuid4().hex[:16],
+        "source": source,
+        "loaded_at": loaded_at or datetime.datetime.utcnow().isoformat(),
+    }
+
+
+def _constant_category(value: Any, n: int) -> pd.Categorical:
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=pd.Index([value]))
+
+
+def _normalize_strings(col: pd.Series, upper: bool, categorical: bool) -> pd.Series:
+    """Trim (and optionally upper-case) a string column; non-strings pass through.
+
+    Categorical columns are normalized on their distinct values only and then
+    re-coded, so the cost is one string operation per distinct value.
+    """
+    if not categorical:
+        if not pd.api.types.is_string_dtype(col):
+            return col
+        col = col.str.strip()
+        return col.str.upper() if upper else col
+    codes, uniques = pd.factorize(col)
+    if len(uniques) == 0:
+        # all missing: nothing to normalize, and no category to map codes onto
+        return pd.Series(pd.Categorical.from_codes(codes, categories=pd.Index([], dtype=object)), index=col.index, name=col.name)
+    normalized = [v.strip() if isinstance(v, str) else v for v in uniques]
+    if upper:
+        normalized = [v.upper() if isinstance(v, str) else v for v in normalized]
+    # values that only differed by whitespace or case collapse into one category
+    merged_codes, merged = pd.factorize(pd.Series(normalized, dtype=object))
+    codes = np.where(codes >= 0, merged_codes[np.maximum(codes, 0)], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=merged), index=col.index, name=col.name)
+
+
+def normalize_ids(ids: pd.Series) -> pd.Series:
+    """`catalog_id` values as `canonicalize` stores them: trimmed and upper-cased."""
+    return _normalize_strings(ids, upper=True, categorical=False)
+
+
+@timed("canonicalize")
+def canonicalize(
+    df: pd.DataFrame, source: str = "csv", loaded_at: Optional[str] = None, batch_id: Optional[str] = None
+) -> pd.DataFrame:
+    """Return canonical form with ingestion metadata and normalized types.
+
+    Works column by column on a shallow copy; the input is not modified.
+    `row_hash` is computed from the input as given. `release_year` becomes a
+    nullable int, identifiers are trimmed and upper-cased, free text is
+    trimmed and `territory`/`rights_holder` become categoricals. The batch
+    record (`new_batch`) is kept in `attrs["ingestion"]` and referenced by the
+    `ingestion_batch`, `ingestion_source` and `ingestion_loaded_at` columns,
+    each a single-category categorical. Pass `loaded_at` and `batch_id` to
+    stamp several chunks, e.g. of a run split across processes, as one batch.
+    """
+    out = df.copy(deep=False)
+    out["row_hash"] = row_hashes(df)
+    out["release_year"] = pd.to_numeric(df["release_year"], errors="coerce").astype("Int64")
+    for column in ID_COLUMNS + TEXT_COLUMNS:
+        if column in out.columns:
+            out[column] = _normalize_strings(
+                out[column], upper=column in ID_COLUMNS, categorical=column in CATEGORY_COLUMNS
+            )
+
+    batch = new_batch(source, loaded_at, batch_id)
+    n = len(out)
+    out["ingestion_batch"] = _constant_category(batch["batch_id"], n)
+    out["ingestion_source"] = _constant_category(batch["source"], n)
+    out["ingestion_loaded_at"] = _constant_category(pd.Timestamp(batch["loaded_at"]), n)
+    out.attrs["ingestion"] = batch
+    return out
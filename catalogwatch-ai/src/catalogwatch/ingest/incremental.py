@@ -0,0 +1,242 @@
+"""Incremental re-ingest keyed on `catalog_id` and row content hash.
+
+Each input row is hashed (`csv_loader.row_hashes`) and compared, by
+normalized `catalog_id` (`csv_loader.normalize_ids`, as stored), with the
+`row_hash` column of the stored snapshot. Only new or changed rows are
+canonicalized and annotated, and the snapshot is updated file by file
+(`store.update_dataset`): the new rows become new part files, the part files
+holding changed or removed rows are rewritten without them and all other
+files are carried over as they are. Apart from reading the input and the
+snapshot's ids and hashes, the cost of a run is proportional to the delta
+and the files it touches, not to the table. Rows are therefore not kept in
+input order. Once the snapshot has `COMPACT_FILES` part files it is written
+again in full, in input order. A manifest listing added, changed and removed catalog ids is written
+next to the snapshot together with a fingerprint of the pipeline inputs
+(windows config, keywords, scoring weights, as-of year, package version). When the fingerprint
+differs from the previous run every row is re-annotated.
+
+The note similarity index next to the snapshot (`nlp.ann.index_path`) is
+updated the same way: removed and changed ids are dropped and only added or
+changed notes are embedded.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch import __version__
+from catalogwatch.ingest.csv_loader import load_csv, normalize_ids, row_hashes, canonicalize
+from catalogwatch.ingest.schema import COLUMN_DTYPES
+from catalogwatch.nlp.ann import NOTE_DIM, IVFIndex, add_notes, load_note_index, save_note_index
+from catalogwatch.nlp.embeddings import embedding_cache_dir
+from catalogwatch.pipeline import annotate_frame
+from catalogwatch.registry import Rules, current_rules
+from catalogwatch.services.store import (
+    DEFAULT_PARTITION_COLS,
+    dataset_columns,
+    dataset_files,
+    dataset_path,
+    read_dataset,
+    to_storage_frame,
+    update_dataset,
+    write_dataset,
+)
+
+
+# part files at which a run rewrites the snapshot in full instead of updating it
+COMPACT_FILES = 256
+
+
+def pipeline_fingerprint(windows: Dict[str, Any], current_year: int, rules: Optional[Rules] = None) -> str:
+    """Hash of everything besides the row itself that affects annotation output."""
+    rules = rules or current_rules()
+    payload = json.dumps(
+        {
+            "windows": windows,
+            "keywords": rules.keywords,
+            "scoring": rules.scoring,
+            "current_year": current_year,
+            "version": __version__,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_path(name: str, path: str = "data/ingested") -> str:
+    return os.path.join(path, f"{name}.manifest.json")
+
+
+def discard_manifest(name: str, path: str = "data/ingested") -> None:
+    """Remove the manifest of dataset `name`; call before any non-incremental write of it.
+
+    A full rewrite may use other windows or config, so its rows must not be
+    trusted under the old fingerprint: the next incremental run starts over.
+    """
+    try:
+        os.remove(manifest_path(name, path))
+    except FileNotFoundError:
+        pass
+
+
+def _load_previous(
+    snapshot: str, manifest: str, fingerprint: str, partition_cols: Sequence[str]
+) -> Optional[pd.DataFrame]:
+    """Return the stored `catalog_id`/`row_hash` pairs, or None if they can't be reused.
+
+    The `file` column names the part file (`store.dataset_files`) holding the row.
+    """
+    if not (os.path.isdir(snapshot) and os.path.exists(manifest)):
+        return None
+    with open(manifest, "r", encoding="utf-8") as fh:
+        stored = json.load(fh)
+    if stored.get("fingerprint") != fingerprint or stored.get("partition_cols") != list(partition_cols):
+        return None
+    columns = ["catalog_id", "row_hash"]
+    if "row_hash" not in dataset_columns(snapshot) or set(columns) & set(partition_cols):
+        return None
+    parts = [frame.assign(file=name) for name, frame in dataset_files(snapshot, columns)]
+    if not parts:
+        return None
+    return pd.concat(parts, ignore_index=True)
+
+
+def diff_rows(previous: pd.DataFrame, current: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Compare two `catalog_id`/`row_hash` frames positionally.
+
+    Returns boolean masks over `current` rows for "added", "changed" and
+    "unchanged", a mask over `previous` rows for "removed", and for each
+    current row its position in `previous` ("previous_position", -1 if new).
+    """
+    prev_pos = pd.Index(previous["catalog_id"]).get_indexer(current["catalog_id"])
+    known = prev_pos >= 0
+    prev_hash = previous["row_hash"].to_numpy()
+    same = np.zeros(len(current), dtype=bool)
+    same[known] = prev_hash[prev_pos[known]] == current["row_hash"].to_numpy()[known]
+    return {
+        "added": ~known,
+        "changed": known & ~same,
+        "unchanged": same,
+        "removed": pd.Index(current["catalog_id"]).get_indexer(previous["catalog_id"]) < 0,
+        "previous_position": prev_pos,
+    }
+
+
+def _rewrite(
+    snapshot: str,
+    annotated: pd.DataFrame,
+    todo: np.ndarray,
+    diff: Dict[str, np.ndarray],
+    name: str,
+    path: str,
+    partition_cols: Sequence[str],
+) -> None:
+    """Write the whole snapshot again: the annotated rows plus the unchanged stored ones, in input order."""
+    parts = [to_storage_frame(annotated)]
+    positions = [np.flatnonzero(todo)]
+    if diff["unchanged"].any():
+        # read in the same order as `previous`, so positions line up
+        stored = read_dataset(snapshot)
+        parts.append(stored.take(diff["previous_position"][diff["unchanged"]]))
+        positions.append(np.flatnonzero(diff["unchanged"]))
+    merged = pd.concat(parts, ignore_index=True)
+    merged = merged.take(np.argsort(np.concatenate(positions), kind="stable")).reset_index(drop=True)
+    write_dataset(merged, name=name, path=path, partition_cols=partition_cols)
+
+
+def incremental_ingest(
+    csv_path: str,
+    windows: Dict[str, Any],
+    name: str = "canonical_catalogs",
+    path: str = "data/ingested",
+    current_year: Optional[int] = None,
+    partition_cols: Sequence[str] = DEFAULT_PARTITION_COLS,
+    rules: Optional[Rules] = None,
+) -> Dict[str, Any]:
+    """Re-annotate only new or changed rows and update the snapshot dataset with them.
+
+    Keywords and weights come from one config snapshot, `rules` (current if
+    not given), used for both annotation and the manifest fingerprint.
+
+    Returns the manifest that was written. Raises ValueError if the input has
+    no rows, which would otherwise remove every stored row, or if
+    `catalog_id` is not unique in it once trimmed and upper-cased.
+    """
+    if current_year is None:
+        current_year = datetime.date.today().year
+    rules = rules or current_rules()
+    fingerprint = pipeline_fingerprint(windows, current_year, rules)
+    snapshot = dataset_path(name, path)
+    manifest_file = manifest_path(name, path)
+
+    raw = load_csv(csv_path, dtype=COLUMN_DTYPES)
+    if not len(raw):
+        raise ValueError(f"{csv_path} has no data rows; the stored dataset was left unchanged")
+    # compared with, and indexed under, the ids as stored
+    ids = normalize_ids(raw["catalog_id"])
+    if ids.duplicated().any():
+        raise ValueError("Incremental ingest requires unique catalog_id values (after trimming and upper-casing)")
+    current = pd.DataFrame({"catalog_id": ids, "row_hash": row_hashes(raw)})
+
+    previous = _load_previous(snapshot, manifest_file, fingerprint, partition_cols)
+    if previous is None:
+        previous = pd.DataFrame({"catalog_id": [], "row_hash": [], "file": []})
+    diff = diff_rows(previous, current)
+
+    todo = ~diff["unchanged"]
+    annotated = annotate_frame(canonicalize(raw[todo]), windows, current_year, rules)
+    note_stats = annotated.attrs.get("note_stats", {})
+    files = {"linked": 0, "rewritten": 0, "added": 0}
+    full_rewrite = (
+        not diff["unchanged"].any()
+        or previous["file"].nunique() >= COMPACT_FILES
+        or set(to_storage_frame(annotated.iloc[:0]).columns) != set(dataset_columns(snapshot))
+    )
+    if full_rewrite:
+        _rewrite(snapshot, annotated, todo, diff, name, path, partition_cols)
+    elif todo.any() or diff["removed"].any():
+        # stored rows to drop: removed ones and the old versions of changed ones
+        drop = diff["removed"].copy()
+        drop[diff["previous_position"][diff["changed"]]] = True
+        # `previous` lists each file's rows together and in file order
+        keep = {
+            file: ~group.to_numpy()
+            for file, group in pd.Series(drop).groupby(previous["file"].to_numpy(), sort=False)
+            if group.any()
+        }
+        files = update_dataset(snapshot, annotated, keep, partition_cols)
+
+    removed = previous["catalog_id"][diff["removed"]]
+    index = load_note_index(name, path) if len(previous) else None
+    if index is None:
+        index = IVFIndex(NOTE_DIM)
+        todo = np.ones(len(raw), dtype=bool)
+    else:
+        # changed notes may now be blank, so drop them before re-adding
+        index.remove(pd.concat([removed, ids[diff["changed"]]]).astype(str))
+    add_notes(index, ids[todo], raw["ownership_notes"][todo], cache_dir=embedding_cache_dir(path))
+    save_note_index(index, name, path)
+    manifest = {
+        "fingerprint": fingerprint,
+        "generated_at": datetime.datetime.utcnow().isoformat(),
+        "source": csv_path,
+        "rows": len(current),
+        "counts": {k: int(diff[k].sum()) for k in ("added", "changed", "removed", "unchanged")},
+        "added": ids[diff["added"]].tolist(),
+        "changed": ids[diff["changed"]].tolist(),
+        "removed": removed.tolist(),
+        "note_stats": note_stats,
+        "partition_cols": list(partition_cols),
+        "full_rewrite": full_rewrite,
+        "files": files,
+    }
+    with open(manifest_file, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest
@@ -1,5 +1,5 @@
 """Schema and basic validation for CSV ingestion."""
-from typing import List
+from typing import Dict, List
 
 
 REQUIRED_COLUMNS: List[str] = [
@@ -12,6 +12,34 @@ REQUIRED_COLUMNS: List[str] = [
     "ownership_notes",
 ]
 
+# Explicit read dtypes so chunked reads agree on column types. `release_year`
+# is read as text and coerced to a nullable integer during canonicalization.
+COLUMN_DTYPES: Dict[str, str] = {
+    "catalog_id": "str",
+    "artist_name": "str",
+    "track_title": "str",
+    "release_year": "str",
+    "rights_holder": "str",
+    "territory": "str",
+    "ownership_notes": "str",
+}
+
+# Columns added by annotation (`pipeline.annotate_frame`), plus one
+# `signal_<name>` column per ownership signal. They are never input content.
+DERIVED_COLUMNS: List[str] = [
+    "years_since_release",
+    "eligibility_window",
+    "ownership_confidence",
+    "score",
+    "eligibility_value",
+    "eligibility_contribution",
+    "ownership_clarity_value",
+    "ownership_contribution",
+    "exclusive_penalty_value",
+    "exclusive_contribution",
+]
+DERIVED_PREFIXES = ("signal_",)
+
 
 def validate_columns(columns: List[str]) -> None:
     missing = [c for c in REQUIRED_COLUMNS if c not in columns]
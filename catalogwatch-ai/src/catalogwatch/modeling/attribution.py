@@ -0,0 +1,164 @@
+"""Batched per-feature attributions for any scorer.
+
+`Attributor` explains many rows at once:
+
+- `ScoringEngine` (the configured composite score) is linear in its component
+  values, so its attributions are the exact weighted contributions the engine
+  already computes.
+- Any other model with a `predict(X) -> ndarray` method (e.g. a trained
+  `NNScorer`) gets sampled Shapley values: features are switched from a
+  background sample to the row's value in random orders and the change in the
+  prediction is credited to the feature switched. All rows share the same
+  orders, so each step is one `predict` call over the whole batch. The
+  attributions of a row sum to its prediction minus `base_value`, the mean
+  prediction over the background.
+
+Feature vectors are discrete in practice (years and a few flags), so rows are
+deduplicated before explaining and results are cached per distinct vector.
+
+Output frames have a `<name>_value` and `<name>_contribution` column per
+component plus `base_value` and `total`; `component_frame` turns one row into
+the component/value/contribution table the dashboard charts.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch.modeling.engine import COMPONENTS, FEATURE_COLUMNS, ScoringEngine, as_matrix
+from catalogwatch.modeling.explainability import CONTRIBUTION_KEYS, VALUE_KEYS
+
+
+# (component, value column, contribution column) for the composite score
+ENGINE_KEYS: List[Tuple[str, str, str]] = list(zip(COMPONENTS, VALUE_KEYS, CONTRIBUTION_KEYS))
+
+# the same for feature-level attributions of a learned model
+FEATURE_KEYS: List[Tuple[str, str, str]] = [(c, f"{c}_value", f"{c}_contribution") for c in FEATURE_COLUMNS]
+
+
+class Attributor:
+    """Vectorized attribution engine with a per-feature-vector cache.
+
+    Args:
+        model: a `ScoringEngine` or any object with `predict(X) -> ndarray`
+        background: reference rows (anything `as_matrix` accepts); required
+            for models other than `ScoringEngine`
+        n_background: background rows sampled from `background`
+        n_permutations: feature orders sampled per explanation
+        block_size: rows explained per `predict` pass, bounding memory to about
+            `block_size * n_background` feature rows
+        cache_size: distinct feature vectors kept in the cache
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        background: Any = None,
+        n_background: int = 32,
+        n_permutations: int = 16,
+        block_size: int = 2048,
+        cache_size: int = 100_000,
+        seed: int = 0,
+    ):
+        self.model = model
+        self.exact = isinstance(model, ScoringEngine)
+        self.keys = ENGINE_KEYS if self.exact else FEATURE_KEYS
+        self.n_permutations = n_permutations
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self._cache: Dict[bytes, np.ndarray] = {}
+        self.stats: Dict[str, int] = {"rows": 0, "unique": 0, "cache_hits": 0}
+
+        rng = np.random.default_rng(seed)
+        self.background: Optional[np.ndarray] = None
+        self.base_value = 0.0
+        if not self.exact:
+            if background is None:
+                raise ValueError("A background sample is required to explain non-linear models")
+            bg = as_matrix(background)
+            if len(bg) > n_background:
+                bg = bg[rng.choice(len(bg), n_background, replace=False)]
+            self.background = bg
+            self.base_value = float(np.mean(self._predict(bg)))
+        d = len(FEATURE_COLUMNS)
+        self._orders = np.array([rng.permutation(d) for _ in range(n_permutations)]).reshape(-1, d)
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict(X), dtype=np.float64)
+
+    def _sampled(self, X: np.ndarray) -> np.ndarray:
+        """Sampled Shapley values `(n, d)` for the rows of `X`."""
+        n, d = X.shape
+        bg = self.background
+        phi = np.zeros((n, d))
+        for order in self._orders:
+            # every row paired with every background row: (n * B, d)
+            Z = np.repeat(bg[None, :, :], n, axis=0).reshape(-1, d)
+            prev = np.tile(self._predict(bg), n)
+            for feature in order:
+                Z[:, feature] = np.repeat(X[:, feature], len(bg))
+                cur = self._predict(Z)
+                phi[:, feature] += (cur - prev).reshape(n, len(bg)).mean(axis=1)
+                prev = cur
+        return phi / len(self._orders)
+
+    def _attribute(self, X: np.ndarray) -> np.ndarray:
+        """Attributions for distinct rows, using and filling the cache."""
+        out = np.empty((len(X), len(self.keys)))
+        keys = [row.tobytes() for row in X]
+        todo = [i for i, k in enumerate(keys) if k not in self._cache]
+        self.stats["cache_hits"] += len(X) - len(todo)
+        for i, k in enumerate(keys):
+            if k in self._cache:
+                out[i] = self._cache[k]
+        for start in range(0, len(todo), self.block_size):
+            rows = np.array(todo[start:start + self.block_size])
+            out[rows] = self._sampled(X[rows])
+        if len(self._cache) + len(todo) > self.cache_size:
+            self._cache.clear()
+        for i in todo[: self.cache_size]:
+            self._cache[keys[i]] = out[i]
+        return out
+
+    def explain(self, features: Any, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """Attributions for every row of `features`.
+
+        Returns a DataFrame with the value and contribution column of each
+        component, `base_value` and `total` (the model's score), aligned to
+        `index` (defaults to the frame's index when `features` is a DataFrame).
+        """
+        if index is None and isinstance(features, pd.DataFrame):
+            index = features.index
+        X = as_matrix(features)
+        out: Dict[str, np.ndarray] = {}
+        if self.exact:
+            scores, values, contributions = self.model.score(X)
+        else:
+            unique, inverse = np.unique(X, axis=0, return_inverse=True)
+            self.stats["unique"] += len(unique)
+            contributions = self._attribute(unique)[inverse.ravel()]
+            values = X
+            scores = self._predict(X)
+        self.stats["rows"] += len(X)
+        for i, (_, value_key, contribution_key) in enumerate(self.keys):
+            out[value_key] = values[:, i]
+            out[contribution_key] = contributions[:, i]
+        out["base_value"] = np.full(len(X), self.base_value)
+        out["total"] = scores
+        return pd.DataFrame(out, index=index)
+
+
+def component_frame(explanation: Mapping[str, Any]) -> pd.DataFrame:
+    """One explained row as a `component`/`value`/`contribution` table.
+
+    Accepts a row of `Attributor.explain` or a `compute_contributions` dict.
+    """
+    keys = ENGINE_KEYS if ENGINE_KEYS[0][2] in explanation else FEATURE_KEYS
+    return pd.DataFrame(
+        [
+            {"component": name, "value": explanation.get(value_key), "contribution": explanation.get(contribution_key)}
+            for name, value_key, contribution_key in keys
+        ]
+    )
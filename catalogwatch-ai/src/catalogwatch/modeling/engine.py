@@ -0,0 +1,91 @@
+"""Batched matrix scoring engine.
+
+A single implementation of the Phase 1 composite score. It maps a feature
+matrix to per-component values, multiplies them by the configured weights to
+get a contribution matrix, and sums and clamps that into scores.
+`scoring.simple_score` and `explainability.compute_contributions` (and their
+batch forms) are thin wrappers over it. The two can no longer drift apart.
+"""
+from __future__ import annotations
+
+import sys
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+# column order of the feature matrix
+FEATURE_COLUMNS = ["years_since_release", "has_reversion", "has_exclusive_license", "artist_owned", "ambiguous"]
+
+# column order of the component value / contribution matrices
+COMPONENTS = ["eligibility", "ownership_clarity", "exclusive_penalty"]
+
+_YEARS, _REVERSION, _EXCLUSIVE, _ARTIST_OWNED, _AMBIGUOUS = range(len(FEATURE_COLUMNS))
+
+
+def as_matrix(features: Any) -> np.ndarray:
+    """Return a float64 `(n, len(FEATURE_COLUMNS))` matrix.
+
+    Accepts a `FeatureMatrix`, a features frame, a single feature dict or an
+    array already in `FEATURE_COLUMNS` order.
+    """
+    if hasattr(features, "to_matrix"):
+        return features.to_matrix()
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(features, pd.DataFrame):
+        return features[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    if isinstance(features, dict):
+        row = []
+        for c in FEATURE_COLUMNS:
+            value = features.get(c)
+            row.append(float(value) if value is not None else (-1.0 if c == "years_since_release" else 0.0))
+        return np.array([row])
+    return np.atleast_2d(np.asarray(features, dtype=np.float64))
+
+
+class ScoringEngine:
+    """Vectorized composite scorer.
+
+    `config` is the `scoring` section of `configs/scoring.yml` as validated by
+    `registry.parse_scoring`; the registry builds one engine per snapshot.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.horizon = float(config["eligibility_horizon_years"])
+        clarity = config["ownership_clarity"]
+        self.clarity_base = float(clarity["base"])
+        self.clarity_ambiguous = float(clarity["ambiguous"])
+        self.clarity_artist_owned = float(clarity["artist_owned"])
+        self.exclusive_penalty = float(config["exclusive_penalty"])
+        self.weights = np.array([float(config["weights"][c]) for c in COMPONENTS])
+
+    def component_values(self, X: np.ndarray) -> np.ndarray:
+        """Map a feature matrix to the `(n, len(COMPONENTS))` component value matrix."""
+        years = X[:, _YEARS]
+        values = np.empty((X.shape[0], len(COMPONENTS)))
+        values[:, 0] = np.where(years < 0, 0.0, np.minimum(1.0, years / self.horizon))
+        values[:, 1] = (
+            self.clarity_base
+            + self.clarity_ambiguous * (X[:, _AMBIGUOUS] != 0)
+            + self.clarity_artist_owned * (X[:, _ARTIST_OWNED] != 0)
+        )
+        values[:, 2] = np.where(X[:, _EXCLUSIVE] != 0, self.exclusive_penalty, 0.0)
+        return values
+
+    def score(self, features: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score a batch in one pass.
+
+        Returns `(scores, values, contributions)`: clamped scores of shape
+        `(n,)` plus component values and weighted contributions of shape
+        `(n, len(COMPONENTS))`.
+        """
+        values = self.component_values(as_matrix(features))
+        contributions = values * self.weights
+        scores = np.clip(contributions.sum(axis=1), 0.0, 1.0)
+        return scores, values, contributions
+
+
+def get_engine() -> ScoringEngine:
+    """Engine of the current config snapshot; rebuilt only when `scoring.yml` changes."""
+    from catalogwatch.registry import current_rules
+
+    return current_rules().engine
@@ -1,52 +1,55 @@
 """Explainability helpers for Phase 1 deterministic scoring.
 
 Provides per-feature contribution breakdown consistent with `scoring.simple_score`.
+Both come from the same `modeling.engine.ScoringEngine` pass. Attributions
+for learned scorers live in `modeling.attribution`.
 """
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
+import numpy as np
 
-WEIGHTS = {
-    "eligibility": 0.6,
-    "ownership_clarity": 0.3,
-    "exclusive_penalty": 0.1,
-}
+from catalogwatch.modeling.engine import COMPONENTS, ScoringEngine, get_engine
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# output key names for each component's value and contribution
+VALUE_KEYS = ["eligibility_value", "ownership_clarity_value", "exclusive_penalty_value"]
+CONTRIBUTION_KEYS = ["eligibility_contribution", "ownership_contribution", "exclusive_contribution"]
+
+
+def _as_columns(scores: np.ndarray, values: np.ndarray, contributions: np.ndarray) -> Dict[str, np.ndarray]:
+    out: Dict[str, np.ndarray] = {}
+    for i in range(len(COMPONENTS)):
+        out[VALUE_KEYS[i]] = values[:, i]
+        out[CONTRIBUTION_KEYS[i]] = contributions[:, i]
+    out["total"] = scores
+    return out
 
 
 def compute_contributions(features: Dict[str, Any]) -> Dict[str, float]:
     """Compute per-feature contributions and total score.
 
-    This mirrors the logic in `scoring.simple_score` to keep explanations aligned.
     Returns a dict with per-component contributions and a `total` field.
     """
-    years = features.get("years_since_release", -1)
-    if years < 0:
-        eligibility = 0.0
-    else:
-        eligibility = min(1.0, years / 40.0)
-
-    ownership_clarity = 1.0
-    if features.get("ambiguous"):
-        ownership_clarity -= 0.5
-    if features.get("artist_owned"):
-        ownership_clarity += 0.2
-
-    exclusive_penalty = -0.2 if features.get("has_exclusive_license") else 0.0
-
-    contrib_elig = WEIGHTS["eligibility"] * eligibility
-    contrib_owner = WEIGHTS["ownership_clarity"] * ownership_clarity
-    contrib_excl = WEIGHTS["exclusive_penalty"] * exclusive_penalty
-
-    total = contrib_elig + contrib_owner + contrib_excl
-    total = max(0.0, min(1.0, total))
-
-    return {
-        "eligibility_value": eligibility,
-        "eligibility_contribution": contrib_elig,
-        "ownership_clarity_value": ownership_clarity,
-        "ownership_contribution": contrib_owner,
-        "exclusive_penalty_value": exclusive_penalty,
-        "exclusive_contribution": contrib_excl,
-        "total": total,
-    }
+    columns = _as_columns(*get_engine().score(features))
+    return {k: float(v[0]) for k, v in columns.items()}
+
+
+def compute_contributions_batch(
+    features: Any, index: Optional[pd.Index] = None, engine: Optional[ScoringEngine] = None
+) -> pd.DataFrame:
+    """Column-wise `compute_contributions` for a features frame or `FeatureMatrix`.
+
+    Returns a DataFrame with the same keys as the scalar version, aligned to
+    `index` (defaults to the frame's index when `features` is a DataFrame).
+    Scores with `engine`, by default the current config's.
+    """
+    import pandas as pd
+
+    if index is None and isinstance(features, pd.DataFrame):
+        index = features.index
+    return pd.DataFrame(_as_columns(*(engine or get_engine()).score(features)), index=index)
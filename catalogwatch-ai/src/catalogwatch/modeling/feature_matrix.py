@@ -0,0 +1,126 @@
+"""Compact array-backed feature store.
+
+`FeatureMatrix` keeps features for many records as a few contiguous arrays
+instead of one dict per record:
+
+- `numeric`: float32 block for continuous features (`NUMERIC_COLUMNS`)
+- `flags`: int8 block for binary ownership features (`FLAG_COLUMNS`)
+- `embeddings`: optional float32 `(n, dim)` block, memory-mappable on load
+
+It is built in bulk from an annotated frame, fed directly to
+`modeling.engine.ScoringEngine` and `NNScorer`, and saved as `.npy` files
+plus a small JSON schema so it can be reloaded without re-featurizing.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch.modeling.engine import FEATURE_COLUMNS
+from catalogwatch.modeling.features import features_from_columns
+from catalogwatch.registry import SIGNALS
+
+
+NUMERIC_COLUMNS = ["years_since_release"]
+FLAG_COLUMNS = ["has_reversion", "has_exclusive_license", "artist_owned", "ambiguous"]
+
+SCHEMA_FILE = "schema.json"
+
+
+class FeatureMatrix:
+    """Columnar features with a named-column schema."""
+
+    def __init__(self, numeric: np.ndarray, flags: np.ndarray, embeddings: Optional[np.ndarray] = None):
+        if len(numeric) != len(flags) or (embeddings is not None and len(embeddings) != len(numeric)):
+            raise ValueError("numeric, flags and embeddings must have the same number of rows")
+        self.numeric = numeric
+        self.flags = flags
+        self.embeddings = embeddings
+
+    @classmethod
+    def from_features(cls, features: pd.DataFrame, embeddings: Optional[np.ndarray] = None) -> "FeatureMatrix":
+        """Build from a frame produced by `features_from_columns`."""
+        numeric = np.ascontiguousarray(features[NUMERIC_COLUMNS].to_numpy(dtype=np.float32))
+        flags = np.ascontiguousarray(features[FLAG_COLUMNS].to_numpy(dtype=np.int8))
+        if embeddings is not None:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        return cls(numeric, flags, embeddings)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, embeddings: Optional[np.ndarray] = None) -> "FeatureMatrix":
+        """Build from an annotated frame (`years_since_release` and `signal_*` columns)."""
+        signals = pd.DataFrame(
+            {signal: frame[f"signal_{signal}"].to_numpy(dtype=bool) for signal in SIGNALS},
+            index=frame.index,
+        )
+        return cls.from_features(features_from_columns(frame["years_since_release"], signals), embeddings)
+
+    @property
+    def columns(self) -> List[str]:
+        return NUMERIC_COLUMNS + FLAG_COLUMNS
+
+    def __len__(self) -> int:
+        return len(self.numeric)
+
+    def __getitem__(self, rows: Any) -> "FeatureMatrix":
+        """Row selection (slice, index array or mask); slices return views."""
+        emb = self.embeddings[rows] if self.embeddings is not None else None
+        return FeatureMatrix(self.numeric[rows], self.flags[rows], emb)
+
+    def column(self, name: str) -> np.ndarray:
+        if name in NUMERIC_COLUMNS:
+            return self.numeric[:, NUMERIC_COLUMNS.index(name)]
+        return self.flags[:, FLAG_COLUMNS.index(name)]
+
+    def to_matrix(self, dtype: Any = np.float64) -> np.ndarray:
+        """Dense `(n, len(FEATURE_COLUMNS))` matrix in the scoring engine's column order."""
+        out = np.empty((len(self), len(FEATURE_COLUMNS)), dtype=dtype)
+        for i, name in enumerate(FEATURE_COLUMNS):
+            out[:, i] = self.column(name)
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name) for name in self.columns})
+
+    def nbytes(self) -> int:
+        emb = self.embeddings.nbytes if self.embeddings is not None else 0
+        return self.numeric.nbytes + self.flags.nbytes + emb
+
+    def save(self, directory: str) -> str:
+        """Write the blocks as `.npy` files plus `schema.json` under `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "numeric.npy"), self.numeric)
+        np.save(os.path.join(directory, "flags.npy"), self.flags)
+        schema: Dict[str, Any] = {
+            "rows": len(self),
+            "numeric_columns": NUMERIC_COLUMNS,
+            "flag_columns": FLAG_COLUMNS,
+            "embedding_dim": None,
+        }
+        if self.embeddings is not None:
+            np.save(os.path.join(directory, "embeddings.npy"), self.embeddings)
+            schema["embedding_dim"] = int(self.embeddings.shape[1])
+        with open(os.path.join(directory, SCHEMA_FILE), "w", encoding="utf-8") as fh:
+            json.dump(schema, fh, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "FeatureMatrix":
+        """Load a saved matrix; by default every block is memory-mapped read-only.
+
+        Raises ValueError if the stored column schema differs from this version's.
+        """
+        with open(os.path.join(directory, SCHEMA_FILE), "r", encoding="utf-8") as fh:
+            schema = json.load(fh)
+        if schema["numeric_columns"] != NUMERIC_COLUMNS or schema["flag_columns"] != FLAG_COLUMNS:
+            raise ValueError(f"Feature schema mismatch in {directory}")
+        numeric = np.load(os.path.join(directory, "numeric.npy"), mmap_mode=mmap_mode)
+        flags = np.load(os.path.join(directory, "flags.npy"), mmap_mode=mmap_mode)
+        embeddings = None
+        if schema.get("embedding_dim") is not None:
+            embeddings = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode=mmap_mode)
+        return cls(numeric, flags, embeddings)
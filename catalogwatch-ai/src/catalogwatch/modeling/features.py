@@ -1,9 +1,17 @@
 """Feature engineering utilities."""
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
 import numpy as np
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# shared read-only placeholder so per-record features don't allocate an array each
+_ZERO_EMBEDDING = np.zeros(8, dtype=float)
+_ZERO_EMBEDDING.setflags(write=False)
+
 
 def feature_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
     """Create a small feature dict from a canonical record.
@@ -21,6 +29,33 @@ def feature_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
         "ambiguous": 1 if signals.get("ambiguous") else 0,
     }
 
-    # ownership embedding placeholder (could be large) - for now small zeros
-    features["ownership_embedding"] = np.zeros(8, dtype=float)
+    # ownership embedding placeholder (could be large) - for now small zeros;
+    # columnar callers should use `feature_matrix.FeatureMatrix` instead
+    features["ownership_embedding"] = _ZERO_EMBEDDING
     return features
+
+
+def features_from_columns(years: pd.Series, signals: pd.DataFrame) -> pd.DataFrame:
+    """Build the `feature_from_record` fields for many records at once.
+
+    `years` may contain missing values (mapped to -1) and `signals` holds one
+    boolean column per ownership signal. The embedding placeholder is omitted.
+    """
+    import pandas as pd
+
+    def flag(name: str) -> np.ndarray:
+        if name not in signals:
+            return np.zeros(len(signals), dtype=np.int8)
+        return signals[name].to_numpy(dtype=bool).astype(np.int8)
+
+    yrs = pd.to_numeric(years, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return pd.DataFrame(
+        {
+            "years_since_release": np.where(np.isnan(yrs), -1, yrs).astype(np.int64),
+            "has_reversion": flag("reversion"),
+            "has_exclusive_license": flag("exclusive_license"),
+            "artist_owned": flag("artist_owned"),
+            "ambiguous": flag("ambiguous"),
+        },
+        index=signals.index,
+    )
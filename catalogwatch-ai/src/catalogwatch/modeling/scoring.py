@@ -1,48 +1,208 @@
-"""Scoring and a neural-ready scaffold."""
+"""Composite scoring and a trainable NumPy MLP scorer."""
 from __future__ import annotations
 
+import json
 from typing import Dict, Any
 import numpy as np
 
+from catalogwatch.modeling.engine import FEATURE_COLUMNS, as_matrix, get_engine
+
 
 def simple_score(features: Dict[str, Any]) -> float:
     """Deterministic composite score (0..1) for Phase 1 demo.
 
-    Weights are illustrative and fixed; later this becomes a trainable model.
+    Weights come from `configs/scoring.yml`; see `modeling.engine`.
     """
-    years = features.get("years_since_release", -1)
-    # eligibility proximity: map years to [0,1] with a soft cap
-    if years < 0:
-        eligibility = 0.0
-    else:
-        eligibility = min(1.0, years / 40.0)
-
-    ownership_clarity = 1.0
-    if features.get("ambiguous"):
-        ownership_clarity -= 0.5
-    if features.get("artist_owned"):
-        ownership_clarity += 0.2
+    scores, _, _ = get_engine().score(features)
+    return float(scores[0])
 
-    exclusive_penalty = -0.2 if features.get("has_exclusive_license") else 0.0
 
-    score = 0.6 * eligibility + 0.3 * ownership_clarity + 0.1 * exclusive_penalty
-    # clamp
-    return float(max(0.0, min(1.0, score)))
+def simple_score_batch(features: Any) -> np.ndarray:
+    """Vectorized `simple_score` over a features frame or `FeatureMatrix`."""
+    scores, _, _ = get_engine().score(features)
+    return scores
 
 
 class NNScorer:
-    """Placeholder NN scorer with fit/predict API. Not implemented for Phase 1.
+    """Small NumPy MLP scorer over the feature matrix.
 
-    This class provides a simple API that's easy to replace with a PyTorch/Keras model.
+    One ReLU hidden layer and a sigmoid output, trained with mini-batch Adam on
+    a cross-entropy loss against targets in [0, 1] (for example `simple_score`
+    outputs or analyst labels). Inputs are standardized with statistics from
+    `fit`. Training holds out `validation_fraction` of the rows and stops once
+    the validation loss has not improved for `patience` epochs, keeping the best
+    weights. Until `fit` or `load` is called, `predict` returns zeros.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        hidden: int = 16,
+        learning_rate: float = 0.01,
+        batch_size: int = 256,
+        max_epochs: int = 200,
+        patience: int = 10,
+        validation_fraction: float = 0.1,
+        l2: float = 0.0,
+        seed: int = 0,
+    ):
+        self.hidden = hidden
+        self.learning_rate = learning_rate
+        self.batch_size = batch_size
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.validation_fraction = validation_fraction
+        self.l2 = l2
+        self.seed = seed
         self.is_trained = False
+        self.params: Dict[str, np.ndarray] = {}
+        self.history: Dict[str, list] = {"train_loss": [], "val_loss": []}
+
+    # -- model --------------------------------------------------------------
+
+    def _init_params(self, n_features: int, rng: np.random.Generator) -> None:
+        self.params = {
+            "W1": (rng.normal(size=(n_features, self.hidden)) * np.sqrt(2.0 / n_features)).astype(np.float32),
+            "b1": np.zeros(self.hidden, dtype=np.float32),
+            "W2": (rng.normal(size=(self.hidden, 1)) * np.sqrt(1.0 / self.hidden)).astype(np.float32),
+            "b2": np.zeros(1, dtype=np.float32),
+        }
+
+    def _standardize(self, X: np.ndarray) -> np.ndarray:
+        return (X - self.params["mean"]) / self.params["scale"]
+
+    def _forward(self, Xs: np.ndarray):
+        h = np.maximum(Xs @ self.params["W1"] + self.params["b1"], 0.0)
+        logits = (h @ self.params["W2"] + self.params["b2"])[:, 0]
+        return h, 1.0 / (1.0 + np.exp(-logits))
+
+    @staticmethod
+    def _loss(p: np.ndarray, y: np.ndarray) -> float:
+        p = np.clip(p, 1e-7, 1 - 1e-7)
+        return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+    # -- training -----------------------------------------------------------
+
+    def fit(self, X, y) -> "NNScorer":
+        """Train on features `X` (anything `as_matrix` accepts) and targets `y` in [0, 1].
+
+        Keeps the weights of the epoch with the lowest validation loss, or the
+        initial weights if no epoch ran (`max_epochs=0`).
+        """
+        X = as_matrix(X).astype(np.float32)
+        y = np.asarray(y, dtype=np.float32).ravel()
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same number of rows")
+        if not len(X):
+            raise ValueError("Cannot fit on an empty feature matrix")
+        if not np.isfinite(y).all():
+            raise ValueError("Targets must be finite")
+        y = np.clip(y, 0.0, 1.0)
+        rng = np.random.default_rng(self.seed)
 
-    def fit(self, X, y):
-        # no-op for Phase 1; would train a small feed-forward net later
+        order = rng.permutation(len(X))
+        n_val = int(len(X) * self.validation_fraction) if len(X) >= 10 else 0
+        val, train = order[:n_val], order[n_val:]
+
+        self._init_params(X.shape[1], rng)
+        scale = X[train].std(axis=0)
+        self.params["mean"] = X[train].mean(axis=0)
+        self.params["scale"] = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        Xs = self._standardize(X)
+
+        trainable = ("W1", "b1", "W2", "b2")
+        m = {k: np.zeros_like(self.params[k]) for k in trainable}
+        v = {k: np.zeros_like(self.params[k]) for k in trainable}
+        beta1, beta2, eps, step = 0.9, 0.999, 1e-8, 0
+        best, best_loss, stale = None, np.inf, 0
+        self.history = {"train_loss": [], "val_loss": []}
+
+        for _ in range(self.max_epochs):
+            rng.shuffle(train)
+            for start in range(0, len(train), self.batch_size):
+                batch = train[start:start + self.batch_size]
+                xb, yb = Xs[batch], y[batch]
+                h, p = self._forward(xb)
+                # d(cross-entropy)/d(logit) for a sigmoid output
+                dz = ((p - yb) / len(batch))[:, None]
+                dh = (dz @ self.params["W2"].T) * (h > 0)
+                grads = {
+                    "W2": h.T @ dz + self.l2 * self.params["W2"],
+                    "b2": dz.sum(axis=0),
+                    "W1": xb.T @ dh + self.l2 * self.params["W1"],
+                    "b1": dh.sum(axis=0),
+                }
+                step += 1
+                for k in trainable:
+                    m[k] = beta1 * m[k] + (1 - beta1) * grads[k]
+                    v[k] = beta2 * v[k] + (1 - beta2) * grads[k] ** 2
+                    m_hat = m[k] / (1 - beta1 ** step)
+                    v_hat = v[k] / (1 - beta2 ** step)
+                    self.params[k] = (self.params[k] - self.learning_rate * m_hat / (np.sqrt(v_hat) + eps)).astype(np.float32)
+
+            self.history["train_loss"].append(self._loss(self._forward(Xs[train])[1], y[train]))
+            monitor = val if len(val) else train
+            loss = self._loss(self._forward(Xs[monitor])[1], y[monitor])
+            self.history["val_loss"].append(loss)
+            if loss < best_loss - 1e-6:
+                best_loss, stale = loss, 0
+                best = {k: self.params[k].copy() for k in trainable}
+            else:
+                stale += 1
+                if stale >= self.patience:
+                    break
+
+        if best is not None:
+            self.params.update(best)
         self.is_trained = True
+        return self
+
+    # -- inference ----------------------------------------------------------
+
+    def predict(self, X, block_size: int = 65_536) -> np.ndarray:
+        """Scores in [0, 1] for features `X`, computed in blocks of `block_size` rows."""
+        if hasattr(X, "to_matrix"):
+            X = X.to_matrix(np.float32)
+        X = as_matrix(X)
+        out = np.zeros(len(X), dtype=np.float64)
+        if not self.is_trained:
+            return out
+        for start in range(0, len(X), block_size):
+            block = X[start:start + block_size].astype(np.float32, copy=False)
+            out[start:start + block_size] = self._forward(self._standardize(block))[1]
+        return out
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> str:
+        """Write hyperparameters and weights to a single `.npz` file."""
+        if not self.is_trained:
+            raise ValueError("Cannot save an untrained NNScorer")
+        config = {
+            "hidden": self.hidden,
+            "learning_rate": self.learning_rate,
+            "batch_size": self.batch_size,
+            "max_epochs": self.max_epochs,
+            "patience": self.patience,
+            "validation_fraction": self.validation_fraction,
+            "l2": self.l2,
+            "seed": self.seed,
+            "feature_columns": FEATURE_COLUMNS,
+        }
+        np.savez(path, config=np.array(json.dumps(config)), **self.params)
+        return path if path.endswith(".npz") else path + ".npz"
+
+    @classmethod
+    def load(cls, path: str) -> "NNScorer":
+        """Load a model written by `save`.
 
-    def predict(self, X):
-        # Accepts array-like features and returns placeholder scores
-        return [0.0 for _ in range(len(X))]
+        Raises ValueError if it was trained on different feature columns.
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            params = {k: data[k] for k in data.files if k != "config"}
+        if config.pop("feature_columns") != FEATURE_COLUMNS:
+            raise ValueError(f"Feature columns of {path} do not match this version")
+        model = cls(**config)
+        model.params = params
+        model.is_trained = True
+        return model
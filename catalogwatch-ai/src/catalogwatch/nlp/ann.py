@@ -0,0 +1,296 @@
+"""Approximate nearest-neighbour search over note embeddings (IVF, NumPy only).
+
+`IVFIndex` partitions unit-normalized vectors into `n_lists` cells with
+spherical k-means. Vectors are kept sorted by cell so each cell is one
+contiguous slice; a query scores the centroids, then only the vectors of the
+`nprobe` closest cells. Similarity is cosine (dot product of unit vectors).
+
+Adds are buffered and merged on the next search, removal or save, so
+streaming many batches in does not re-sort the index each time. Centroids are
+trained on the first batch added and reused for later adds until the index
+has grown to `RETRAIN_GROWTH` times the rows they were trained on; the merge
+then retrains (with a list count for the new size unless `n_lists` was given)
+and reassigns every vector, so an index grown by chunks or incremental runs
+keeps cells sized for its contents.
+
+Ingest keeps one index of ownership-note embeddings per stored dataset at
+`<path>/<name>.ann/` (see `index_path`), keyed on `catalog_id`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch.nlp.embeddings import batch_text_to_vectors, normalize_text
+from catalogwatch.services.instrumentation import stage
+from catalogwatch.services.store import _replace_dir
+
+
+META_FILE = "meta.json"
+
+# dimension of the ownership-note embeddings indexed at ingest
+NOTE_DIM = 384
+
+# rows scored per matrix product while training / assigning
+_BLOCK = 65_536
+
+# retrain once the index holds this many times the rows centroids were fit on
+RETRAIN_GROWTH = 2
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class IVFIndex:
+    """Inverted-file index mapping ids to unit vectors."""
+
+    def __init__(self, dim: int, n_lists: Optional[int] = None, nprobe: int = 8, seed: int = 0):
+        self.dim = dim
+        self.n_lists = n_lists
+        # list count asked for; None sizes it from the rows at each training
+        self.requested_lists = n_lists
+        self.trained_rows = 0
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.ids = np.empty(0, dtype=object)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.lists = np.empty(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._id_index: Optional[pd.Index] = None
+        self.meta: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        self._merge()
+        return len(self.ids)
+
+    # -- training -----------------------------------------------------------
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _BLOCK):
+            block = vectors[start:start + _BLOCK]
+            out[start:start + _BLOCK] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, vectors: np.ndarray, iterations: int = 10) -> None:
+        """Fit cell centroids with spherical k-means on (a sample of) `vectors`."""
+        vectors = _unit(vectors)
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.requested_lists or int(np.clip(np.sqrt(len(vectors)), 1, 4096))
+        n_lists = max(1, min(n_lists, len(vectors)))
+        sample = vectors
+        if len(vectors) > 64 * n_lists:
+            sample = vectors[rng.choice(len(vectors), 64 * n_lists, replace=False)]
+        self.centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assign, sample)
+            empty = ~sums.any(axis=1)
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = _unit(sums)
+        self.n_lists = n_lists
+        self.trained_rows = len(vectors)
+
+    # -- updates ------------------------------------------------------------
+
+    def add(self, ids: Any, vectors: np.ndarray) -> None:
+        """Add or replace vectors for `ids`; trains centroids on first use."""
+        ids = np.asarray(pd.Series(ids, dtype=object).astype(str), dtype=object)
+        vectors = _unit(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return
+        if self.centroids is None:
+            self.train(vectors)
+        self._pending.append((ids, self._assign(vectors), vectors))
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Drop `ids` from the index; returns how many rows were removed."""
+        self._merge()
+        drop = pd.Index(list(ids), dtype=object)
+        keep = ~pd.Index(self.ids).isin(drop)
+        removed = int((~keep).sum())
+        if removed:
+            self._rebuild(self.ids[keep], self.lists[keep], self.vectors[keep])
+        return removed
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        ids = np.concatenate([self.ids] + [p[0] for p in self._pending])
+        lists = np.concatenate([self.lists] + [p[1] for p in self._pending])
+        vectors = np.concatenate([self.vectors] + [p[2] for p in self._pending])
+        self._pending = []
+        # re-added ids replace their earlier vectors
+        keep = ~pd.Index(ids).duplicated(keep="last")
+        ids, vectors = ids[keep], vectors[keep]
+        if len(ids) >= RETRAIN_GROWTH * self.trained_rows:
+            self.train(vectors)
+            lists = self._assign(vectors)
+        else:
+            lists = lists[keep]
+        self._rebuild(ids, lists, vectors)
+
+    def _rebuild(self, ids: np.ndarray, lists: np.ndarray, vectors: np.ndarray) -> None:
+        order = np.argsort(lists, kind="stable")
+        self.ids = ids[order]
+        self.lists = lists[order]
+        self.vectors = np.ascontiguousarray(vectors[order])
+        counts = np.bincount(self.lists, minlength=self.n_lists or 0)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._id_index = None
+
+    # -- queries ------------------------------------------------------------
+
+    def vector(self, item_id: str) -> np.ndarray:
+        """Stored vector for `item_id`; raises KeyError if it is not indexed."""
+        self._merge()
+        if self._id_index is None:
+            self._id_index = pd.Index(self.ids)
+        return self.vectors[self._id_index.get_loc(item_id)]
+
+    def search(
+        self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None, exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to `k` `(id, cosine similarity)` pairs, most similar first."""
+        self._merge()
+        if self.centroids is None or not len(self.ids):
+            return []
+        q = _unit(query)[0]
+        probe = np.argsort(-(self.centroids @ q))[: nprobe or self.nprobe]
+        rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe])
+        scores = self.vectors[rows] @ q
+        if exclude is not None:
+            scores[self.ids[rows] == exclude] = -np.inf
+        take = min(k, int(np.isfinite(scores).sum()))
+        if take <= 0:
+            return []
+        best = np.argpartition(-scores, take - 1)[:take]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.ids[rows[i]], float(scores[i])) for i in best]
+
+    def top_k_similar(self, item_id: str, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Nearest neighbours of an indexed id, excluding the id itself."""
+        return self.search(self.vector(item_id), k, nprobe=nprobe, exclude=item_id)
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, directory: str, extra: Optional[Dict[str, Any]] = None) -> str:
+        """Write the index as `.npy` arrays plus `meta.json` under `directory`.
+
+        Files go to a temporary directory that replaces `directory` once
+        complete, so an index loaded from `directory` (whose vectors may be
+        memory-mapped) can be saved back over itself.
+        """
+        self._merge()
+        if self.centroids is None:
+            raise ValueError("Cannot save an empty index")
+        tmp = directory + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "centroids.npy"), self.centroids)
+        np.save(os.path.join(tmp, "vectors.npy"), self.vectors)
+        np.save(os.path.join(tmp, "lists.npy"), self.lists)
+        np.save(os.path.join(tmp, "ids.npy"), self.ids.astype(str))
+        meta = {
+            "dim": self.dim,
+            "n_lists": self.n_lists,
+            "requested_lists": self.requested_lists,
+            "trained_rows": self.trained_rows,
+            "nprobe": self.nprobe,
+            "seed": self.seed,
+            "rows": len(self.ids),
+        }
+        meta.update(extra or {})
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+        _replace_dir(tmp, directory)
+        self.meta = meta
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "IVFIndex":
+        """Load a saved index; vectors are memory-mapped read-only by default."""
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        index = cls(meta["dim"], n_lists=meta["n_lists"], nprobe=meta["nprobe"], seed=meta["seed"])
+        index.requested_lists = meta.get("requested_lists")
+        index.trained_rows = meta.get("trained_rows", meta["rows"])
+        index.centroids = np.load(os.path.join(directory, "centroids.npy"))
+        index.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mmap_mode)
+        index.lists = np.load(os.path.join(directory, "lists.npy"))
+        index.ids = np.load(os.path.join(directory, "ids.npy")).astype(object)
+        counts = np.bincount(index.lists, minlength=index.n_lists)
+        index.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        index.meta = meta
+        return index
+
+
+# -- ownership-note index ------------------------------------------------------
+
+
+def index_path(name: str, path: str = "data/ingested") -> str:
+    """Directory of the note index stored alongside dataset `name`."""
+    return os.path.join(path, f"{name}.ann")
+
+
+def note_vectors(ids: Any, notes: Any, cache_dir: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Embed ownership notes, skipping rows whose note is missing or blank.
+
+    Vectors are cached in `cache_dir` (default `embeddings.embedding_cache_dir()`).
+    Returns the kept ids (as strings) and their vectors.
+    """
+    ids = pd.Series(ids, dtype=object).astype(str).to_numpy(dtype=object)
+    notes = pd.Series(notes, dtype=object).tolist()
+    with stage("embed", rows=len(notes)):
+        keep = np.fromiter((bool(normalize_text(n)) for n in notes), dtype=bool, count=len(notes))
+        vectors = batch_text_to_vectors([n for n, k in zip(notes, keep) if k], dim=NOTE_DIM, cache_dir=cache_dir)
+    return ids[keep], vectors
+
+
+def add_notes(index: IVFIndex, ids: Any, notes: Any, cache_dir: Optional[str] = None) -> None:
+    """Embed `notes` and add them to `index` under `ids` (blank notes are skipped)."""
+    kept, vectors = note_vectors(ids, notes, cache_dir)
+    index.add(kept, vectors)
+
+
+def build_note_index(
+    ids: Any, notes: Any, n_lists: Optional[int] = None, nprobe: int = 8, cache_dir: Optional[str] = None
+) -> IVFIndex:
+    """Build an index over the ownership notes of a whole catalog."""
+    kept, vectors = note_vectors(ids, notes, cache_dir)
+    index = IVFIndex(NOTE_DIM, n_lists=n_lists, nprobe=nprobe)
+    index.add(kept, vectors)
+    return index
+
+
+def load_note_index(name: str, path: str = "data/ingested") -> Optional[IVFIndex]:
+    """Load the note index stored next to dataset `name`, or None if there is none."""
+    directory = index_path(name, path)
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        return None
+    return IVFIndex.load(directory)
+
+
+def save_note_index(index: IVFIndex, name: str, path: str = "data/ingested") -> str:
+    """Persist `index` next to dataset `name`; an empty index removes the stored one."""
+    directory = index_path(name, path)
+    if len(index):
+        index.save(directory)
+    else:
+        shutil.rmtree(directory, ignore_errors=True)
+    return directory
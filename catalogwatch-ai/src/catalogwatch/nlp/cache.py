@@ -0,0 +1,134 @@
+"""Size-bounded LRU cache of ownership-note match results.
+
+Feeds repeat boilerplate contract clauses across thousands of tracks, so the
+batch parser matches each distinct note once (see
+`SignalMatcher.match_series`). `NoteCache` carries those results across
+batches and runs: it maps a 64-bit hash of the normalized note to its signal
+bitmask and evicts the least recently used entries beyond `max_entries`.
+
+Hashes are keyed with the cache `version`, a digest of the keyword table
+(`keywords_version`), so editing `KEYWORDS` changes every key; `load` also
+skips files written under another version. Ingest keeps the cache at
+`<path>/note_cache.npz` (see `note_cache_path`).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+# about 100 bytes per entry in memory, 16 on disk
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def keywords_version(keywords: Dict[str, List[str]]) -> str:
+    """16-character digest of a keyword table; used as the hash key of `NoteCache`."""
+    blob = json.dumps(keywords, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()[:16]
+
+
+def note_cache_path(path: str = "data/ingested") -> str:
+    return os.path.join(path, "note_cache.npz")
+
+
+class NoteCache:
+    """Normalized-note hash -> signal bitmask, least recently used evicted first.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, version: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if len(version) != 16:
+            raise ValueError("version must be a 16-character key, see keywords_version")
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self, texts: Sequence[str]) -> np.ndarray:
+        """uint64 keys for normalized note texts."""
+        from pandas.util import hash_array
+
+        return hash_array(np.asarray(texts, dtype=object), hash_key=self.version, categorize=False)
+
+    def get_many(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return `(masks, found)` for `keys`; masks are 0 where not found."""
+        masks = np.zeros(len(keys), dtype=np.int64)
+        found = np.zeros(len(keys), dtype=bool)
+        with self._lock:
+            entries = self._entries
+            for i, key in enumerate(keys.tolist()):
+                mask = entries.get(key)
+                if mask is not None:
+                    entries.move_to_end(key)
+                    masks[i] = mask
+                    found[i] = True
+            hits = int(found.sum())
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return masks, found
+
+    def put_many(self, keys: np.ndarray, masks: np.ndarray) -> None:
+        with self._lock:
+            self._entries.update(zip(keys.tolist(), masks.tolist()))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> str:
+        """Write entries (oldest first) to `path` atomically."""
+        with self._lock:
+            keys = np.fromiter(self._entries.keys(), dtype=np.uint64, count=len(self._entries))
+            masks = np.fromiter(self._entries.values(), dtype=np.int64, count=len(self._entries))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, keys=keys, masks=masks, version=np.array(self.version))
+        os.replace(tmp, path)
+        return path
+
+    def load(self, path: str) -> int:
+        """Add the entries saved at `path` under this version; returns how many were added.
+
+        A missing file or one written for other keywords adds nothing.
+        """
+        if not os.path.exists(path):
+            return 0
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["version"]) != self.version:
+                return 0
+            keys, masks = data["keys"], data["masks"]
+        # saved oldest first; keep entries already in memory as the most recent
+        with self._lock:
+            current = self._entries
+            self._entries = OrderedDict(zip(keys.tolist(), masks.tolist()))
+            self._entries.update(current)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return len(keys)
@@ -1,17 +1,162 @@
-"""Embeddings placeholder and interface.
+"""Embedding backends and a batched, cached embedder.
 
-Phase 1: returns a zero vector. Interface is ready to be swapped with a real model.
+`EmbeddingBackend` is the interface a real model plugs into (for example a
+CPU sentence-transformer): it embeds one fixed-size batch of normalized texts.
+`Embedder` sits in front of a backend. It normalizes and deduplicates texts,
+serves repeats from a `VectorCache` on disk and sends only unseen texts to the
+backend in batches of `batch_size`. `HashingBackend` is a deterministic,
+CPU-only hashed character n-gram encoder used by default and in tests.
+
+The module-level helpers share one `Embedder` per dimension and cache
+directory, by default `<data path>/embeddings` (see `embedding_cache_dir`), so
+re-ingesting a dataset or reloading the dashboard only embeds notes not seen
+before.
 """
 from __future__ import annotations
 
+import abc
+import hashlib
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
 import numpy as np
-from typing import Iterable
+import pandas as pd
+
+from catalogwatch.nlp.vector_cache import VectorCache
+
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Casefold and collapse whitespace; missing or non-string values become ""."""
+    if not isinstance(text, str):
+        return ""
+    return _WS.sub(" ", text).strip().casefold()
+
+
+def text_key(normalized: str) -> int:
+    """Stable 64-bit key for a normalized text."""
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EmbeddingBackend(abc.ABC):
+    """Interface for embedding models. Subclasses implement `embed_batch`."""
+
+    dim: int = 384
+    backend_id: str = "base"
+
+    @abc.abstractmethod
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed normalized texts into a float32 `(len(texts), dim)` array."""
+
+
+class ZeroBackend(EmbeddingBackend):
+    """The Phase 1 placeholder: every text maps to the zero vector."""
+
+    backend_id = "zero"
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+
+class HashingBackend(EmbeddingBackend):
+    """Signed feature hashing of character n-grams, L2-normalized.
+
+    Deterministic across processes and platforms (CRC32 based), so it is
+    suitable for tests and as a baseline for similarity search.
+    """
+
+    backend_id = "hashing"
+
+    def __init__(self, dim: int = 384, ngram_range: Sequence[int] = (3, 4)):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.backend_id = f"hashing{self.ngram_range[0]}{self.ngram_range[1]}"
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        lo, hi = self.ngram_range
+        for row, text in enumerate(texts):
+            padded = f" {text} "
+            grams = [padded[i:i + n] for n in range(lo, hi + 1) for i in range(len(padded) - n + 1)]
+            if not grams:
+                continue
+            h = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32, count=len(grams))
+            sign = np.where(h >> 31, -1.0, 1.0)
+            out[row] = np.bincount(h % self.dim, weights=sign, minlength=self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class Embedder:
+    """Batched, deduplicating, cache-backed front end for an `EmbeddingBackend`."""
+
+    def __init__(self, backend: EmbeddingBackend, cache_dir: Optional[str] = None, batch_size: int = 256):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.cache = VectorCache(cache_dir, backend.dim, backend.backend_id) if cache_dir else None
+        self.stats: Dict[str, int] = {"requested": 0, "unique": 0, "cache_hits": 0, "computed": 0}
+
+    @property
+    def dim(self) -> int:
+        return self.backend.dim
+
+    def embed(self, texts: Iterable[Optional[str]]) -> np.ndarray:
+        """Embed `texts`, returning a float32 `(n, dim)` array in input order."""
+        normalized = [normalize_text(t) for t in texts]
+        codes, uniques = pd.factorize(pd.Series(normalized, dtype=object))
+        uniques = list(uniques)
+        vectors = np.empty((len(uniques), self.dim), dtype=np.float32)
+
+        keys = [text_key(u) for u in uniques]
+        missing = np.arange(len(uniques))
+        if self.cache is not None and len(self.cache):
+            rows = self.cache.lookup(keys)
+            hit = rows >= 0
+            vectors[hit] = self.cache.vectors[rows[hit]]
+            missing = np.flatnonzero(~hit)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            vectors[batch] = self.backend.embed_batch([uniques[i] for i in batch])
+        if self.cache is not None and len(missing):
+            self.cache.add([keys[i] for i in missing], vectors[missing])
+
+        self.stats["requested"] += len(normalized)
+        self.stats["unique"] += len(uniques)
+        self.stats["cache_hits"] += len(uniques) - len(missing)
+        self.stats["computed"] += len(missing)
+        return vectors[codes] if len(codes) else np.empty((0, self.dim), dtype=np.float32)
+
+
+def embedding_cache_dir(path: str = "data/ingested") -> str:
+    """Vector cache directory kept with the datasets under `path`."""
+    return os.path.join(path, "embeddings")
+
+
+@lru_cache(maxsize=8)
+def _embedder(dim: int, cache_dir: str) -> Embedder:
+    return Embedder(HashingBackend(dim=dim), cache_dir=cache_dir)
+
+
+def get_embedder(dim: int = 384, cache_dir: Optional[str] = None) -> Embedder:
+    """Process-wide hashing embedder caching vectors in `cache_dir` (default `embedding_cache_dir()`)."""
+    return _embedder(dim, os.path.abspath(cache_dir or embedding_cache_dir()))
 
 
-def text_to_vector(text: str, dim: int = 384) -> np.ndarray:
-    """Return a placeholder vector for `text`. Replace with model inference later."""
-    return np.zeros(dim, dtype=float)
+def text_to_vector(text: str, dim: int = 384, cache_dir: Optional[str] = None) -> np.ndarray:
+    """Embed a single text with the default (hashing) backend."""
+    return get_embedder(dim, cache_dir).embed([text])[0]
 
 
-def batch_text_to_vectors(texts: Iterable[str], dim: int = 384):
-    return np.vstack([text_to_vector(t, dim=dim) for t in texts])
+def batch_text_to_vectors(texts: Iterable[str], dim: int = 384, cache_dir: Optional[str] = None) -> np.ndarray:
+    """Embed many texts at once with the default (hashing) backend."""
+    return get_embedder(dim, cache_dir).embed(texts)
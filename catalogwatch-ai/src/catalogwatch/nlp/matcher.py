@@ -0,0 +1,211 @@
+"""Compiled single-pass multi-pattern matcher for ownership notes.
+
+All literal keyword patterns are folded into one case-insensitive regex that is
+scanned once per note. The regex uses a lookahead so that a match is reported
+at every position where some pattern starts, longest alternative first. Any
+other pattern occurring at that position is necessarily a substring of the
+longest one, so the set of patterns contained in each alternative is
+precomputed and expanded on a hit. ASCII notes are lowercased and scanned
+case-sensitively, which is several times faster than IGNORECASE. Patterns that are real regular expressions
+(not plain literals) are compiled once and searched individually.
+"""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from catalogwatch.nlp.cache import NoteCache
+
+
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+# (signal, pattern, start, end)
+Span = Tuple[str, str, int, int]
+
+
+def _is_literal(pattern: str) -> bool:
+    return not any(ch in _REGEX_META for ch in pattern)
+
+
+def normalize_note(text: str) -> str:
+    """Form under which notes are deduplicated: trimmed, and lower-cased if ASCII.
+
+    Matching is case-insensitive and patterns do not start or end with
+    whitespace, so notes with the same normalized form match the same signals.
+    """
+    text = text.strip()
+    return text.lower() if text.isascii() else text
+
+
+class SignalMatcher:
+    """Find every `KEYWORDS`-style signal category in a note with one scan.
+
+    `keywords` maps a signal name to its list of patterns. Duplicate patterns
+    within a category are dropped; evidence is reported in category order and
+    then pattern order, as `parse_ownership_notes` does.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.signals: List[str] = list(keywords)
+        # one entry per (signal, pattern), deduplicated within each signal
+        self._entries: List[Tuple[str, str]] = []
+        for signal, patterns in keywords.items():
+            for p in dict.fromkeys(patterns):
+                self._entries.append((signal, p))
+
+        literals: Dict[str, List[int]] = {}
+        self._regex_entries: List[Tuple[int, "re.Pattern[str]"]] = []
+        for idx, (_, p) in enumerate(self._entries):
+            if _is_literal(p):
+                literals.setdefault(p.lower(), []).append(idx)
+            else:
+                self._regex_entries.append((idx, re.compile(p, re.IGNORECASE)))
+
+        # for each literal alternative: (entry index, offset, length) of every
+        # literal entry that occurs inside it, including itself
+        self._contained: Dict[str, List[Tuple[int, int, int]]] = {}
+        for outer in literals:
+            hits: List[Tuple[int, int, int]] = []
+            for inner, idxs in literals.items():
+                offset = outer.find(inner)
+                while offset >= 0:
+                    hits.extend((idx, offset, len(inner)) for idx in idxs)
+                    offset = outer.find(inner, offset + 1)
+            self._contained[outer] = hits
+
+        # signal bitmask and entry indices implied by each literal alternative
+        self._alternatives: List[str] = sorted(literals, key=len, reverse=True)
+        self._mask: Dict[str, int] = {}
+        self._implied: Dict[str, Tuple[int, ...]] = {}
+        for alt in self._alternatives:
+            idxs = tuple(sorted({idx for idx, _, _ in self._contained[alt]}))
+            self._implied[alt] = idxs
+            mask = 0
+            for idx in idxs:
+                mask |= 1 << self.signals.index(self._entries[idx][0])
+            self._mask[alt] = mask
+
+        self._literal_regex = None
+        self._literal_regex_ci = None
+        if literals:
+            body = "|".join(re.escape(a) for a in self._alternatives)
+            # non-ASCII notes use the IGNORECASE form and identify the
+            # alternative by group index
+            self._literal_regex = re.compile("(?=(" + body + "))")
+            self._literal_regex_ci = re.compile(
+                "(?=(?:" + "|".join(f"({re.escape(a)})" for a in self._alternatives) + "))", re.IGNORECASE
+            )
+
+    def _literal_hits(self, text: str) -> List[Tuple[int, str]]:
+        """Return `(start, alternative)` for every literal alternative hit in `text`."""
+        if self._literal_regex is None:
+            return []
+        if text.isascii():
+            return [(m.start(), m.group(1)) for m in self._literal_regex.finditer(text.lower())]
+        return [(m.start(), self._alternatives[m.lastindex - 1]) for m in self._literal_regex_ci.finditer(text)]
+
+    def _signal_mask(self, text: str) -> int:
+        mask = 0
+        if self._literal_regex is not None:
+            if text.isascii():
+                hits = self._literal_regex.findall(text.lower())
+            else:
+                hits = [a for _, a in self._literal_hits(text)]
+            for alt in set(hits):
+                mask |= self._mask[alt]
+        for idx, rx in self._regex_entries:
+            bit = 1 << self.signals.index(self._entries[idx][0])
+            if not mask & bit and rx.search(text):
+                mask |= bit
+        return mask
+
+    def _matched_entries(self, text: str) -> set:
+        found = set()
+        for _, alt in self._literal_hits(text):
+            found.update(self._implied[alt])
+        for idx, rx in self._regex_entries:
+            if idx not in found and rx.search(text):
+                found.add(idx)
+        return found
+
+    def match(self, text: str) -> Dict[str, Any]:
+        """Return `{"signals": ..., "evidence": [...]}` for a single note."""
+        found = self._matched_entries(text)
+        signals = {signal: False for signal in self.signals}
+        evidence: List[str] = []
+        for idx in sorted(found):
+            signal, p = self._entries[idx]
+            signals[signal] = True
+            evidence.append(p)
+        return {"signals": signals, "evidence": evidence}
+
+    def spans(self, text: str) -> List[Span]:
+        """Return every `(signal, pattern, start, end)` occurrence in `text`, sorted by position."""
+        out = set()
+        for start, alt in self._literal_hits(text):
+            for idx, offset, length in self._contained[alt]:
+                signal, p = self._entries[idx]
+                out.add((signal, p, start + offset, start + offset + length))
+        for idx, rx in self._regex_entries:
+            signal, p = self._entries[idx]
+            out.update((signal, p, m.start(), m.end()) for m in rx.finditer(text))
+        return sorted(out, key=lambda s: (s[2], s[3], s[0], s[1]))
+
+    def _masks(self, texts: List[str], cache: Optional["NoteCache"] = None) -> Tuple[np.ndarray, int]:
+        """Signal bitmasks for distinct normalized texts and the number of cache hits."""
+        if cache is None:
+            return np.fromiter((self._signal_mask(t) for t in texts), dtype=np.int64, count=len(texts)), 0
+        keys = cache.keys(texts)
+        masks, found = cache.get_many(keys)
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            computed = np.fromiter((self._signal_mask(texts[i]) for i in missing), dtype=np.int64, count=len(missing))
+            masks[missing] = computed
+            cache.put_many(keys[missing], computed)
+        return masks, len(texts) - len(missing)
+
+    def match_series(self, notes: pd.Series, evidence: bool = False, cache: Optional["NoteCache"] = None) -> pd.DataFrame:
+        """Match a Series of notes, returning one boolean column per signal.
+
+        Missing or non-string notes match nothing. Notes are factorized first
+        and matched once per distinct `normalize_note` value, then broadcast
+        back to their rows; with a `cache`, masks of notes seen in earlier
+        batches are reused. Counts of rows, distinct notes, cache hits and
+        notes matched are left in `attrs["note_stats"]`. When `evidence` is
+        true an `evidence_spans` column with the `spans` of each note is
+        added; spans refer to the original text, so they are computed once
+        per distinct exact note.
+        """
+        import pandas as pd
+
+        codes, uniques = pd.factorize(notes)
+        raw = uniques.tolist()
+        normalized = [normalize_note(t) if isinstance(t, str) else "" for t in raw]
+        norm_codes, distinct = pd.factorize(pd.Series(normalized, dtype=object))
+        distinct = distinct.tolist()
+        distinct_masks, hits = self._masks(distinct, cache)
+
+        present = codes >= 0
+        masks = np.zeros(len(codes), dtype=np.int64)
+        masks[present] = distinct_masks[norm_codes[codes[present]]]
+        out = pd.DataFrame(
+            {signal: (masks >> i) & 1 == 1 for i, signal in enumerate(self.signals)},
+            index=notes.index,
+        )
+        if evidence:
+            unique_spans = [self.spans(t) if isinstance(t, str) and t else [] for t in raw]
+            spans = [unique_spans[c] if c >= 0 else [] for c in codes.tolist()]
+            out["evidence_spans"] = pd.Series(spans, index=notes.index, dtype=object)
+        # same counters as `Embedder.stats`
+        out.attrs["note_stats"] = {
+            "requested": len(codes),
+            "unique": len(distinct),
+            "cache_hits": hits,
+            "computed": len(distinct) - hits,
+        }
+        return out
@@ -1,45 +1,69 @@
 """Lightweight rule-based parser for ownership notes."""
 from __future__ import annotations
 
-import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
+from catalogwatch.nlp.cache import NoteCache
+from catalogwatch.registry import SIGNALS, Rules, current_rules
 
-KEYWORDS = {
-    "reversion": [r"revert", r"reversion", r"reverted"],
-    "exclusive_license": [r"exclusive license", r"exclusive rights", r"sole license", r"exclusive"],
-    "artist_owned": [r"artist-owned", r"artist owned", r"artist-owned masters", r"self-released", r"self released", r"self-released"],
-    "ambiguous": [r"ambiguous", r"legacy contract", r"legacy", r"disputed", r"unclear"],
-}
+if TYPE_CHECKING:
+    import pandas as pd
 
 
-def _find_matches(text: str, patterns: List[str]) -> List[str]:
-    found: List[str] = []
-    for p in patterns:
-        if re.search(p, text, flags=re.IGNORECASE):
-            found.append(p)
-    return found
+def __getattr__(name: str) -> Any:
+    # `KEYWORDS`, signal -> patterns, is read from configs/keywords.yml when
+    # first accessed rather than at import; the signal names are `SIGNALS`
+    if name == "KEYWORDS":
+        return current_rules().keywords
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def parse_ownership_notes(text: str) -> Dict[str, Any]:
+@lru_cache(maxsize=1)
+def _note_cache(version: str) -> NoteCache:
+    return NoteCache(version)
+
+
+def get_note_cache(rules: Optional[Rules] = None) -> NoteCache:
+    """Process-wide note cache for the keywords of `rules` (default: current); ingest loads and saves it.
+
+    A keywords edit switches to a new, empty cache.
+    """
+    return _note_cache((rules or current_rules()).keywords_version)
+
+
+def parse_ownership_notes(text: str, rules: Optional[Rules] = None) -> Dict[str, Any]:
     """Extract signals from ownership notes using keyword matching.
 
     Returns a dict with booleans, evidence list, and a simple confidence proxy.
+    Uses the matcher of `rules`, by default the current config snapshot.
     """
     if not text or not isinstance(text, str):
         return {"signals": {}, "evidence": [], "confidence": 0.0}
 
-    signals = {}
-    evidence = []
-
-    for signal, patterns in KEYWORDS.items():
-        matches = _find_matches(text, patterns)
-        signals[signal] = bool(matches)
-        if matches:
-            evidence.extend(matches)
+    matched = (rules or current_rules()).matcher.match(text)
+    signals = matched["signals"]
 
     # small heuristic for confidence: proportion of signal categories matched
     nonzero = sum(1 for v in signals.values() if v)
-    confidence = min(1.0, nonzero / max(1, len(KEYWORDS)))
+    confidence = min(1.0, nonzero / max(1, len(SIGNALS)))
+
+    return {"signals": signals, "evidence": matched["evidence"], "confidence": confidence}
+
 
-    return {"signals": signals, "evidence": evidence, "confidence": confidence}
+def parse_ownership_notes_batch(
+    notes: pd.Series, evidence: bool = False, cache: Optional[NoteCache] = None, rules: Optional[Rules] = None
+) -> pd.DataFrame:
+    """Column-wise equivalent of `parse_ownership_notes` for a Series of notes.
+
+    Returns a DataFrame aligned to `notes` with one boolean column per signal
+    (`SIGNALS`) plus a `confidence` column. With `evidence=True` an
+    `evidence_spans` column of `(signal, pattern, start, end)` tuples is
+    included as well. Each distinct note is parsed once; pass `cache` (e.g.
+    `get_note_cache(rules)`) to reuse results across calls. Counts are in
+    `attrs["note_stats"]`.
+    """
+    out = (rules or current_rules()).matcher.match_series(notes, evidence=evidence, cache=cache)
+    nonzero = out[list(SIGNALS)].sum(axis=1)
+    out["confidence"] = (nonzero / max(1, len(SIGNALS))).clip(upper=1.0).astype(float)
+    return out
@@ -0,0 +1,114 @@
+"""On-disk, memory-mapped cache of text embeddings.
+
+Vectors are appended to `vectors.f32` (row-major float32) and their keys to
+`keys.u64`; a key is a 64-bit hash of the normalized text (see
+`embeddings.text_key`). Each backend/dimension pair gets its own directory,
+so switching models never mixes vectors. Vectors are written before keys, so
+a torn write leaves at most unreferenced vector rows, which are truncated on
+the next open or append.
+
+Several processes (ingest runs, dashboard sessions) may share a directory:
+appends hold an exclusive lock on `lock` and first pick up keys appended by
+other processes, so rows and keys stay aligned.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: appends are only serialized within the process
+    fcntl = None
+
+
+class VectorCache:
+    """Append-only key -> vector store backed by memory-mapped files."""
+
+    def __init__(self, directory: str, dim: int, backend_id: str):
+        self.directory = os.path.join(directory, f"{backend_id}-{dim}")
+        self.dim = dim
+        os.makedirs(self.directory, exist_ok=True)
+        self._keys_path = os.path.join(self.directory, "keys.u64")
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._lock_path = os.path.join(self.directory, "lock")
+        self._thread_lock = threading.Lock()
+        self._index: Dict[int, int] = {}
+        self._rows = 0
+        with self._locked():
+            with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as fh:
+                json.dump({"backend": backend_id, "dim": dim}, fh)
+            self._sync()
+        self._map()
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock, open(self._lock_path, "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            yield
+
+    def _sync(self) -> bool:
+        """Index rows appended since the last sync and drop incomplete ones; call under the lock.
+
+        Returns whether any rows were added.
+        """
+        row_bytes = 4 * self.dim
+        with open(self._keys_path, "ab+") as fh:
+            fh.seek(self._rows * 8)
+            keys = np.frombuffer(fh.read(), dtype=np.uint64)
+        stored_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        total = min(self._rows + len(keys), stored_rows)
+        # drop anything past the last complete (key, vector) pair
+        self._truncate(self._keys_path, total * 8)
+        self._truncate(self._vectors_path, total * row_bytes)
+        for offset, key in enumerate(keys[: total - self._rows].tolist()):
+            self._index.setdefault(key, self._rows + offset)
+        grown = total > self._rows
+        self._rows = total
+        return grown
+
+    @staticmethod
+    def _truncate(path: str, size: int) -> None:
+        with open(path, "ab") as fh:
+            fh.truncate(size)
+
+    def _map(self) -> None:
+        if self._rows:
+            self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dim))
+        else:
+            self.vectors = np.empty((0, self.dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, keys: Sequence[int]) -> np.ndarray:
+        """Return the row of each key in `vectors`, or -1 where it is not cached."""
+        get = self._index.get
+        return np.fromiter((get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def add(self, keys: List[int], vectors: np.ndarray) -> None:
+        """Append vectors for keys not already cached (here or by another process)."""
+        with self._locked():
+            grown = self._sync()
+            # keys may repeat within one call; keep the first occurrence
+            seen: Dict[int, int] = {}
+            for i, key in enumerate(keys):
+                if key not in self._index:
+                    seen.setdefault(key, i)
+            if seen:
+                block = np.ascontiguousarray(vectors[list(seen.values())], dtype=np.float32)
+                with open(self._vectors_path, "ab") as fh:
+                    fh.write(block.tobytes())
+                with open(self._keys_path, "ab") as fh:
+                    fh.write(np.array(list(seen), dtype=np.uint64).tobytes())
+                for offset, key in enumerate(seen):
+                    self._index[key] = self._rows + offset
+                self._rows += len(seen)
+            if grown or seen:
+                self._map()
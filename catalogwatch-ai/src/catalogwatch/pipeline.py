@@ -0,0 +1,174 @@
+"""Columnar annotation engine shared by the CLI and the dashboard.
+
+`annotate_frame` computes eligibility, ownership signals, features, scores and
+contributions for a whole canonical DataFrame with column operations instead of
+walking it row by row.
+"""
+from __future__ import annotations
+
+import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from catalogwatch.ingest.csv_loader import canonicalize, new_batch
+from catalogwatch.eligibility.rules import years_since_release_batch, classify_years_batch
+from catalogwatch.nlp.ann import note_vectors
+from catalogwatch.nlp.parser import get_note_cache, parse_ownership_notes_batch
+from catalogwatch.modeling.features import features_from_columns
+from catalogwatch.modeling.feature_matrix import FeatureMatrix
+from catalogwatch.modeling.explainability import compute_contributions_batch
+from catalogwatch.registry import SIGNALS, Rules, current_rules
+from catalogwatch.services.instrumentation import disable_profiling, stage
+
+
+SIGNAL_COLUMNS: Dict[str, str] = {signal: f"signal_{signal}" for signal in SIGNALS}
+
+CONTRIBUTION_COLUMNS = [
+    "eligibility_value",
+    "eligibility_contribution",
+    "ownership_clarity_value",
+    "ownership_contribution",
+    "exclusive_penalty_value",
+    "exclusive_contribution",
+]
+
+
+def annotate_frame(
+    df: pd.DataFrame, windows: Dict[str, Any], current_year: Optional[int] = None, rules: Optional[Rules] = None
+) -> pd.DataFrame:
+    """Annotate a canonical catalog frame in bulk.
+
+    Adds `years_since_release`, `eligibility_window`, one boolean `signal_<name>`
+    column per ownership signal, `ownership_confidence`, `score` and the
+    per-component contribution columns. The input frame is not modified.
+    Keywords and weights come from `rules`, taken from the registry once per
+    call if not given; runs spanning several calls should pass one snapshot.
+    Notes are parsed through the process-wide note cache; the parse counts
+    are left in `attrs["note_stats"]` of the result.
+    """
+    rules = rules or current_rules()
+    n = len(df)
+    with stage("classify", rows=n):
+        release_years = pd.to_numeric(df["release_year"], errors="coerce")
+        years = years_since_release_batch(
+            release_years.to_numpy(dtype=float, na_value=np.nan), current_year
+        )
+        years_col = pd.Series(years, index=df.index).round().astype("Int64")
+        windows_col = classify_years_batch(years, windows)
+
+    with stage("nlp", rows=n) as st:
+        nlp = parse_ownership_notes_batch(df["ownership_notes"], cache=get_note_cache(rules), rules=rules)
+        signals = nlp[list(SIGNALS)]
+        note_stats = nlp.attrs["note_stats"]
+        st.update(**note_stats)
+
+    with stage("featurize", rows=n):
+        feats = FeatureMatrix.from_features(features_from_columns(years_col, signals))
+
+    with stage("score", rows=n):
+        contributions = compute_contributions_batch(feats, index=df.index, engine=rules.engine)
+
+    out = df.copy()
+    out["years_since_release"] = years_col
+    out["eligibility_window"] = windows_col
+    for signal, column in SIGNAL_COLUMNS.items():
+        out[column] = signals[signal]
+    out["ownership_confidence"] = nlp["confidence"]
+    out["score"] = contributions["total"]
+    for column in CONTRIBUTION_COLUMNS:
+        out[column] = contributions[column]
+    out.attrs["note_stats"] = note_stats
+    return out
+
+
+def add_note_stats(total: Dict[str, int], stats: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """Accumulate `attrs["note_stats"]` of annotated frames into `total`."""
+    for key, value in (stats or {}).items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+
+def format_note_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of accumulated note parse counts for ingest output."""
+    unique, hits = stats.get("unique", 0), stats.get("cache_hits", 0)
+    rate = f"{hits / unique:.1%}" if unique else "n/a"
+    return (
+        f"Parsed {stats.get('computed', 0):,} of {unique:,} distinct notes in {stats.get('requested', 0):,} rows "
+        f"(note cache hit rate {rate})"
+    )
+
+
+def _annotate_shard(
+    chunk: pd.DataFrame,
+    windows: Dict[str, Any],
+    current_year: int,
+    batch: Dict[str, Any],
+    rules: Rules,
+    embed_notes: bool = False,
+) -> Union[pd.DataFrame, Tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+    annotated = annotate_frame(
+        canonicalize(chunk, source=batch["source"], loaded_at=batch["loaded_at"], batch_id=batch["batch_id"]),
+        windows,
+        current_year,
+        rules,
+    )
+    if not embed_notes:
+        return annotated
+    return (annotated,) + note_vectors(annotated["catalog_id"], annotated["ownership_notes"])
+
+
+def annotate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    windows: Dict[str, Any],
+    workers: int = 1,
+    current_year: Optional[int] = None,
+    rules: Optional[Rules] = None,
+    embed_notes: bool = False,
+) -> Iterator[Any]:
+    """Canonicalize and annotate raw chunks, yielding results in input order.
+
+    With `embed_notes=True` each item is `(frame, ids, vectors)`, the ids and
+    note embeddings of `nlp.ann.note_vectors`, computed alongside annotation
+    (in the workers when there are any).
+
+    With `workers > 1` chunks are annotated in a process pool with at most
+    `2 * workers` chunks in flight, so memory stays bounded. The as-of year,
+    ingestion batch and config snapshot (`rules`, current if not given) are
+    fixed once for the whole run, which makes the output identical for any
+    worker count and unaffected by config edits during the run. Stages run in
+    the workers are not profiled.
+    """
+    if current_year is None:
+        current_year = datetime.date.today().year
+    rules = rules or current_rules()
+    batch = new_batch()
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield _annotate_shard(chunk, windows, current_year, batch, rules, embed_notes)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=disable_profiling) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_annotate_shard, chunk, windows, current_year, batch, rules, embed_notes))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def signals_from_row(row: pd.Series) -> Dict[str, bool]:
+    """Rebuild the `parse_ownership_notes` signal dict from an annotated row."""
+    return {signal: bool(row[column]) for signal, column in SIGNAL_COLUMNS.items()}
+
+
+def contributions_from_row(row: pd.Series) -> Dict[str, float]:
+    """Rebuild the `compute_contributions` dict from an annotated row."""
+    expl = {column: float(row[column]) for column in CONTRIBUTION_COLUMNS}
+    expl["total"] = float(row["score"])
+    return expl
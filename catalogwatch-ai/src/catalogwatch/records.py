@@ -0,0 +1,55 @@
+"""Pandas-free scoring of single raw records.
+
+`score_record` classifies, parses and scores one input record with the scalar
+functions, which only need numpy and YAML. It backs `catalogwatch score` and
+the service's `/score` endpoint, so the modules it imports keep pandas out of
+their module-level imports and load it inside the batch functions instead.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from catalogwatch.eligibility.rules import explain_classification
+from catalogwatch.modeling.explainability import compute_contributions
+from catalogwatch.modeling.features import feature_from_record
+from catalogwatch.nlp.parser import parse_ownership_notes
+
+
+def release_year(value: Any) -> Optional[int]:
+    """Parse a raw `release_year` value; missing or malformed values become None.
+
+    Booleans and floats with a fractional part are malformed, not truncated.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def score_record(
+    record: Dict[str, Any], windows: Dict[str, Any], current_year: Optional[int] = None, model: Any = None
+) -> Dict[str, Any]:
+    """Eligibility window, ownership signals, score and contributions for one record.
+
+    With a trained `NNScorer` as `model` the result also has a `learned_score`.
+    """
+    expl = explain_classification(release_year(record.get("release_year")), current_year, windows)
+    nlp = parse_ownership_notes(record.get("ownership_notes"))
+    features = feature_from_record({**expl, "ownership_signals": nlp["signals"]})
+    contributions = compute_contributions(features)
+    out = {
+        "catalog_id": record.get("catalog_id"),
+        "years_since_release": expl["years_since_release"],
+        "eligibility_window": expl["eligibility_window"],
+        "ownership_signals": nlp["signals"],
+        "ownership_confidence": nlp["confidence"],
+        "score": contributions.pop("total"),
+        "contributions": contributions,
+    }
+    if model is not None:
+        out["learned_score"] = float(model.predict(features)[0])
+    return out
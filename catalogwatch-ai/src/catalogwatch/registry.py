@@ -0,0 +1,261 @@
+"""Versioned, hot-reloadable registry of eligibility windows, keywords and weights.
+
+The three rule sets live in `configs/`: `eligibility_windows.yml`,
+`keywords.yml` and `scoring.yml`. `ConfigRegistry` parses and validates them
+and compiles them into a frozen `Rules` snapshot holding the window
+classifier, the note matcher and the scoring engine, identified by a
+`version` digest over the three files' contents.
+
+`current()` is cheap enough to call per request: at most once per
+`poll_interval` it compares each file's mtime and size with the last load,
+and only a changed file is re-read. A snapshot is rebuilt only when some
+content hash changed, so editing a file is picked up by the dashboard and
+long-running processes without a restart, and nothing is recompiled while
+the files stay the same. A reload that fails validation is logged and the
+previous snapshot stays in use; the first load raises `ConfigError`.
+
+Library code reads the active registry through `current_rules()`;
+`set_registry` swaps it, e.g. for a service started with other config paths.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from catalogwatch.eligibility.classifier import WindowClassifier, get_classifier, validate_windows
+from catalogwatch.modeling.engine import COMPONENTS, ScoringEngine
+from catalogwatch.nlp.cache import keywords_version
+from catalogwatch.nlp.matcher import SignalMatcher, _is_literal
+from catalogwatch.services.logger import get_logger
+
+
+logger = get_logger("catalogwatch.registry")
+
+CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "configs"))
+WINDOWS_FILE = "eligibility_windows.yml"
+KEYWORDS_FILE = "keywords.yml"
+SCORING_FILE = "scoring.yml"
+
+# ownership signals the scoring features are built from; keywords.yml must define exactly these
+SIGNALS = ("reversion", "exclusive_license", "artist_owned", "ambiguous")
+
+
+class ConfigError(ValueError):
+    """A config file is missing, malformed or fails validation."""
+
+
+# -- parsing and validation ---------------------------------------------------
+
+def _load_yaml(data: bytes, section: str) -> Any:
+    try:
+        cfg = yaml.safe_load(data)
+    except yaml.YAMLError as exc:
+        raise ConfigError(f"invalid YAML: {exc}") from exc
+    if not isinstance(cfg, dict) or section not in cfg:
+        raise ConfigError(f"missing top-level {section!r} section")
+    return cfg
+
+
+def parse_windows(data: bytes) -> Dict[str, Any]:
+    """Parse and validate an eligibility windows file; returns the whole mapping."""
+    cfg = _load_yaml(data, "windows")
+    rules = cfg["windows"]
+    if not isinstance(rules, list) or not rules or not all(isinstance(r, dict) for r in rules):
+        raise ConfigError("'windows' must be a non-empty list of mappings")
+    try:
+        validate_windows(rules)
+    except ValueError as exc:
+        raise ConfigError(str(exc)) from exc
+    return cfg
+
+
+def parse_keywords(data: bytes) -> Dict[str, List[str]]:
+    """Parse and validate a keywords file into `{signal: [pattern, ...]}` in `SIGNALS` order."""
+    keywords = _load_yaml(data, "keywords")["keywords"]
+    if not isinstance(keywords, dict) or set(keywords) != set(SIGNALS):
+        raise ConfigError(f"'keywords' must define exactly the signals {list(SIGNALS)}")
+    out: Dict[str, List[str]] = {}
+    for signal in SIGNALS:
+        patterns = keywords[signal]
+        if not isinstance(patterns, list) or not patterns or not all(isinstance(p, str) and p for p in patterns):
+            raise ConfigError(f"patterns for {signal!r} must be a non-empty list of strings")
+        for p in patterns:
+            if not _is_literal(p):
+                try:
+                    re.compile(p)
+                except re.error as exc:
+                    raise ConfigError(f"invalid pattern {p!r} for {signal!r}: {exc}") from exc
+        out[signal] = list(patterns)
+    return out
+
+
+def parse_scoring(data: bytes) -> Dict[str, Any]:
+    """Parse and validate a scoring file; returns its `scoring` section."""
+    scoring = _load_yaml(data, "scoring")["scoring"]
+    required = [
+        ("eligibility_horizon_years",),
+        ("ownership_clarity", "base"),
+        ("ownership_clarity", "ambiguous"),
+        ("ownership_clarity", "artist_owned"),
+        ("exclusive_penalty",),
+    ] + [("weights", c) for c in COMPONENTS]
+    for keys in required:
+        value: Any = scoring
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"scoring.{'.'.join(keys)} must be a number")
+    if scoring["eligibility_horizon_years"] <= 0:
+        raise ConfigError("scoring.eligibility_horizon_years must be positive")
+    return scoring
+
+
+# -- per-file cache -----------------------------------------------------------
+
+# (path, parser) -> ((mtime_ns, size), sha1 of content, parsed value)
+_files: Dict[Tuple[str, Callable], Tuple[Tuple[int, int], str, Any]] = {}
+_files_lock = threading.Lock()
+
+
+def load_file(path: str, parse: Callable[[bytes], Any]) -> Tuple[Any, str]:
+    """Return `(parse(content), content_hash)` for `path`, cached until the file changes.
+
+    The file is only re-read when its mtime or size changed, and `parse` only
+    re-run when the content did. Parsed values are shared; treat them as
+    read-only. Raises `ConfigError` if the file cannot be read or parsed.
+    """
+    key = (os.path.abspath(path), parse)
+    try:
+        st = os.stat(key[0])
+    except OSError as exc:
+        raise ConfigError(f"{path}: {exc.strerror}") from exc
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _files.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[2], cached[1]
+    with open(key[0], "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if cached is not None and cached[1] == digest:
+        value = cached[2]
+    else:
+        try:
+            value = parse(data)
+        except ConfigError as exc:
+            raise ConfigError(f"{path}: {exc}") from exc
+    with _files_lock:
+        _files[key] = (stamp, digest, value)
+    return value, digest
+
+
+# -- compiled snapshots -------------------------------------------------------
+
+@dataclass(frozen=True)
+class Rules:
+    """One compiled, immutable config snapshot. The dicts are shared; do not modify them."""
+
+    version: str
+    windows: Dict[str, Any]
+    keywords: Dict[str, List[str]]
+    scoring: Dict[str, Any]
+    classifier: WindowClassifier
+    matcher: SignalMatcher
+    engine: ScoringEngine
+    keywords_version: str
+    loaded_at: float
+
+
+class ConfigRegistry:
+    """Loads, validates and caches `Rules`; see the module docstring."""
+
+    def __init__(
+        self,
+        windows_path: Optional[str] = None,
+        keywords_path: Optional[str] = None,
+        scoring_path: Optional[str] = None,
+        poll_interval: float = 1.0,
+    ):
+        self.windows_path = windows_path or os.path.join(CONFIG_DIR, WINDOWS_FILE)
+        self.keywords_path = keywords_path or os.path.join(CONFIG_DIR, KEYWORDS_FILE)
+        self.scoring_path = scoring_path or os.path.join(CONFIG_DIR, SCORING_FILE)
+        self.poll_interval = poll_interval
+        self.last_error: Optional[str] = None
+        self._rules: Optional[Rules] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Rules:
+        """The latest valid snapshot, checking the files at most once per `poll_interval`."""
+        rules = self._rules
+        if rules is not None and time.monotonic() - self._checked < self.poll_interval:
+            return rules
+        return self.refresh()
+
+    def refresh(self) -> Rules:
+        """Check the files now and rebuild the snapshot if any content changed."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                rules = self._load()
+            except ConfigError as exc:
+                if self._rules is None:
+                    raise
+                if str(exc) != self.last_error:
+                    logger.warning("Keeping config %s: %s", self._rules.version, exc)
+                self.last_error = str(exc)
+                return self._rules
+            self.last_error = None
+            if rules is not self._rules:
+                if self._rules is not None:
+                    logger.info("Reloaded config %s -> %s", self._rules.version, rules.version)
+                self._rules = rules
+            return rules
+
+    def _load(self) -> Rules:
+        windows, w_hash = load_file(self.windows_path, parse_windows)
+        keywords, k_hash = load_file(self.keywords_path, parse_keywords)
+        scoring, s_hash = load_file(self.scoring_path, parse_scoring)
+        version = hashlib.sha1(f"{w_hash}:{k_hash}:{s_hash}".encode()).hexdigest()[:12]
+        if self._rules is not None and self._rules.version == version:
+            return self._rules
+        return Rules(
+            version=version,
+            windows=windows,
+            keywords=keywords,
+            scoring=scoring,
+            classifier=get_classifier(windows),
+            matcher=SignalMatcher(keywords),
+            engine=ScoringEngine(scoring),
+            keywords_version=keywords_version(keywords),
+            loaded_at=time.time(),
+        )
+
+
+_active: Optional[ConfigRegistry] = None
+
+
+def get_registry() -> ConfigRegistry:
+    """The active registry; the default one reads `CONFIG_DIR` and is created on first use."""
+    global _active
+    if _active is None:
+        _active = ConfigRegistry()
+    return _active
+
+
+def set_registry(registry: ConfigRegistry) -> Optional[ConfigRegistry]:
+    """Make `registry` the active one and return the previous one."""
+    global _active
+    previous, _active = _active, registry
+    return previous
+
+
+def current_rules() -> Rules:
+    """Shorthand for `get_registry().current()`."""
+    return get_registry().current()
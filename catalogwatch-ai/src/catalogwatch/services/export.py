@@ -0,0 +1,426 @@
+"""Bulk export of the enriched dataset as Arrow IPC, Feather, Parquet, CSV or JSON lines.
+
+Everything is streamed as Arrow record batches: from a stored dataset
+(`dataset_batches`, a projected and filtered scan) or from an annotated frame
+(`frame_batches`, converted once with `store.to_storage_frame`). Output columns
+are the flat, typed storage columns: one boolean `signal_<name>` column per
+ownership signal and one float column per score component, no JSON-in-a-cell.
+
+Batches go to the writer as they arrive:
+
+- `arrow`: Arrow IPC file, uncompressed, so readers can memory-map it; batches
+  are written as scanned, without conversion
+- `feather`: the same format with LZ4-compressed buffers
+- `parquet`: one file, or a Hive-partitioned directory with `partition_cols`
+- `csv`: text written by Arrow's CSV writer
+- `jsonl`: one JSON object per row, rendered column by column with Arrow
+  compute functions and written straight from the resulting string buffer
+
+IPC files allow a single dictionary per column, extended by deltas, so
+dictionary columns whose batches carry different dictionaries are re-coded
+against one growing dictionary; batches sharing the current dictionary pass
+through untouched. Output is written to a temporary path and moved into place
+when complete.
+
+`ensure_arrow_copy` keeps an `arrow` export next to a stored dataset for
+readers that memory-map it (see `services.mapped`).
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: refreshes are only serialized within the process
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from catalogwatch.services.instrumentation import stage
+from catalogwatch.services.mapped import MappedFrame
+from catalogwatch.services.store import _replace_dir, to_storage_frame
+
+
+FORMATS = ("arrow", "feather", "parquet", "csv", "jsonl")
+
+EXTENSIONS = {
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".feather": "feather",
+    ".parquet": "parquet",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+MIME_TYPES = {
+    "arrow": "application/vnd.apache.arrow.file",
+    "feather": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+# rows per record batch when scanning or slicing frames
+DEFAULT_BATCH_SIZE = 65_536
+
+
+def infer_format(path: str) -> str:
+    """Export format for `path` from its extension; raises ValueError if unknown."""
+    fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer export format from {path!r}; use one of {list(FORMATS)}")
+    return fmt
+
+
+def dataset_batches(
+    path: str,
+    columns: Optional[List[str]] = None,
+    filter: Any = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """Stream a stored dataset (see `store.write_dataset`) as record batches."""
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    if isinstance(filter, list):
+        filter = pq.filters_to_expression(filter)
+    for batch in dataset.to_batches(columns=columns, filter=filter, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch
+
+
+def frame_batches(
+    df: pd.DataFrame, mask: Optional[np.ndarray] = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """Stream the rows of an annotated frame selected by `mask` as record batches.
+
+    A `MappedFrame` is already in storage form; its rows are taken from the
+    mapped table without going through pandas.
+    """
+    if isinstance(df, MappedFrame):
+        table = df.table if mask is None else df.table.take(np.flatnonzero(mask))
+        yield from table.to_batches(max_chunksize=batch_size)
+        return
+    if mask is not None:
+        df = df.iloc[np.flatnonzero(mask)]
+    table = pa.Table.from_pandas(to_storage_frame(df), preserve_index=False)
+    yield from table.to_batches(max_chunksize=batch_size)
+
+
+class _DictionaryUnifier:
+    """Re-codes dictionary columns against one append-only dictionary per column."""
+
+    def __init__(self, schema: pa.Schema):
+        self.schema = schema
+        self._columns = [i for i, f in enumerate(schema) if pa.types.is_dictionary(f.type)]
+        self._codes: Dict[int, Dict[Any, int]] = {i: {} for i in self._columns}
+        self._values: Dict[int, pa.Array] = {}
+
+    def __call__(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        if not self._columns:
+            return batch
+        arrays = batch.columns
+        changed = False
+        for i in self._columns:
+            array = arrays[i]
+            current = self._values.get(i)
+            if current is not None and array.dictionary.equals(current):
+                continue
+            codes = self._codes[i]
+            mapping = np.empty(len(array.dictionary), dtype=np.int32)
+            added = []
+            for j, value in enumerate(array.dictionary.to_pylist()):
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                    added.append(value)
+                mapping[j] = code
+            if added or current is None:
+                value_type = self.schema.field(i).type.value_type
+                tail = pa.array(added, type=value_type)
+                current = self._values[i] = tail if current is None else pa.concat_arrays([current, tail])
+            indices = array.indices.to_numpy(zero_copy_only=False)
+            valid = array.indices.is_valid().to_numpy(zero_copy_only=False)
+            remapped = pa.array(mapping[np.where(valid, indices, 0)], mask=~valid, type=self.schema.field(i).type.index_type)
+            arrays[i] = pa.DictionaryArray.from_arrays(remapped, current)
+            changed = True
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema) if changed else batch
+
+
+def _write_ipc(batches: Iterator[pa.RecordBatch], first: pa.RecordBatch, path: str, compression: Optional[str]) -> int:
+    options = ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+    unify = _DictionaryUnifier(first.schema)
+    rows = 0
+    with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, first.schema, options=options) as writer:
+        for batch in _chain(first, batches):
+            writer.write_batch(unify(batch))
+            rows += batch.num_rows
+    return rows
+
+
+def _write_parquet(batches: Iterator[pa.RecordBatch], first: pa.RecordBatch, path: str, partition_cols: Sequence[str]) -> int:
+    rows = [0]
+
+    def counted() -> Iterator[pa.RecordBatch]:
+        for batch in _chain(first, batches):
+            rows[0] += batch.num_rows
+            yield batch
+
+    if partition_cols:
+        ds.write_dataset(
+            counted(),
+            path,
+            schema=first.schema,
+            format="parquet",
+            partitioning=list(partition_cols),
+            partitioning_flavor="hive",
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    else:
+        with pq.ParquetWriter(path, first.schema) as writer:
+            for batch in counted():
+                writer.write_batch(batch)
+    return rows[0]
+
+
+def _write_csv(batches: Iterator[pa.RecordBatch], first: pa.RecordBatch, path: str) -> int:
+    rows = 0
+    with pa.OSFile(path, "wb") as sink, pacsv.CSVWriter(sink, first.schema) as writer:
+        for batch in _chain(first, batches):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def _lit(text: str) -> pa.Scalar:
+    return pa.scalar(text, pa.large_string())
+
+
+_QUOTE = _lit('"')
+_EMPTY = _lit("")
+
+
+def _json_strings(array: pa.Array) -> pa.Array:
+    """JSON string literals for a string array; escaping runs once per distinct value for dictionaries."""
+    if pa.types.is_dictionary(array.type):
+        return _json_strings(array.dictionary).take(array.indices)
+    array = array.cast(pa.large_string())
+    quoted = pc.binary_join_element_wise(_QUOTE, array, _QUOTE, _EMPTY)
+    special = pc.fill_null(pc.match_substring_regex(array, '[\\\\"\\x00-\\x1f]'), False)
+    if not pc.any(special).as_py():
+        return quoted
+    escaped = array
+    for old, new in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")):
+        escaped = pc.replace_substring(escaped, old, new)
+    quoted = pc.binary_join_element_wise(_QUOTE, escaped, _QUOTE, _EMPTY)
+    control = pc.fill_null(pc.match_substring_regex(array, "[\\x00-\\x08\\x0b\\x0c\\x0e-\\x1f]"), False)
+    if pc.any(control).as_py():
+        # other control characters are rare; let json escape those values
+        fixed = [json.dumps(v, ensure_ascii=False) if c else None for v, c in zip(array.to_pylist(), control.to_pylist())]
+        quoted = pc.if_else(control, pa.array(fixed, type=pa.large_string()), quoted)
+    return quoted
+
+
+def _json_values(array: pa.Array) -> pa.Array:
+    """JSON text of each value of `array` ("null" for nulls, NaN and infinities)."""
+    t = array.type
+    if pa.types.is_boolean(t):
+        out = pc.if_else(array, "true", "false")
+    elif pa.types.is_integer(t):
+        out = array.cast(pa.large_string())
+    elif pa.types.is_floating(t):
+        out = pc.if_else(pc.is_finite(array), array.cast(pa.large_string()), pa.scalar(None, pa.large_string()))
+    elif pa.types.is_timestamp(t):
+        # load timestamps repeat heavily; format each distinct value once
+        encoded = pc.dictionary_encode(array)
+        text = pc.strftime(encoded.dictionary, format="%Y-%m-%dT%H:%M:%S").cast(pa.large_string())
+        out = pc.binary_join_element_wise(_QUOTE, text, _QUOTE, _EMPTY).take(encoded.indices)
+    else:
+        if not (pa.types.is_dictionary(t) or pa.types.is_string(t) or pa.types.is_large_string(t)):
+            array = array.cast(pa.large_string())
+        out = _json_strings(array)
+    return pc.fill_null(out.cast(pa.large_string()), "null")
+
+
+def _jsonl_buffer(batch: pa.RecordBatch) -> pa.Buffer:
+    """One `{...}` JSON object per row, newline terminated, built column-wise."""
+    pieces = []
+    for i, field in enumerate(batch.schema):
+        pieces.append(_lit(("{" if i == 0 else ",") + json.dumps(field.name) + ":"))
+        pieces.append(_json_values(batch.column(i)))
+    pieces.append(_lit("}\n"))
+    lines = pc.binary_join_element_wise(*pieces, _EMPTY)
+    # the rows are contiguous in the data buffer, so it is written as is
+    offsets = np.frombuffer(lines.buffers()[1], dtype=np.int64)
+    start = offsets[lines.offset]
+    end = offsets[lines.offset + len(lines)]
+    return lines.buffers()[2].slice(start, end - start)
+
+
+def _write_jsonl(batches: Iterator[pa.RecordBatch], first: pa.RecordBatch, path: str) -> int:
+    rows = 0
+    with pa.OSFile(path, "wb") as sink:
+        for batch in _chain(first, batches):
+            if batch.num_rows:
+                sink.write(_jsonl_buffer(batch))
+            rows += batch.num_rows
+    return rows
+
+
+def _chain(first: pa.RecordBatch, rest: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+    yield first
+    yield from rest
+
+
+def export_batches(
+    batches: Iterable[pa.RecordBatch],
+    output: str,
+    fmt: Optional[str] = None,
+    partition_cols: Sequence[str] = (),
+    schema: Optional[pa.Schema] = None,
+) -> Dict[str, Any]:
+    """Write `batches` to `output` in `fmt` (inferred from the extension if omitted).
+
+    `partition_cols` is only supported for `parquet`, where `output` becomes a
+    directory. With no batches at all, `schema` is used to write an empty
+    file. Returns `{"path", "format", "rows", "seconds"}`.
+    """
+    fmt = fmt or infer_format(output)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {list(FORMATS)}")
+    if partition_cols and fmt != "parquet":
+        raise ValueError("partition_cols is only supported for parquet exports")
+
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        if schema is None:
+            raise ValueError("No rows to export and no schema given")
+        first = pa.RecordBatch.from_pylist([], schema=schema)
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    # unique per writer, so concurrent exports to one output never share a temporary path
+    tmp = f"{output}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+    started = time.perf_counter()
+    try:
+        with stage("export") as st:
+            if fmt in ("arrow", "feather"):
+                rows = _write_ipc(batches, first, tmp, "lz4" if fmt == "feather" else None)
+            elif fmt == "parquet":
+                rows = _write_parquet(batches, first, tmp, partition_cols)
+            elif fmt == "csv":
+                rows = _write_csv(batches, first, tmp)
+            else:
+                rows = _write_jsonl(batches, first, tmp)
+            st.add_rows(rows)
+    except BaseException:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+        elif os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if os.path.isdir(tmp):
+        _replace_dir(tmp, output)
+    else:
+        os.replace(tmp, output)
+    return {"path": output, "format": fmt, "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def export_dataset(
+    path: str,
+    output: str,
+    fmt: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    filter: Any = None,
+    partition_cols: Sequence[str] = (),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Stream a stored dataset to `output`; see `export_batches` and `dataset_batches`.
+
+    Raises FileNotFoundError if there is no dataset at `path` and ValueError
+    for `columns` it does not have.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No stored dataset at {path}")
+    schema = ds.dataset(path, format="parquet", partitioning="hive").schema
+    if columns is not None:
+        unknown = [c for c in columns if c not in schema.names]
+        if unknown:
+            raise ValueError(f"unknown columns: {', '.join(unknown)}; available: {', '.join(schema.names)}")
+        schema = pa.schema([schema.field(c) for c in columns], metadata=schema.metadata)
+    return export_batches(dataset_batches(path, columns, filter, batch_size), output, fmt, partition_cols, schema)
+
+
+def export_frame(
+    df: pd.DataFrame,
+    output: str,
+    fmt: Optional[str] = None,
+    mask: Optional[np.ndarray] = None,
+    partition_cols: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Write the rows of an annotated frame selected by `mask` to `output`."""
+    if isinstance(df, MappedFrame):
+        schema = df.table.schema
+    else:
+        schema = pa.Schema.from_pandas(to_storage_frame(df.iloc[:0]), preserve_index=False)
+    return export_batches(frame_batches(df, mask), output, fmt, partition_cols, schema)
+
+
+def arrow_copy_path(path: str) -> str:
+    """`<dataset>.arrow` next to the dataset directory or Parquet file at `path`."""
+    return os.path.splitext(os.path.normpath(path))[0] + ".arrow"
+
+
+def _newest_mtime(path: str) -> int:
+    newest = os.stat(path).st_mtime_ns
+    if os.path.isdir(path):
+        for entry in os.scandir(path):
+            newest = max(newest, entry.stat().st_mtime_ns)
+    return newest
+
+
+_copy_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _copy_locked(out: str) -> Iterator[None]:
+    """Serialize copy refreshes between threads and, where supported, processes."""
+    with _copy_lock, open(out + ".lock", "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def ensure_arrow_copy(path: str) -> str:
+    """Return the path of an up-to-date uncompressed Arrow IPC copy of a stored dataset.
+
+    The copy is (re)written when missing or older than the dataset; datasets
+    are replaced wholesale on every write, so comparing the dataset directory
+    and its partition directories with the copy is enough. Refreshes hold a
+    lock file next to the copy, so concurrent dashboard workers write it once
+    and readers only ever see a complete file.
+    """
+    out = arrow_copy_path(path)
+    if os.path.exists(out) and os.stat(out).st_mtime_ns >= _newest_mtime(path):
+        return out
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with _copy_locked(out):
+        # another worker may have refreshed it while we waited
+        if not os.path.exists(out) or os.stat(out).st_mtime_ns < _newest_mtime(path):
+            export_dataset(path, out, fmt="arrow")
+    return out
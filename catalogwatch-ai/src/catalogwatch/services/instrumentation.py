@@ -0,0 +1,285 @@
+"""Per-stage timing, row counts, memory and optional cProfile capture.
+
+Pipeline code marks its stages with `stage("name", rows=n)` blocks or the
+`timed("name")` decorator. They report to the process-wide active `Profiler`,
+which is disabled by default: a disabled `stage` returns a shared no-op
+context manager, so instrumented code costs one attribute check per call.
+
+An enabled profiler records wall time, rows and the peak resident set size
+seen while each stage ran (sampled by a background thread), logs one JSON line
+per stage through `services.logger`, and can print a summary table or write
+all records as JSON. With `cprofile=True` it also runs `cProfile` for its
+whole lifetime. Setting the `CATALOGWATCH_PROFILE` environment variable
+enables the default profiler (JSON log lines only, no RSS sampler), e.g. for
+the Streamlit app.
+
+Worker processes do not report stages: process pools run `disable_profiling`
+as their initializer, so forked workers neither log nor collect records of
+their own, and the parent's profile covers only work done in the parent.
+
+Usage:
+    with profiling(Profiler()) as prof:
+        run_pipeline()
+    print(prof.summary())
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from catalogwatch.services.logger import get_logger
+
+
+logger = get_logger("catalogwatch.profile")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where not available)."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _NullStage:
+    """Stand-in returned by a disabled profiler."""
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+    def add_rows(self, n: int) -> None:
+        pass
+
+    def update(self, **fields: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """One timed stage; `add_rows` counts rows, `update` adds fields to the record."""
+
+    def __init__(self, profiler: "Profiler", name: str, rows: Optional[int] = None):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.peak_rss = 0
+        self.extra: Dict[str, Any] = {}
+        self._started = 0.0
+        self._rss_start = 0
+
+    def add_rows(self, n: int) -> None:
+        self.rows = (self.rows or 0) + int(n)
+
+    def update(self, **fields: Any) -> None:
+        self.extra.update(fields)
+
+    def __enter__(self) -> "Stage":
+        self._rss_start = self.peak_rss = current_rss()
+        self.profiler._open(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        seconds = time.perf_counter() - self._started
+        self.profiler._close(self)
+        self.peak_rss = max(self.peak_rss, current_rss())
+        self.profiler._record({
+            "stage": self.name,
+            "seconds": round(seconds, 6),
+            "rows": self.rows,
+            "rows_per_sec": round(self.rows / seconds, 1) if self.rows and seconds > 0 else None,
+            "rss_start_mb": round(self._rss_start / 2**20, 1),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "ok": exc_type is None,
+            **self.extra,
+        })
+        return False
+
+
+class Profiler:
+    """Collects stage records; see the module docstring."""
+
+    def __init__(self, enabled: bool = True, sample_interval: float = 0.01, cprofile: bool = False, log: bool = True):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.log = log
+        self.records: List[Dict[str, Any]] = []
+        self._open_stages: List[Stage] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._cprofile = cProfile.Profile() if (enabled and cprofile) else None
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> "Profiler":
+        if not self.enabled:
+            return self
+        if self.sample_interval and self._sampler is None:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+            self._sampler.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            rss = current_rss()
+            with self._lock:
+                for st in self._open_stages:
+                    if rss > st.peak_rss:
+                        st.peak_rss = rss
+
+    # -- stages -------------------------------------------------------------
+
+    def stage(self, name: str, rows: Optional[int] = None) -> Any:
+        if not self.enabled:
+            return _NULL_STAGE
+        return Stage(self, name, rows)
+
+    def _open(self, st: Stage) -> None:
+        with self._lock:
+            self._open_stages.append(st)
+
+    def _close(self, st: Stage) -> None:
+        with self._lock:
+            self._open_stages.remove(st)
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+        if self.log:
+            logger.info(json.dumps(record))
+
+    # -- reporting ----------------------------------------------------------
+
+    def totals(self) -> List[Dict[str, Any]]:
+        """Records aggregated per stage name, in order of first appearance."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for r in self.records:
+            t = out.setdefault(r["stage"], {"stage": r["stage"], "calls": 0, "seconds": 0.0, "rows": 0, "peak_rss_mb": 0.0})
+            t["calls"] += 1
+            t["seconds"] += r["seconds"]
+            t["rows"] += r["rows"] or 0
+            t["peak_rss_mb"] = max(t["peak_rss_mb"], r["peak_rss_mb"])
+        for t in out.values():
+            t["seconds"] = round(t["seconds"], 6)
+            t["rows_per_sec"] = round(t["rows"] / t["seconds"], 1) if t["rows"] and t["seconds"] > 0 else None
+        return list(out.values())
+
+    def summary(self) -> str:
+        """Plain-text table of `totals()`."""
+        lines = [f"{'stage':<20} {'calls':>6} {'seconds':>10} {'rows':>12} {'rows/sec':>14} {'peak RSS MB':>12}"]
+        for t in self.totals():
+            rate = f"{t['rows_per_sec']:,.0f}" if t["rows_per_sec"] else "-"
+            lines.append(
+                f"{t['stage']:<20} {t['calls']:>6} {t['seconds']:>10.3f} {t['rows']:>12,} {rate:>14} {t['peak_rss_mb']:>12.1f}"
+            )
+        return "\n".join(lines)
+
+    def cprofile_stats(self, limit: int = 25, sort: str = "cumulative") -> str:
+        """Top `limit` functions from the cProfile capture ("" if not enabled)."""
+        if self._cprofile is None:
+            return ""
+        buf = io.StringIO()
+        pstats.Stats(self._cprofile, stream=buf).sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def write_json(self, path: str) -> str:
+        """Write stage records and totals to `path`; cProfile stats go to `<path>.prof`."""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"stages": self.records, "totals": self.totals()}, fh, indent=2)
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path + ".prof")
+        return path
+
+
+_active = Profiler(enabled=bool(os.environ.get("CATALOGWATCH_PROFILE")), sample_interval=0)
+
+
+def get_profiler() -> Profiler:
+    return _active
+
+
+def set_profiler(profiler: Profiler) -> Profiler:
+    """Make `profiler` the active one and return the previous one."""
+    global _active
+    previous, _active = _active, profiler
+    return previous
+
+
+def disable_profiling() -> None:
+    """Replace the active profiler with a disabled one; the initializer of worker processes."""
+    if _active._cprofile is not None:
+        _active._cprofile.disable()
+    set_profiler(Profiler(enabled=False))
+
+
+@contextmanager
+def profiling(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """Activate and start `profiler` (a new enabled one by default) for the block."""
+    profiler = profiler or Profiler()
+    previous = set_profiler(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        set_profiler(previous)
+
+
+def stage(name: str, rows: Optional[int] = None) -> Any:
+    """Time a block as stage `name` on the active profiler."""
+    return _active.stage(name, rows)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator timing each call as a stage; rows are counted from results with a `shape`."""
+    def decorate(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _active.enabled:
+                return fn(*args, **kwargs)
+            with _active.stage(label) as st:
+                result = fn(*args, **kwargs)
+                if hasattr(result, "shape"):
+                    st.add_rows(result.shape[0])
+                return result
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,108 @@
+"""Read-only, memory-mapped views of Arrow IPC copies of stored datasets.
+
+`open_mapped` maps an uncompressed Arrow IPC file (see
+`export.ensure_arrow_copy`) and returns a zero-copy table whose buffers point
+into the mapping, so the data lives in the OS page cache and is shared by
+every session and worker process reading the same file. Tables are cached per
+file and stamp; a replaced file is mapped again on the next call, while tables
+already handed out keep reading the old file.
+
+`MappedFrame` wraps such a table in the small part of the DataFrame interface
+the dashboard uses: whole columns are converted to pandas on first access and
+cached, and `iloc` converts only the selected rows.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+
+# abspath -> ((mtime_ns, size), table)
+_tables: Dict[str, Tuple[Tuple[int, int], pa.Table]] = {}
+_tables_lock = threading.Lock()
+
+
+def open_mapped(path: str) -> pa.Table:
+    """Memory-map the Arrow IPC file at `path`; cached until the file changes."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        table = ipc.open_file(pa.memory_map(key, "r")).read_all()
+        _tables[key] = (stamp, table)
+        return table
+
+
+class MappedFrame:
+    """Pandas-like, read-only view of an Arrow table.
+
+    Supports `len`, `columns`, `in`, `frame[col]` and `frame.get(col)` (a
+    Series, converted once and shared), and `frame.iloc[...]` with an int, a
+    slice or an array of positions (a DataFrame of just those rows, indexed
+    by position). Safe to share between threads.
+    """
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+        self._series: Dict[str, pd.Series] = {}
+        self._lock = threading.Lock()
+        self.iloc = _ILoc(self)
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self.table.column_names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.table.column_names
+
+    def __getitem__(self, name: str) -> pd.Series:
+        series = self._series.get(name)
+        if series is None:
+            if name not in self:
+                raise KeyError(name)
+            with self._lock:
+                series = self._series.get(name)
+                if series is None:
+                    series = self._series[name] = self.table.column(name).to_pandas().rename(name)
+        return series
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def converted(self) -> List[str]:
+        """Names of the columns converted to pandas so far."""
+        return list(self._series)
+
+    def take(self, positions: Any) -> pd.DataFrame:
+        """Rows at `positions` as a DataFrame indexed by position."""
+        positions = np.asarray(positions, dtype=np.int64)
+        out = self.table.take(positions).to_pandas()
+        out.index = pd.Index(positions)
+        return out
+
+
+class _ILoc:
+    def __init__(self, frame: MappedFrame):
+        self._frame = frame
+
+    def __getitem__(self, key: Any):
+        if isinstance(key, (int, np.integer)):
+            n = len(self._frame)
+            if not -n <= key < n:
+                raise IndexError("row position out of range")
+            return self._frame.take([key % n]).iloc[0]
+        if isinstance(key, slice):
+            return self._frame.take(np.arange(*key.indices(len(self._frame))))
+        return self._frame.take(key)
@@ -0,0 +1,290 @@
+"""Long-running ingest and scoring service (`catalogwatch serve`).
+
+The windows config, compiled notes matcher and scoring engine come from the
+config registry (`catalogwatch.registry`), so requests reuse the compiled
+snapshot and edits to the config files are picked up without a restart. An
+optional trained `NNScorer` is loaded once at startup.
+Ingest jobs are queued to a thread pool; writes to the same dataset name are
+serialized. Endpoints (JSON in and out, bound to localhost by default):
+
+- `GET  /health`, including the active config version
+- `POST /ingest` with `{"path": ..., "name": ...}`, or a raw CSV body
+  (`Content-Type: text/csv`, dataset name from `?name=`); returns `202` and a
+  job id. Dataset names are plain identifiers (`DATASET_NAME`) and always
+  resolve inside `data_dir`. Uploads are spooled to a temporary file as they
+  are read rather than held in memory.
+- `GET  /jobs` and `GET /jobs/<id>` for job status and results; only the
+  latest `MAX_JOBS` jobs are kept, finished ones evicted first
+- `POST /score` with one record or a list of records
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+from catalogwatch.ingest.incremental import discard_manifest
+from catalogwatch.ingest.schema import COLUMN_DTYPES
+from catalogwatch.modeling.scoring import NNScorer
+from catalogwatch.nlp.ann import build_note_index, save_note_index
+from catalogwatch.nlp.embeddings import embedding_cache_dir
+from catalogwatch.pipeline import annotate_frame
+from catalogwatch.records import score_record
+from catalogwatch.registry import current_rules
+from catalogwatch.services.logger import get_logger
+from catalogwatch.services.store import DEFAULT_PARTITION_COLS, write_dataset
+
+
+logger = get_logger(__name__)
+
+# largest CSV upload accepted, in bytes; uploads are spooled to disk
+MAX_BODY = 512 * 1024 * 1024
+# largest JSON body accepted, in bytes; JSON bodies are read into memory
+MAX_JSON_BODY = 16 * 1024 * 1024
+# uploads up to this size stay in memory while spooled
+SPOOL_MEMORY = 8 * 1024 * 1024
+# job records kept for /jobs
+MAX_JOBS = 1000
+
+DATASET_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class CatalogService:
+    """Warm state shared by all requests: config, models and the job table."""
+
+    def __init__(
+        self,
+        windows: Optional[Dict[str, Any]] = None,
+        data_dir: str = "data/ingested",
+        workers: int = 2,
+        partition_cols: Sequence[str] = DEFAULT_PARTITION_COLS,
+        model: Optional[NNScorer] = None,
+    ):
+        self._windows = windows
+        self.data_dir = data_dir
+        self.partition_cols = list(partition_cols)
+        self.model = model
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._name_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def windows(self) -> Dict[str, Any]:
+        """Windows passed at construction, else those of the current config snapshot."""
+        return self._windows if self._windows is not None else current_rules().windows
+
+    # -- scoring ------------------------------------------------------------
+
+    def score_record(self, record: Dict[str, Any], current_year: Optional[int] = None) -> Dict[str, Any]:
+        """Score one raw record without building a DataFrame."""
+        return score_record(record, self.windows, current_year, self.model)
+
+    # -- ingest jobs --------------------------------------------------------
+
+    def dataset_path(self, name: Any) -> str:
+        """Path of dataset `name` under `data_dir`; raises ValueError for any other name."""
+        if not isinstance(name, str) or not DATASET_NAME.match(name):
+            raise ValueError("Dataset name must match [A-Za-z0-9_-]+")
+        root = os.path.realpath(self.data_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.dirname(path) != root:
+            raise ValueError("Dataset name must resolve inside the data directory")
+        return path
+
+    def submit(self, source: Any, name: str, label: str) -> Dict[str, Any]:
+        """Queue an ingest of `source` (a path or file-like CSV) into dataset `name`.
+
+        A file-like `source` is closed when the job finishes. Raises ValueError
+        for an invalid dataset name.
+        """
+        self.dataset_path(name)
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "name": name,
+            "source": label,
+            "submitted_at": datetime.datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            self.jobs[job["id"]] = job
+            self._evict_jobs()
+            self._name_locks.setdefault(name, threading.Lock())
+            snapshot = dict(job)
+        self._pool.submit(self._run, job, source)
+        return snapshot
+
+    def _evict_jobs(self) -> None:
+        # oldest finished jobs first; queued and running ones only if all are
+        excess = len(self.jobs) - MAX_JOBS
+        if excess <= 0:
+            return
+        finished = [k for k, j in self.jobs.items() if j["status"] in ("done", "failed")]
+        for key in (finished + list(self.jobs))[:excess]:
+            self.jobs.pop(key, None)
+
+    def _update(self, job: Dict[str, Any], **fields: Any) -> None:
+        with self._lock:
+            job.update(fields)
+
+    def _run(self, job: Dict[str, Any], source: Any) -> None:
+        self._update(job, status="running")
+        started = time.perf_counter()
+        try:
+            with self._name_locks[job["name"]]:
+                # one config snapshot for the whole job
+                rules = current_rules()
+                windows = self._windows if self._windows is not None else rules.windows
+                df = canonicalize(load_csv(source, dtype=COLUMN_DTYPES), source=job["source"])
+                if not len(df):
+                    raise ValueError("CSV has no data rows; the stored dataset was left unchanged")
+                adf = annotate_frame(df, windows, rules=rules)
+                discard_manifest(job["name"], self.data_dir)
+                path = write_dataset(adf, name=job["name"], path=self.data_dir, partition_cols=self.partition_cols)
+                index = build_note_index(
+                    adf["catalog_id"], adf["ownership_notes"], cache_dir=embedding_cache_dir(self.data_dir)
+                )
+                save_note_index(index, job["name"], self.data_dir)
+            self._update(
+                job,
+                status="done",
+                result={"rows": len(adf), "path": path, "note_stats": adf.attrs.get("note_stats")},
+                seconds=round(time.perf_counter() - started, 3),
+            )
+        except Exception as exc:
+            logger.exception("Ingest job %s failed", job["id"])
+            self._update(
+                job,
+                status="failed",
+                error=f"{type(exc).__name__}: {exc}",
+                seconds=round(time.perf_counter() - started, 3),
+            )
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: CatalogService
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _length(self, limit: int) -> int:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length < 0 or length > limit:
+            raise ValueError("Request body too large")
+        return length
+
+    def _body(self) -> bytes:
+        return self.rfile.read(self._length(MAX_JSON_BODY))
+
+    def _spool_body(self) -> Any:
+        """Copy the body to a temporary file in fixed-size reads; returns it rewound."""
+        remaining = self._length(MAX_BODY)
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+        try:
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    raise ValueError("Request body shorter than Content-Length")
+                spool.write(chunk)
+                remaining -= len(chunk)
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            self._send(200, {"status": "ok", "jobs": len(self.service.jobs), "config_version": current_rules().version})
+        elif parts == ["jobs"]:
+            self._send(200, self.service.list_jobs())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.job(parts[1])
+            if job is None:
+                self._send(404, {"error": "unknown job"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/score":
+                payload = json.loads(self._body() or b"{}")
+                if isinstance(payload, list):
+                    self._send(200, [self.service.score_record(r) for r in payload])
+                else:
+                    self._send(200, self.service.score_record(payload))
+            elif url.path == "/ingest":
+                if "csv" in (self.headers.get("Content-Type") or ""):
+                    name = query.get("name", "canonical_catalogs")
+                    self.service.dataset_path(name)
+                    spool = self._spool_body()
+                    try:
+                        job = self.service.submit(spool, name, label="upload")
+                    except BaseException:
+                        spool.close()
+                        raise
+                else:
+                    payload = json.loads(self._body() or b"{}")
+                    if not isinstance(payload, dict):
+                        raise ValueError("Expected a JSON object")
+                    if "path" not in payload:
+                        raise ValueError("Expected a CSV body or a JSON object with a 'path'")
+                    name = payload.get("name", query.get("name", "canonical_catalogs"))
+                    job = self.service.submit(payload["path"], name, label=payload["path"])
+                self._send(202, job)
+            else:
+                self._send(404, {"error": "not found"})
+        except (ValueError, TypeError, AttributeError) as exc:
+            # the body may be unread; do not reuse the connection
+            self.close_connection = True
+            self._send(400, {"error": str(exc)})
+
+
+def make_server(service: CatalogService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server bound to `service`; call `serve_forever()` to run it."""
+    handler = type("CatalogHandler", (_Handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -1,9 +1,38 @@
-"""Simple file-based store abstraction for Phase 1."""
+"""Simple file-based store abstraction for Phase 1.
+
+Annotated catalogs are stored as a Hive-partitioned Parquet dataset
+(`<path>/<name>/eligibility_window=.../part-*.parquet`) with flat, typed
+columns. `read_dataset` takes column projections and filters that are pushed
+down to Parquet, so callers only load the partitions and columns they need.
+
+Part files hold at most `ROWS_PER_FILE` rows. `update_dataset` changes a
+stored dataset copy-on-write, one file at a time: files without dropped rows
+are hard-linked into the new version, files with dropped rows are rewritten
+and added rows become new part files.
+"""
 from __future__ import annotations
 
 import os
+import shutil
+import uuid
+import numpy as np
 import pandas as pd
-from typing import Any
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from catalogwatch.services.instrumentation import stage
+
+
+DEFAULT_PARTITION_COLS = ("eligibility_window",)
+
+# columns narrowed to compact types before writing
+INT16_COLUMNS = ("release_year", "years_since_release")
+CATEGORY_COLUMNS = ("eligibility_window", "territory", "rights_holder", "ingestion_batch", "ingestion_source")
+
+# largest part file of a partitioned dataset, which bounds the rows an update rewrites per touched file
+ROWS_PER_FILE = 262_144
 
 
 def ensure_data_dir(path: str = "data/ingested") -> None:
@@ -19,3 +48,252 @@ def write_parquet(df: pd.DataFrame, name: str, path: str = "data/ingested") -> s
 
 def read_parquet(path: str) -> pd.DataFrame:
     return pd.read_parquet(path)
+
+
+def dataset_path(name: str, path: str = "data/ingested") -> str:
+    return os.path.join(path, name)
+
+
+def to_storage_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten nested columns and narrow dtypes for storage.
+
+    Legacy `ingestion_metadata` dicts become `ingestion_source`/
+    `ingestion_loaded_at` columns and a categorical `ingestion_loaded_at` (as
+    produced by `canonicalize`) becomes a plain timestamp column. Year columns
+    become nullable int16 and low-cardinality text columns become categoricals.
+    Frames already in storage form pass through.
+    """
+    out = df.copy(deep=False)
+    if "ingestion_metadata" in out.columns:
+        meta = pd.DataFrame(
+            [m if isinstance(m, dict) else {} for m in out["ingestion_metadata"].tolist()],
+            index=out.index,
+            columns=["source", "loaded_at"],
+        )
+        out = out.drop(columns=["ingestion_metadata"])
+        out["ingestion_source"] = meta["source"].astype("category")
+        out["ingestion_loaded_at"] = pd.to_datetime(meta["loaded_at"])
+    loaded_at = out.get("ingestion_loaded_at")
+    if loaded_at is not None and isinstance(loaded_at.dtype, pd.CategoricalDtype):
+        out["ingestion_loaded_at"] = loaded_at.astype(loaded_at.cat.categories.dtype)
+    for col in INT16_COLUMNS:
+        if col in out.columns:
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype("Int16")
+    for col in CATEGORY_COLUMNS:
+        if col in out.columns and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+    return out
+
+
+def _value_type(value_type: pa.DataType) -> pa.DataType:
+    return pa.string() if pa.types.is_null(value_type) else value_type
+
+
+def _storage_schema(df: pd.DataFrame) -> pa.Schema:
+    """Arrow schema for `df` with int32 dictionary indices so chunks with
+    different category counts share one schema. Categoricals without any
+    categories (all missing) are typed as string dictionaries."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), _value_type(f.type.value_type)), f.nullable)
+        if pa.types.is_dictionary(f.type) else f
+        for f in schema
+    ]
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _replace_dir(src: str, dst: str) -> None:
+    old = dst + ".old"
+    if os.path.exists(dst):
+        os.replace(dst, old)
+    os.replace(src, dst)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def write_dataset(
+    df: pd.DataFrame,
+    name: str,
+    path: str = "data/ingested",
+    partition_cols: Sequence[str] = DEFAULT_PARTITION_COLS,
+) -> str:
+    """Write `df` as a partitioned, typed Parquet dataset, replacing any existing one."""
+    with ParquetChunkWriter(name, path=path, partition_cols=partition_cols) as writer:
+        writer.write(df)
+    return writer.path
+
+
+def read_dataset(path: str, columns: Optional[List[str]] = None, filters: Any = None) -> pd.DataFrame:
+    """Read a dataset written by `write_dataset` or `ParquetChunkWriter`.
+
+    Args:
+        path: dataset directory (or a single Parquet file)
+        columns: optional column projection
+        filters: optional pyarrow filter expression or DNF list such as
+            `[("eligibility_window", "in", ["Imminent"]), ("score", ">=", 0.5)]`;
+            filters on partition columns skip whole directories
+
+    Returns:
+        DataFrame with only the requested columns and matching rows
+    """
+    table = pq.read_table(path, columns=columns, filters=filters, partitioning="hive")
+    return table.to_pandas()
+
+
+def dataset_columns(path: str) -> List[str]:
+    """Return the column names of a stored dataset without reading any rows."""
+    return ds.dataset(path, format="parquet", partitioning="hive").schema.names
+
+
+def dataset_files(path: str, columns: List[str]) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Yield `(file, frame)` per data file of a partitioned dataset, in read order.
+
+    `file` is relative to `path`; `frame` holds `columns` of the file's rows,
+    which must be stored in the file rather than in its partition path.
+    """
+    for fragment in ds.dataset(path, format="parquet", partitioning="hive").get_fragments():
+        yield os.path.relpath(fragment.path, path), fragment.to_table(columns=columns).to_pandas()
+
+
+def update_dataset(
+    path: str,
+    added: pd.DataFrame,
+    keep: Dict[str, np.ndarray],
+    partition_cols: Sequence[str],
+) -> Dict[str, int]:
+    """Replace the partitioned dataset at `path` with a copy-on-write update.
+
+    `keep` maps files (as named by `dataset_files`) to boolean masks of the
+    rows to keep; those files are rewritten with just these rows, or left out
+    if none remain. Every other file is hard-linked (copied where links are
+    not supported) unchanged. `added` rows are converted with
+    `to_storage_frame` and written as new part files. The new version
+    replaces the old one in one step. Raises ValueError if `added` does not
+    have the dataset's columns. Returns counts of linked, rewritten and
+    added files.
+    """
+    schema = ds.dataset(path, format="parquet", partitioning="hive").schema
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    counts = {"linked": 0, "rewritten": 0, "added": 0}
+    try:
+        if len(added):
+            frame = to_storage_frame(added)
+            table = pa.Table.from_pandas(frame, preserve_index=False).cast(_storage_schema(frame))
+            if sorted(table.schema.names) != sorted(schema.names):
+                raise ValueError("Added rows do not have the stored dataset's columns")
+            with stage("write", rows=len(frame)):
+                pq.write_to_dataset(
+                    table.select(schema.names).cast(schema),
+                    tmp,
+                    partition_cols=list(partition_cols),
+                    basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                    max_rows_per_file=ROWS_PER_FILE,
+                    row_group_size=ROWS_PER_FILE,
+                )
+            counts["added"] = sum(len(files) for _, _, files in os.walk(tmp))
+        for fragment in ds.dataset(path, format="parquet", partitioning="hive").get_fragments():
+            name = os.path.relpath(fragment.path, path)
+            dst = os.path.join(tmp, name)
+            mask = keep.get(name)
+            if mask is not None and not mask.all():
+                if mask.any():
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    pq.write_table(pq.ParquetFile(fragment.path).read().filter(pa.array(mask)), dst)
+                counts["rewritten"] += 1
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            try:
+                os.link(fragment.path, dst)
+            except OSError:
+                shutil.copy2(fragment.path, dst)
+            counts["linked"] += 1
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _replace_dir(tmp, path)
+    return counts
+
+
+class ParquetChunkWriter:
+    """Append DataFrame chunks to the store.
+
+    Without `partition_cols` every chunk becomes a row group of a single
+    `<path>/<name>.parquet` file. With `partition_cols` every chunk is written
+    as part files of a Hive-partitioned dataset under `<path>/<name>/`. Chunks
+    are converted with `to_storage_frame` and cast to the schema of the first
+    one. Output goes to a temporary location that replaces the destination
+    only when the writer is closed without error.
+    """
+
+    def __init__(self, name: str, path: str = "data/ingested", partition_cols: Optional[Sequence[str]] = None):
+        ensure_data_dir(path)
+        self.partition_cols = list(partition_cols or [])
+        if self.partition_cols:
+            self.path = dataset_path(name, path)
+        else:
+            self.path = os.path.join(path, f"{name}.parquet")
+        self._tmp_path = self.path + ".tmp"
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._schema: Optional[pa.Schema] = None
+        self._chunks = 0
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        with stage("write", rows=len(df)):
+            self._write(df)
+
+    def _write(self, df: pd.DataFrame) -> None:
+        df = to_storage_frame(df)
+        if self._schema is None:
+            self._schema = _storage_schema(df)
+            if self.partition_cols:
+                shutil.rmtree(self._tmp_path, ignore_errors=True)
+                os.makedirs(self._tmp_path)
+            else:
+                self._writer = pq.ParquetWriter(self._tmp_path, self._schema)
+        table = pa.Table.from_pandas(df, preserve_index=False).cast(self._schema)
+        if self.partition_cols:
+            pq.write_to_dataset(
+                table,
+                self._tmp_path,
+                partition_cols=self.partition_cols,
+                basename_template=f"part-{self._chunks:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                max_rows_per_file=ROWS_PER_FILE,
+                row_group_size=ROWS_PER_FILE,
+            )
+        else:
+            self._writer.write_table(table)
+        self._chunks += 1
+        self.rows += len(df)
+
+    def close(self) -> str:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._schema is not None:
+            if self.partition_cols:
+                _replace_dir(self._tmp_path, self.path)
+            else:
+                os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.isdir(self._tmp_path):
+            shutil.rmtree(self._tmp_path, ignore_errors=True)
+        elif os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "ParquetChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
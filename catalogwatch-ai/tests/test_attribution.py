@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalogwatch.modeling.attribution import Attributor, component_frame
+from catalogwatch.modeling.engine import FEATURE_COLUMNS, get_engine
+from catalogwatch.modeling.explainability import compute_contributions
+from catalogwatch.modeling.scoring import NNScorer, simple_score_batch
+
+
+def test_attributor_exact_for_engine_and_additive_for_learned_model():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(-1, 70, 500), rng.random((500, 4)) < 0.3]).astype(float)
+
+    exact = Attributor(get_engine()).explain(X)
+    expected = compute_contributions(dict(zip(FEATURE_COLUMNS, X[3])))
+    for key, value in expected.items():
+        assert exact[key].iloc[3] == pytest.approx(value)
+    chart = component_frame(exact.iloc[3])
+    assert list(chart.columns) == ["component", "value", "contribution"]
+    assert chart["contribution"].tolist() == pytest.approx([expected[k] for k in ("eligibility_contribution", "ownership_contribution", "exclusive_contribution")])
+
+    model = NNScorer(max_epochs=20).fit(X, simple_score_batch(X))
+    attributor = Attributor(model, background=X, n_background=16, n_permutations=4)
+    out = attributor.explain(X[:50])
+    contributions = out[[f"{c}_contribution" for c in FEATURE_COLUMNS]].sum(axis=1)
+    assert np.allclose(contributions + out["base_value"], model.predict(X[:50]), atol=1e-5)
+    unique = attributor.stats["unique"]
+    assert unique <= 50
+
+    again = attributor.explain(X[:50])
+    assert attributor.stats["cache_hits"] == unique
+    pd.testing.assert_frame_equal(again, out)
+    assert component_frame(out.iloc[0])["component"].tolist() == FEATURE_COLUMNS
@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+ENV = {**os.environ, "PYTHONPATH": os.path.join(ROOT, "src")}
+
+# imported lazily by the commands that need them, never at CLI startup
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "streamlit", "yaml")
+# the CLI imports in ~2% of pandas' import time; generous for noisy CI machines
+STARTUP_PANDAS_RATIO = 5
+
+
+def _python(code, stdin=None):
+    return subprocess.run(
+        [sys.executable, "-c", code], input=stdin, capture_output=True, text=True, env=ENV, cwd=ROOT, check=True
+    )
+
+
+def test_cli_import_and_score_stay_pandas_free():
+    heavy = "print(sorted(m for m in ('pandas', 'pyarrow', 'streamlit') if m in sys.modules))"
+    assert _python(f"import sys, catalogwatch.cli; {heavy}").stdout.strip() == "[]"
+
+    records = '{"catalog_id": "A", "release_year": 1980, "ownership_notes": "Reverted to artist"}\n'
+    run = _python(
+        "import sys; sys.argv = ['catalogwatch', 'score']\n"
+        f"from catalogwatch.cli import main; main(); {heavy}",
+        stdin=records,
+    )
+    scored, modules = run.stdout.strip().splitlines()
+    assert modules == "[]"
+    scored = json.loads(scored)
+    assert scored["catalog_id"] == "A" and scored["ownership_signals"]["reversion"]
+
+
+def _import_micros(module):
+    """Cumulative `-X importtime` figure of `module`, in microseconds."""
+    run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=ENV, cwd=ROOT, check=True,
+    )
+    for line in run.stderr.splitlines():
+        # "import time: <self> | <cumulative> | <module, indented by depth>"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not in -X importtime output")
+
+
+def test_cli_startup_imports_stay_light():
+    modules = "print(sorted({m.split('.')[0] for m in sys.modules} & set(sys.argv[1:])))"
+    run = subprocess.run(
+        [sys.executable, "-c", f"import sys, catalogwatch.cli; {modules}", *HEAVY_MODULES],
+        capture_output=True, text=True, env=ENV, cwd=ROOT, check=True,
+    )
+    assert run.stdout.strip() == "[]"
+    # compared with importing pandas in the same environment, not the wall clock
+    assert _import_micros("catalogwatch.cli") * STARTUP_PANDAS_RATIO < _import_micros("pandas")
+
+
+def test_full_ingest_invalidates_incremental_manifest(tmp_path):
+    from catalogwatch.services.store import read_dataset
+
+    alt = tmp_path / "alt.yml"
+    alt.write_text(
+        "windows:\n"
+        "  - {name: Not Eligible, min_years: -999, max_years: 14}\n"
+        "  - {name: Early Watch, min_years: 15, max_years: 999}\n"
+    )
+    sample = os.path.join(ROOT, "data", "samples", "sample_catalogs.csv")
+
+    def ingest(*flags):
+        argv = ["catalogwatch", "ingest", sample, "--data-dir", str(tmp_path), *flags]
+        return _python(f"import sys; sys.argv = {argv!r}\nfrom catalogwatch.cli import main; main()").stdout
+
+    ingest("--incremental")
+    ingest("--windows", str(alt))
+    assert not (tmp_path / "canonical_catalogs.manifest.json").exists()
+    assert "5 added" in ingest("--incremental")
+    stored = read_dataset(str(tmp_path / "canonical_catalogs")).set_index("catalog_id")
+    assert stored.loc["CAT-005", "eligibility_window"] == "Not Eligible"
+
+
+def test_empty_input_keeps_the_stored_dataset(tmp_path):
+    from catalogwatch.services.store import read_dataset
+
+    sample = os.path.join(ROOT, "data", "samples", "sample_catalogs.csv")
+    empty = tmp_path / "empty.csv"
+    with open(sample, encoding="utf-8") as fh:
+        empty.write_text(fh.readline())
+
+    def ingest(path, *flags, check=True):
+        argv = ["catalogwatch", "ingest", str(path), "--data-dir", str(tmp_path), *flags]
+        return subprocess.run(
+            [sys.executable, "-c", f"import sys; sys.argv = {argv!r}\nfrom catalogwatch.cli import main; main()"],
+            capture_output=True, text=True, env=ENV, cwd=ROOT, check=check,
+        )
+
+    ingest(sample)
+    for flags in ((), ("--chunksize", "2"), ("--incremental",)):
+        run = ingest(empty, *flags, check=False)
+        assert run.returncode != 0 and "no data rows" in run.stderr
+        assert len(read_dataset(str(tmp_path / "canonical_catalogs"))) == 5
+        assert (tmp_path / "canonical_catalogs.ann").exists()
+
+
+def test_ingest_paths_store_the_same_row_hashes(tmp_path):
+    import pandas as pd
+
+    from catalogwatch.ingest.csv_loader import canonicalize, row_hashes
+    from catalogwatch.ingest.schema import COLUMN_DTYPES
+    from catalogwatch.services.store import read_dataset
+
+    # padded, lower-case and numeric-looking values that canonicalization or dtype inference would change
+    raw = pd.DataFrame({
+        "catalog_id": [" cat-101", "cat-102 "],
+        "artist_name": [" Prince ", "Wire"],
+        "track_title": ["1999", "154"],
+        "release_year": ["1984", "1986"],
+        "rights_holder": ["0042", "007"],
+        "territory": [" us", "GB"],
+        "ownership_notes": ["Reverted to artist", None],
+    })
+    feed = tmp_path / "feed.csv"
+    raw.to_csv(feed, index=False)
+
+    hashes = {}
+    for flags in ((), ("--chunksize", "1"), ("--incremental",)):
+        data_dir = tmp_path / ("_".join(flags) or "full")
+        argv = ["catalogwatch", "ingest", str(feed), "--data-dir", str(data_dir), *flags]
+        _python(f"import sys; sys.argv = {argv!r}\nfrom catalogwatch.cli import main; main()")
+        stored = read_dataset(str(data_dir / "canonical_catalogs")).set_index("catalog_id")
+        hashes[flags] = stored.loc[["CAT-101", "CAT-102"], "row_hash"].tolist()
+
+    expected = row_hashes(pd.read_csv(feed, dtype=COLUMN_DTYPES)).tolist()
+    assert all(h == expected for h in hashes.values())
+    assert (row_hashes(canonicalize(pd.read_csv(feed, dtype=COLUMN_DTYPES))) != expected).all()
@@ -0,0 +1,94 @@
+from catalogwatch.api.data import build_catalog, content_hash, read_bytes
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.nlp.parser import parse_ownership_notes
+
+
+def test_annotated_catalog_lookup_and_evidence():
+    data = read_bytes("data/samples/sample_catalogs.csv")
+    catalog = build_catalog(data, load_windows("configs/eligibility_windows.yml"), current_year=2025)
+
+    row = catalog.row("CAT-003")
+    assert row["catalog_id"] == "CAT-003"
+    assert catalog.evidence("CAT-003") == parse_ownership_notes(row["ownership_notes"])["evidence"]
+    assert catalog.window_counts()["count"].sum() == len(catalog)
+
+    assert content_hash(data) == content_hash(bytes(data))
+    assert content_hash(data) != content_hash(data + b"\n")
+
+
+def test_annotated_catalog_similar_notes():
+    data = read_bytes("data/samples/sample_catalogs.csv")
+    catalog = build_catalog(data, load_windows("configs/eligibility_windows.yml"), current_year=2025)
+
+    similar = catalog.similar("CAT-001", k=3)
+    assert len(similar) == 3 and "CAT-001" not in set(similar["catalog_id"])
+    assert similar["similarity"].is_monotonic_decreasing
+    assert catalog.similar("CAT-404").empty
+
+
+def test_annotated_catalog_forecast_is_cached():
+    data = read_bytes("data/samples/sample_catalogs.csv")
+    catalog = build_catalog(data, load_windows("configs/eligibility_windows.yml"), current_year=2025)
+
+    fc = catalog.forecast(2026, 2030)
+    assert fc.years == [2026, 2027, 2028, 2029, 2030]
+    assert fc.counts.sum().eq(len(catalog)).all()
+    assert list(fc.entry_years.index) == catalog.frame["catalog_id"].tolist()
+    assert catalog.forecast(2026, 2030) is fc
+
+    # shared by every session, so only the most recently used ranges are kept
+    from catalogwatch.api.data import MAX_FORECASTS
+    for end in range(2031, 2031 + MAX_FORECASTS):
+        catalog.forecast(2026, end)
+        catalog.forecast(2026, 2030)
+    assert len(catalog._forecasts) == MAX_FORECASTS
+    assert catalog.forecast(2026, 2030) is fc
+    assert (2026, 2031) not in catalog._forecasts
+
+
+def test_stored_catalog_is_memory_mapped_and_matches(tmp_path):
+    import os
+
+    import numpy as np
+    import pyarrow as pa
+
+    from catalogwatch.api.data import build_stored_catalog
+    from catalogwatch.api.query import filter_mask, top_k
+    from catalogwatch.nlp.ann import build_note_index, save_note_index
+    from catalogwatch.services.export import arrow_copy_path
+    from catalogwatch.services.mapped import open_mapped
+    from catalogwatch.services.store import write_dataset
+
+    windows = load_windows("configs/eligibility_windows.yml")
+    built = build_catalog(read_bytes("data/samples/sample_catalogs.csv"), windows, current_year=2025)
+    src = write_dataset(built.frame, name="catalogs", path=str(tmp_path))
+
+    allocated = pa.total_allocated_bytes()
+    stored = build_stored_catalog(src, windows)
+    assert pa.total_allocated_bytes() - allocated < 4096
+    assert os.path.exists(arrow_copy_path(src))
+    assert open_mapped(arrow_copy_path(src)) is stored.frame.table
+    assert len(stored) == len(built)
+    # partitioning loses the categorical order; the config order is re-applied
+    assert stored.window_counts().astype({"window": str}).equals(built.window_counts().astype({"window": str}))
+
+    mask = filter_mask(stored.frame, windows=["Imminent", "Post Eligibility"], score_range=(0.1, 1.0))
+    expected = filter_mask(built.frame, windows=["Imminent", "Post Eligibility"], score_range=(0.1, 1.0))
+    assert mask.sum() == expected.sum()
+    assert set(stored.frame.converted()) == {"catalog_id", "eligibility_window", "score"}
+    top = top_k(stored.frame, k=3, mask=mask)
+    assert top["catalog_id"].tolist() == top_k(built.frame, k=3, mask=expected)["catalog_id"].tolist()
+    # slices are indexed by position in the mapped table
+    assert stored.frame["catalog_id"].to_numpy()[top.index].tolist() == top["catalog_id"].tolist()
+    assert stored.row("CAT-003")["ownership_notes"] == built.row("CAT-003")["ownership_notes"]
+    assert stored.frame.iloc[:0].empty
+
+    # similar-contract lookups use the index saved with the dataset
+    save_note_index(build_note_index(built.frame["catalog_id"], built.frame["ownership_notes"]), "catalogs", str(tmp_path))
+    indexed = build_stored_catalog(src, windows)
+    assert isinstance(indexed._note_index.vectors, np.memmap)
+    assert indexed.similar("CAT-001", k=3)["catalog_id"].tolist() == built.similar("CAT-001", k=3)["catalog_id"].tolist()
+
+    # rewriting the dataset refreshes the copy on the next build
+    write_dataset(built.frame.iloc[:3], name="catalogs", path=str(tmp_path))
+    assert len(build_stored_catalog(src, windows)) == 3
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from catalogwatch.api.query import IdSearch, filter_mask, page, top_k
+
+
+def _frame(n=1000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "catalog_id": [f"CAT-{i:05d}" for i in range(n)],
+        "eligibility_window": rng.choice(["Early Watch", "Imminent"], size=n),
+        "territory": rng.choice(["US", "UK"], size=n),
+        "rights_holder": rng.choice(["BigLabel US", "SmallLabel"], size=n),
+        "score": rng.random(n),
+        "years_since_release": pd.array(rng.integers(0, 60, size=n), dtype="Int64"),
+        "signal_reversion": rng.random(n) > 0.5,
+        "signal_exclusive_license": False,
+        "signal_artist_owned": False,
+        "signal_ambiguous": False,
+    })
+
+
+def test_filter_top_k_and_page():
+    df = _frame()
+    mask = filter_mask(df, windows=["Imminent"], rights_holder="biglabel", score_range=(0.2, 0.9), signals=["reversion"])
+    expected = df[(df.eligibility_window == "Imminent") & (df.rights_holder == "BigLabel US")
+                  & df.score.between(0.2, 0.9) & df.signal_reversion]
+    assert mask.sum() == len(expected)
+
+    top = top_k(df, k=5, by="score", mask=mask)
+    assert top["catalog_id"].tolist() == expected.nlargest(5, "score")["catalog_id"].tolist()
+
+    rows, pages = page(df, mask, 1, 10)
+    assert pages == -(-len(expected) // 10)
+    assert rows["catalog_id"].tolist() == expected["catalog_id"].iloc[10:20].tolist()
+
+
+def test_id_search():
+    df = _frame()
+    assert IdSearch(df["catalog_id"]).search("cat-0012", limit=3) == ["CAT-00120", "CAT-00121", "CAT-00122"]
@@ -1,5 +1,9 @@
+import numpy as np
+import pytest
+
 from catalogwatch.eligibility.rules import years_since_release, classify_years, explain_classification
 from catalogwatch.eligibility.config import load_windows
+from catalogwatch.eligibility.classifier import WindowClassifier
 
 
 def test_years_and_windows():
@@ -17,3 +21,52 @@ def test_years_and_windows():
     expl = explain_classification(1995, 2025, windows)
     assert expl["years_since_release"] == 30
     assert expl["eligibility_window"] == "Early Watch"
+
+
+def test_window_classifier_batch_and_validation():
+    windows = load_windows("configs/eligibility_windows.yml")
+    clf = WindowClassifier.from_config(windows)
+
+    years = np.array([-5, 24, 25, 30, 31, 38, 39, 1000, np.nan])
+    labels = list(clf.classify(years).astype(object))
+    assert labels == [classify_years(None if np.isnan(y) else int(y), windows)["eligibility_window"] for y in years]
+    assert labels[-2:] == ["Unmatched", "Unknown"]
+    assert classify_years(36, windows)["matched_rule"]["name"] == "Imminent"
+
+    with pytest.raises(ValueError, match="overlap"):
+        WindowClassifier([{"name": "a", "min_years": 0, "max_years": 10}, {"name": "b", "min_years": 10, "max_years": 20}])
+    with pytest.raises(ValueError, match="Gap"):
+        WindowClassifier([{"name": "a", "min_years": 0, "max_years": 10}, {"name": "b", "min_years": 12, "max_years": 20}])
+    with pytest.raises(ValueError, match="sorted"):
+        WindowClassifier([{"name": "b", "min_years": 11, "max_years": 20}, {"name": "a", "min_years": 0, "max_years": 10}])
+
+
+def test_forecast_matches_per_year_classification():
+    from catalogwatch.eligibility.forecast import forecast
+
+    windows = load_windows("configs/eligibility_windows.yml")
+    release = [1990, 1995, 2000, None, 1960]
+    fc = forecast(release, 2025, 2035, windows, ids=["A", "B", "C", "D", "E"])
+
+    for year in fc.years:
+        labels = [classify_years(None if r is None else year - r, windows)["eligibility_window"] for r in release]
+        for window in fc.counts.index:
+            assert fc.counts.loc[window, year] == labels.count(window)
+    assert fc.counts.loc["Unknown"].eq(1).all()
+
+    # 1990 release: Imminent at 36 years (2026), Post Eligibility at 39 (2029)
+    assert fc.entry_years.loc["A", "Imminent"] == 2026
+    assert fc.entry_years.loc["A", "Post Eligibility"] == 2029
+    # already in Post Eligibility (1960) or Early Watch (1995) before the range: no entry
+    assert fc.entry_years.loc["E"].isna().all()
+    assert fc.entry_years.isna().loc["B", "Early Watch"] and fc.entry_years.loc["B", "Mid Window"] == 2026
+    # entry years add up to the transition table
+    for window in fc.entry_years.columns:
+        per_year = fc.entry_years[window].value_counts()
+        assert all(fc.entries.loc[window, year] == per_year.get(year, 0) for year in fc.years)
+    assert fc.entries.loc["Imminent", 2026] == 1 and fc.entries.loc["Imminent", 2025] == 0
+    assert fc.entries.loc["Post Eligibility", 2025] == 0
+
+    timeline = fc.timeline()
+    assert list(timeline.columns) == ["year", "window", "count", "entering"]
+    assert len(timeline) == len(fc.years) * len(fc.counts)
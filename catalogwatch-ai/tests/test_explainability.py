@@ -1,5 +1,14 @@
+import numpy as np
+import pytest
+
 from catalogwatch.modeling.features import feature_from_record
 from catalogwatch.modeling.explainability import compute_contributions
+from catalogwatch.modeling.engine import FEATURE_COLUMNS, ScoringEngine, get_engine
+from catalogwatch.modeling.scoring import NNScorer, simple_score, simple_score_batch
+from catalogwatch.modeling.feature_matrix import FeatureMatrix
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+from catalogwatch.pipeline import annotate_frame
 
 
 def test_explainability_contributions():
@@ -15,3 +24,47 @@ def test_explainability_contributions():
     assert abs(expl["eligibility_value"] - 0.75) < 1e-6
     # total should be between 0 and 1
     assert 0.0 <= expl["total"] <= 1.0
+
+
+def test_engine_scores_and_contributions_agree():
+    X = np.array([
+        [30, 1, 0, 0, 0],
+        [45, 0, 1, 1, 1],
+        [-1, 0, 0, 0, 1],
+    ], dtype=float)
+    scores, values, contributions = get_engine().score(X)
+    assert np.allclose(contributions.sum(axis=1).clip(0, 1), scores)
+
+    for row, score in zip(X, scores):
+        feats = dict(zip(FEATURE_COLUMNS, row))
+        assert abs(simple_score(feats) - score) < 1e-12
+        assert abs(compute_contributions(feats)["total"] - score) < 1e-12
+
+    # 45 years saturates eligibility; ambiguous + artist-owned gives clarity 0.7
+    assert values[1].tolist() == pytest.approx([1.0, 0.7, -0.2])
+
+
+def test_engine_weights_come_from_config():
+    from catalogwatch.registry import current_rules
+
+    rules = current_rules()
+    assert rules.engine is get_engine()
+    # the parsed config is shared, so change a copy
+    cfg = dict(rules.scoring, weights={"eligibility": 1.0, "ownership_clarity": 0.0, "exclusive_penalty": 0.0})
+    scores, _, _ = ScoringEngine(cfg).score(np.array([[20, 0, 1, 0, 0]], dtype=float))
+    assert scores[0] == pytest.approx(0.5)
+
+
+def test_feature_matrix_roundtrip_and_scoring(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+    adf = annotate_frame(canonicalize(load_csv("data/samples/sample_catalogs.csv")), windows, current_year=2025)
+
+    fm = FeatureMatrix.from_frame(adf, embeddings=np.ones((len(adf), 4)))
+    assert fm.numeric.dtype == np.float32 and fm.flags.dtype == np.int8
+    assert np.allclose(simple_score_batch(fm), adf["score"])
+    assert len(NNScorer().predict(fm)) == len(adf)
+
+    loaded = FeatureMatrix.load(fm.save(str(tmp_path / "features")))
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert np.array_equal(loaded.to_matrix(), fm.to_matrix())
+    assert np.allclose(simple_score_batch(loaded[1:3]), adf["score"].iloc[1:3])
@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pytest
+
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.ingest.csv_loader import canonicalize, load_csv
+from catalogwatch.pipeline import SIGNAL_COLUMNS, annotate_frame
+from catalogwatch.services.export import FORMATS, export_batches, export_dataset, export_frame
+from catalogwatch.services.store import write_dataset
+
+
+def _annotated():
+    df = canonicalize(load_csv("data/samples/sample_catalogs.csv"))
+    extra = pd.DataFrame([
+        {"catalog_id": "CAT-Q1", "release_year": None, "ownership_notes": 'says "hi"\\\n\tback'},
+        {"catalog_id": "CAT-Q2", "release_year": 1970, "ownership_notes": None},
+    ])
+    df = pd.concat([df, canonicalize(extra)], ignore_index=True)
+    return annotate_frame(df, load_windows("configs/eligibility_windows.yml"), current_year=2025)
+
+
+def _read(path, fmt):
+    if fmt in ("arrow", "feather"):
+        return ipc.open_file(path).read_pandas()
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    if fmt == "csv":
+        return pd.read_csv(path)
+    return pd.read_json(path, lines=True)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_frame_round_trips_flat_columns(tmp_path, fmt):
+    adf = _annotated()
+    mask = (adf["score"] > 0).to_numpy()
+    out = tmp_path / f"out.{fmt}"
+    result = export_frame(adf, str(out), mask=mask)
+    assert result["format"] == fmt and result["rows"] == mask.sum()
+    assert [p.name for p in tmp_path.iterdir()] == [f"out.{fmt}"]
+
+    back = _read(out, fmt)
+    expected = adf[mask].reset_index(drop=True)
+    assert back["catalog_id"].tolist() == expected["catalog_id"].tolist()
+    assert "ownership_signals" not in back.columns
+    for col in SIGNAL_COLUMNS.values():
+        assert back[col].astype(bool).tolist() == expected[col].tolist()
+    np.testing.assert_allclose(back["score"].to_numpy(dtype=float), expected["score"].to_numpy(dtype=float))
+    notes = back["ownership_notes"].astype(object).where(back["ownership_notes"].notna(), None).tolist()
+    assert notes == expected["ownership_notes"].astype(object).where(expected["ownership_notes"].notna(), None).tolist()
+
+
+def test_jsonl_lines_are_json_objects(tmp_path):
+    adf = _annotated()
+    export_frame(adf, str(tmp_path / "out.jsonl"))
+    lines = (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == len(adf)
+    by_id = {r["catalog_id"]: r for r in records}
+    assert by_id["CAT-Q1"]["ownership_notes"] == 'says "hi"\\\n\tback'
+    assert by_id["CAT-Q1"]["release_year"] is None
+    assert by_id["CAT-Q2"]["ownership_notes"] is None
+    assert isinstance(by_id["CAT-Q2"]["signal_reversion"], bool)
+
+
+def test_ipc_export_unifies_batch_dictionaries(tmp_path):
+    def batch(values):
+        arr = pa.array(values).dictionary_encode()
+        return pa.RecordBatch.from_arrays([arr, pa.array(range(len(values)))], names=["window", "n"])
+
+    batches = [batch(["a", "b"]), batch(["c", "a"]), batch(["b", "d", "c"])]
+    result = export_batches(batches, str(tmp_path / "out.arrow"))
+    assert result["rows"] == 7
+    table = ipc.open_file(str(tmp_path / "out.arrow")).read_all()
+    assert table.column("window").to_pylist() == ["a", "b", "c", "a", "b", "d", "c"]
+
+
+def test_export_dataset_filters_and_partitions(tmp_path):
+    adf = _annotated()
+    src = write_dataset(adf, name="catalogs", path=str(tmp_path))
+    out = tmp_path / "by_window"
+    windows = sorted(adf["eligibility_window"].unique().tolist())[:2]
+    result = export_dataset(
+        src, str(out), fmt="parquet", columns=["catalog_id", "eligibility_window", "score"],
+        filter=[("eligibility_window", "in", windows)], partition_cols=["eligibility_window"],
+    )
+    expected = adf[adf["eligibility_window"].isin(windows)]
+    assert result["rows"] == len(expected)
+    assert len(list(out.iterdir())) == len(windows)
+    back = ds.dataset(str(out), format="parquet", partitioning="hive").to_table().to_pandas()
+    assert sorted(back["catalog_id"]) == sorted(expected["catalog_id"])
+
+    with pytest.raises(ValueError):
+        export_dataset(src, str(tmp_path / "out.csv"), partition_cols=["territory"])
+    with pytest.raises(ValueError, match="unknown columns: nope; available: catalog_id"):
+        export_dataset(src, str(tmp_path / "out.csv"), columns=["catalog_id", "nope"])
+    with pytest.raises(FileNotFoundError, match="missing"):
+        export_dataset(str(tmp_path / "missing"), str(tmp_path / "out.csv"))
+    empty = export_dataset(src, str(tmp_path / "none.arrow"), filter=[("score", ">", 2.0)])
+    assert empty["rows"] == 0 and ipc.open_file(str(tmp_path / "none.arrow")).read_all().num_rows == 0
+
+
+def test_arrow_copy_is_refreshed_once_across_processes(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from catalogwatch.services.export import ensure_arrow_copy
+
+    src = write_dataset(_annotated(), name="catalogs", path=str(tmp_path))
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        paths = set(pool.map(ensure_arrow_copy, [src] * 8))
+    assert len(paths) == 1
+    out = paths.pop()
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+    assert ipc.open_file(out).read_all().num_rows == len(_annotated())
@@ -0,0 +1,210 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalogwatch.ingest.csv_loader import load_csv, iter_csv_chunks, canonicalize, row_hashes
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.ingest.incremental import incremental_ingest
+from catalogwatch.nlp.ann import load_note_index, note_vectors
+from catalogwatch.pipeline import annotate_frame, annotate_chunks
+from catalogwatch.services.store import ParquetChunkWriter, read_parquet, read_dataset, to_storage_frame, write_dataset
+
+
+SAMPLE = "data/samples/sample_catalogs.csv"
+
+
+def test_chunked_ingest_matches_full_load(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+
+    with ParquetChunkWriter("chunked", path=str(tmp_path)) as writer:
+        for chunk in iter_csv_chunks(SAMPLE, chunksize=2):
+            writer.write(annotate_frame(canonicalize(chunk), windows, current_year=2025))
+    assert writer.rows == 5
+
+    streamed = read_parquet(writer.path).drop(columns=["ingestion_batch", "ingestion_loaded_at"])
+    full = to_storage_frame(annotate_frame(canonicalize(load_csv(SAMPLE)), windows, current_year=2025))
+    full = full.drop(columns=["ingestion_batch", "ingestion_loaded_at"])
+    pd.testing.assert_frame_equal(streamed, full, check_dtype=False, check_categorical=False)
+
+
+def test_chunked_ingest_validates_first_chunk(tmp_path):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("catalog_id,artist_name\nCAT-1,Someone\n")
+    with pytest.raises(ValueError, match="Missing required columns"):
+        next(iter_csv_chunks(str(bad), chunksize=10))
+
+
+def test_parallel_ingest_is_ordered_and_deterministic():
+    windows = load_windows("configs/eligibility_windows.yml")
+
+    def run(workers):
+        chunks = iter_csv_chunks(SAMPLE, chunksize=2)
+        out = pd.concat(annotate_chunks(chunks, windows, workers=workers, current_year=2025))
+        return out.drop(columns=["ingestion_batch", "ingestion_loaded_at"])
+
+    serial = run(1)
+    assert list(serial["catalog_id"]) == list(load_csv(SAMPLE)["catalog_id"])
+    pd.testing.assert_frame_equal(run(2), serial)
+
+    # notes embedded in the workers match embedding them afterwards
+    shards = list(annotate_chunks(iter_csv_chunks(SAMPLE, chunksize=2), windows, workers=2, current_year=2025, embed_notes=True))
+    ids, vectors = note_vectors(serial["catalog_id"], serial["ownership_notes"])
+    assert np.concatenate([s[1] for s in shards]).tolist() == ids.tolist()
+    assert np.allclose(np.concatenate([s[2] for s in shards]), vectors)
+
+
+def test_incremental_ingest_reannotates_only_delta(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+    csv_path = tmp_path / "feed.csv"
+    df = pd.read_csv(SAMPLE)
+    df.to_csv(csv_path, index=False)
+
+    first = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert first["counts"]["added"] == 5
+
+    df.loc[df.catalog_id == "CAT-002", "ownership_notes"] = "Disputed; exclusive rights"
+    df = df[df.catalog_id != "CAT-004"]
+    df = pd.concat([df, pd.DataFrame([{**df.iloc[0].to_dict(), "catalog_id": "CAT-006"}])])
+    df.to_csv(csv_path, index=False)
+
+    second = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert second["added"] == ["CAT-006"]
+    assert second["changed"] == ["CAT-002"]
+    assert second["removed"] == ["CAT-004"]
+    assert second["counts"]["unchanged"] == 3
+    # only the files holding CAT-002 and CAT-004 are rewritten; the delta lands in new files
+    assert not second["full_rewrite"] and second["files"] == {"linked": 2, "rewritten": 2, "added": 2}
+
+    index = load_note_index("canonical_catalogs", path=str(tmp_path))
+    assert len(index) == 5
+    assert index.top_k_similar("CAT-006", k=1)[0][0] == "CAT-001"
+    with pytest.raises(KeyError):
+        index.vector("CAT-004")
+
+    snapshot = read_dataset(str(tmp_path / "canonical_catalogs"))
+    snapshot = snapshot.sort_values("catalog_id", ignore_index=True)
+    full = annotate_frame(canonicalize(load_csv(str(csv_path))), windows, current_year=2025)
+    full = full.sort_values("catalog_id", ignore_index=True)
+    cols = ["catalog_id", "eligibility_window", "signal_ambiguous", "score", "row_hash"]
+    pd.testing.assert_frame_equal(snapshot[cols], full[cols], check_categorical=False, check_dtype=False)
+
+    mtime = os.stat(tmp_path / "canonical_catalogs").st_mtime_ns
+    third = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert third["counts"]["unchanged"] == 5 and third["files"] == {"linked": 0, "rewritten": 0, "added": 0}
+    assert os.stat(tmp_path / "canonical_catalogs").st_mtime_ns == mtime
+
+
+def test_partitioned_dataset_types_and_pushdown(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+    adf = annotate_frame(canonicalize(load_csv(SAMPLE)), windows, current_year=2025)
+    root = write_dataset(adf, "catalogs", path=str(tmp_path), partition_cols=["eligibility_window", "territory"])
+
+    assert sorted(p.name for p in (tmp_path / "catalogs").iterdir())[0].startswith("eligibility_window=")
+    stored = read_dataset(root)
+    assert stored["release_year"].dtype == "Int16"
+    assert stored["signal_reversion"].dtype == bool
+    assert isinstance(stored["territory"].dtype, pd.CategoricalDtype)
+    assert "ingestion_metadata" not in stored and "ingestion_source" in stored
+
+    imminent = read_dataset(root, columns=["catalog_id", "score"], filters=[("eligibility_window", "=", "Imminent")])
+    assert list(imminent.columns) == ["catalog_id", "score"]
+    assert set(imminent["catalog_id"]) == set(adf.loc[adf.eligibility_window == "Imminent", "catalog_id"])
+
+
+def test_canonicalize_normalizes_columns_and_shares_one_batch():
+    raw = pd.DataFrame({
+        "catalog_id": [" cat-1", "CAT-2 "],
+        "artist_name": ["  A ", None],
+        "track_title": ["T", "U"],
+        "release_year": ["1990", "n/a"],
+        "rights_holder": ["BigLabel ", "BigLabel"],
+        "territory": ["us", " US"],
+        "ownership_notes": [" reverted ", None],
+    })
+    c = canonicalize(raw, source="feed", loaded_at="2025-01-02T03:04:05", batch_id="b1")
+    assert c["catalog_id"].tolist() == ["CAT-1", "CAT-2"]
+    assert c["artist_name"].iloc[0] == "A" and pd.isna(c["artist_name"].iloc[1])
+    assert list(c["territory"].cat.categories) == ["US"] and list(c["rights_holder"].cat.categories) == ["BigLabel"]
+    assert c["release_year"].iloc[0] == 1990 and pd.isna(c["release_year"].iloc[1])
+    assert c.attrs["ingestion"] == {"batch_id": "b1", "source": "feed", "loaded_at": "2025-01-02T03:04:05"}
+    assert all(len(c[col].cat.categories) == 1 for col in ("ingestion_batch", "ingestion_source", "ingestion_loaded_at"))
+    assert raw["catalog_id"].iloc[0] == " cat-1"
+    # the content hash is of the input as given
+    assert (c["row_hash"].to_numpy() == canonicalize(raw)["row_hash"].to_numpy()).all()
+
+    stored = to_storage_frame(c)
+    assert stored["ingestion_loaded_at"].iloc[0] == pd.Timestamp("2025-01-02T03:04:05")
+
+
+def test_canonicalize_all_null_categorical_columns(tmp_path):
+    raw = pd.read_csv(SAMPLE).assign(territory=None, rights_holder=float("nan"))
+    c = canonicalize(raw)
+    assert c["territory"].isna().all() and len(c["territory"].cat.categories) == 0
+    assert c["rights_holder"].isna().all()
+
+    csv_path = tmp_path / "feed.csv"
+    raw.to_csv(csv_path, index=False)
+    raw.iloc[:2].to_csv(csv_path, index=False)
+    pd.read_csv(SAMPLE).iloc[2:].to_csv(csv_path, mode="a", header=False, index=False)
+    windows = load_windows("configs/eligibility_windows.yml")
+    with ParquetChunkWriter("catalogs", path=str(tmp_path)) as writer:
+        for chunk in iter_csv_chunks(str(csv_path), 2):
+            writer.write(annotate_frame(canonicalize(chunk), windows, current_year=2025))
+    stored = read_parquet(writer.path)
+    assert stored["territory"].isna().sum() == 2 and (stored["territory"].iloc[2:] == "US").all()
+
+
+def test_incremental_ingest_compares_normalized_ids(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+    csv_path = tmp_path / "feed.csv"
+    df = pd.read_csv(SAMPLE)
+    df["catalog_id"] = " " + df["catalog_id"].str.lower()
+    df.to_csv(csv_path, index=False)
+
+    incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    again = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert again["counts"] == {"added": 0, "changed": 0, "removed": 0, "unchanged": 5}
+    assert load_note_index("canonical_catalogs", path=str(tmp_path)).vector("CAT-001") is not None
+
+    pd.concat([df, df.iloc[:1].assign(catalog_id="CAT-001")]).to_csv(csv_path, index=False)
+    with pytest.raises(ValueError):
+        incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+
+
+def test_row_hash_covers_every_input_column(tmp_path):
+    windows = load_windows("configs/eligibility_windows.yml")
+    csv_path = tmp_path / "feed.csv"
+    df = pd.read_csv(SAMPLE).assign(label_code=["L1", "L2", "L3", "L4", "L5"])
+    df.to_csv(csv_path, index=False)
+    incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+
+    df.loc[df.catalog_id == "CAT-003", "label_code"] = "L9"
+    df[df.columns[::-1]].to_csv(csv_path, index=False)
+    again = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert again["changed"] == ["CAT-003"] and again["counts"]["unchanged"] == 4
+
+    # ingestion and annotation columns are not content
+    raw = load_csv(str(csv_path))
+    annotated = annotate_frame(canonicalize(raw), windows, current_year=2025)
+    assert (row_hashes(annotated) == row_hashes(raw)).all()
+
+
+def test_incremental_ingest_compacts_many_files(tmp_path, monkeypatch):
+    from catalogwatch.ingest import incremental
+
+    windows = load_windows("configs/eligibility_windows.yml")
+    csv_path = tmp_path / "feed.csv"
+    df = pd.read_csv(SAMPLE)
+    df.to_csv(csv_path, index=False)
+    incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+
+    monkeypatch.setattr(incremental, "COMPACT_FILES", 2)
+    df.loc[df.catalog_id == "CAT-003", "track_title"] = "Song C (Remaster)"
+    df.to_csv(csv_path, index=False)
+    again = incremental_ingest(str(csv_path), windows, path=str(tmp_path), current_year=2025)
+    assert again["changed"] == ["CAT-003"] and again["full_rewrite"]
+    stored = read_dataset(str(tmp_path / "canonical_catalogs"))
+    assert sorted(stored["catalog_id"]) == df["catalog_id"].tolist()
+    assert stored.set_index("catalog_id").loc["CAT-003", "track_title"] == "Song C (Remaster)"
@@ -1,4 +1,6 @@
-from catalogwatch.nlp.parser import parse_ownership_notes
+import pandas as pd
+
+from catalogwatch.nlp.parser import KEYWORDS, parse_ownership_notes, parse_ownership_notes_batch
 
 
 def test_parse_basic_signals():
@@ -8,3 +10,170 @@ def test_parse_basic_signals():
     assert parsed["signals"]["exclusive_license"]
     assert parsed["signals"]["ambiguous"]
     assert parsed["confidence"] > 0
+
+
+def _legacy_parse(text):
+    import re
+    signals, evidence = {}, []
+    for signal, patterns in KEYWORDS.items():
+        matches = [p for p in dict.fromkeys(patterns) if re.search(p, text, flags=re.IGNORECASE)]
+        signals[signal] = bool(matches)
+        evidence.extend(matches)
+    return signals, evidence
+
+
+def test_matcher_matches_per_pattern_search():
+    notes = [
+        "Reverted to artist; exclusive license in place; ambiguous legacy contract",
+        "Artist-owned masters; self-released on indie label",
+        "SOLE LICENSE granted, rights unclear",
+        "nothing relevant here",
+        "Self released; artist owned; exclusive rights reverted",
+        "Café masters: ſelf-released, EXCLUSIVE — ownership unclear",
+    ]
+    for text in notes:
+        parsed = parse_ownership_notes(text)
+        assert (parsed["signals"], parsed["evidence"]) == _legacy_parse(text)
+
+    batch = parse_ownership_notes_batch(pd.Series(notes + [None]), evidence=True)
+    for i, text in enumerate(notes):
+        assert batch.loc[i, list(KEYWORDS)].to_dict() == parse_ownership_notes(text)["signals"]
+    assert not batch.loc[len(notes), list(KEYWORDS)].any()
+    assert ("artist_owned", "artist-owned masters", 0, 20) in batch.loc[1, "evidence_spans"]
+
+
+def test_batch_parse_dedups_notes_and_uses_cache(tmp_path):
+    from catalogwatch.nlp.cache import NoteCache, keywords_version
+
+    notes = pd.Series(["Reverted to artist", "  REVERTED to artist ", None, "exclusive license", "Reverted to artist", ""])
+    expected = [parse_ownership_notes(n)["signals"] for n in notes]
+
+    cache = NoteCache(keywords_version(KEYWORDS), max_entries=2)
+    out = parse_ownership_notes_batch(notes, cache=cache)
+    assert out[list(KEYWORDS)].to_dict("records") == [e or dict.fromkeys(KEYWORDS, False) for e in expected]
+    assert out.attrs["note_stats"] == {"requested": 6, "unique": 3, "cache_hits": 0, "computed": 3}
+    assert len(cache) == 2  # the least recently used note is evicted
+
+    again = parse_ownership_notes_batch(notes, cache=cache)
+    assert again.attrs["note_stats"]["cache_hits"] == 2
+    assert again.equals(out)
+
+    path = cache.save(str(tmp_path / "note_cache.npz"))
+    assert NoteCache(cache.version).load(path) == 2
+    changed = dict(KEYWORDS, reversion=["revert"])
+    assert NoteCache(keywords_version(changed)).load(path) == 0
+
+
+def test_embedder_dedups_batches_and_caches(tmp_path):
+    import numpy as np
+    from catalogwatch.nlp.embeddings import Embedder, HashingBackend
+
+    texts = ["Reverted to artist", "reverted  to ARTIST", None, "Exclusive license", "Reverted to artist"]
+    embedder = Embedder(HashingBackend(dim=64), cache_dir=str(tmp_path), batch_size=1)
+    vectors = embedder.embed(texts)
+    assert vectors.shape == (5, 64) and vectors.dtype == np.float32
+    assert np.array_equal(vectors[0], vectors[1]) and np.array_equal(vectors[0], vectors[4])
+    assert not vectors[2].any()
+    assert np.isclose(np.linalg.norm(vectors[3]), 1.0)
+    assert embedder.stats["computed"] == 3
+
+    reopened = Embedder(HashingBackend(dim=64), cache_dir=str(tmp_path))
+    again = reopened.embed(texts)
+    assert reopened.stats == {"requested": 5, "unique": 3, "cache_hits": 3, "computed": 0}
+    assert isinstance(reopened.cache.vectors, np.memmap)
+    assert np.array_equal(again, vectors)
+
+
+def test_ivf_index_matches_brute_force_and_round_trips(tmp_path):
+    import numpy as np
+    from catalogwatch.nlp.ann import IVFIndex
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    ids = [f"CAT-{i:04d}" for i in range(500)]
+    index = IVFIndex(16, n_lists=8, nprobe=8)
+    index.add(ids[:300], vectors[:300])
+    index.add(ids[300:], vectors[300:])
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = np.argsort(-(unit @ unit[7]))[1:6]
+    hits = index.top_k_similar("CAT-0007", k=5)
+    assert [h[0] for h in hits] == [ids[i] for i in exact]
+    assert np.isclose(hits[0][1], unit[exact[0]] @ unit[7])
+
+    assert index.remove(["CAT-0007", "missing"]) == 1
+    index.add(["CAT-0001"], vectors[2:3])
+    assert len(index) == 499
+    assert index.top_k_similar("CAT-0001", k=1)[0][0] == "CAT-0002"
+
+    loaded = IVFIndex.load(index.save(str(tmp_path / "idx")))
+    assert isinstance(loaded.vectors, np.memmap) and len(loaded) == 499
+    assert loaded.top_k_similar("CAT-0010", k=5, nprobe=2) == index.top_k_similar("CAT-0010", k=5, nprobe=2)
+    loaded.add(["CAT-9999"], vectors[10:11])
+    loaded.save(str(tmp_path / "idx"))
+    assert IVFIndex.load(str(tmp_path / "idx")).top_k_similar("CAT-9999", k=1)[0][0] == "CAT-0010"
+
+
+def test_default_embedder_and_shared_vector_cache(tmp_path):
+    import numpy as np
+    import pytest
+    from catalogwatch.nlp.embeddings import EmbeddingBackend, batch_text_to_vectors, embedding_cache_dir, get_embedder
+    from catalogwatch.nlp.vector_cache import VectorCache
+
+    with pytest.raises(TypeError):
+        EmbeddingBackend()
+
+    cache_dir = embedding_cache_dir(str(tmp_path))
+    first = batch_text_to_vectors(["reverted", "licensed"], dim=32, cache_dir=cache_dir)
+    embedder = get_embedder(32, cache_dir)
+    assert embedder is get_embedder(32, str(tmp_path / "embeddings"))
+    assert len(embedder.cache) == 2
+    assert np.array_equal(batch_text_to_vectors(["licensed"], dim=32, cache_dir=cache_dir)[0], first[1])
+    assert embedder.stats["cache_hits"] == 1
+
+    # two writers on one directory, e.g. ingest and a dashboard process
+    a = VectorCache(str(tmp_path / "shared"), 4, "t")
+    b = VectorCache(str(tmp_path / "shared"), 4, "t")
+    a.add([1, 2], np.ones((2, 4), dtype=np.float32))
+    b.add([2, 3], np.full((2, 4), 3, dtype=np.float32))
+    a.add([4], np.full((1, 4), 4, dtype=np.float32))
+    reopened = VectorCache(str(tmp_path / "shared"), 4, "t")
+    for cache in (a, reopened):
+        rows = cache.lookup([1, 2, 3, 4])
+        assert cache.vectors[rows][:, 0].tolist() == [1, 1, 3, 4]
+    # b picks up other writers' rows on its next append
+    assert b.lookup([4]).tolist() == [-1]
+    b.add([5], np.full((1, 4), 5, dtype=np.float32))
+    assert b.vectors[b.lookup([1, 2, 3, 4, 5])][:, 0].tolist() == [1, 1, 3, 4, 5]
+
+
+def test_ivf_index_retrains_as_it_grows(tmp_path):
+    import numpy as np
+    from catalogwatch.nlp.ann import IVFIndex
+
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    ids = [f"CAT-{i:04d}" for i in range(2000)]
+    index = IVFIndex(16, nprobe=4)
+    index.add(ids[:5], vectors[:5])
+    assert len(index) == 5 and index.n_lists == 2
+    for start in range(5, 2000, 400):
+        # persisted between runs, as incremental ingest does
+        index = IVFIndex.load(index.save(str(tmp_path / "idx")))
+        index.add(ids[start:start + 400], vectors[start:start + 400])
+    assert len(index) == 2000
+    assert index.n_lists >= 30 and index.trained_rows >= 1000
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    recall = np.mean([
+        len({h for h, _ in index.top_k_similar(ids[q], k=5, nprobe=8)}
+            & {ids[i] for i in np.argsort(-(unit @ unit[q]))[1:6]}) / 5
+        for q in range(0, 2000, 40)
+    ])
+    assert recall >= 0.6
+
+    fixed = IVFIndex(16, n_lists=4)
+    fixed.add(ids[:3], vectors[:3])
+    fixed.add(ids[3:100], vectors[3:100])
+    assert len(fixed) == 100 and fixed.n_lists == 4
+    assert IVFIndex.load(fixed.save(str(tmp_path / "fixed"))).requested_lists == 4
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from catalogwatch.ingest.csv_loader import load_csv, canonicalize
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.eligibility.rules import explain_classification
+from catalogwatch.nlp.parser import parse_ownership_notes
+from catalogwatch.modeling.features import feature_from_record
+from catalogwatch.modeling.scoring import simple_score
+from catalogwatch.modeling.explainability import compute_contributions
+from catalogwatch.pipeline import annotate_frame, signals_from_row, contributions_from_row
+
+
+def test_annotate_frame_matches_per_row_path():
+    windows = load_windows("configs/eligibility_windows.yml")
+    df = canonicalize(load_csv("data/samples/sample_catalogs.csv"))
+    # add rows with a missing year and a missing note
+    extra = pd.DataFrame([
+        {"catalog_id": "CAT-X1", "release_year": None, "ownership_notes": "unclear reversion"},
+        {"catalog_id": "CAT-X2", "release_year": 1970, "ownership_notes": None},
+    ])
+    df = pd.concat([df, canonicalize(extra)], ignore_index=True)
+
+    adf = annotate_frame(df, windows, current_year=2025)
+
+    for _, row in adf.iterrows():
+        year = int(row.release_year) if pd.notna(row.release_year) else None
+        expl = explain_classification(year, 2025, windows)
+        nlp = parse_ownership_notes(row.ownership_notes)
+        feats = feature_from_record({**expl, "ownership_signals": nlp["signals"]})
+
+        assert row.eligibility_window == expl["eligibility_window"]
+        assert signals_from_row(row) == {k: nlp["signals"].get(k, False) for k in signals_from_row(row)}
+        assert abs(row.ownership_confidence - nlp["confidence"]) < 1e-9
+        assert abs(row.score - simple_score(feats)) < 1e-9
+        expected = compute_contributions(feats)
+        for key, value in contributions_from_row(row).items():
+            assert abs(value - expected[key]) < 1e-9
+
+
+def test_profiler_records_pipeline_stages(tmp_path):
+    import json
+    from catalogwatch.services.instrumentation import Profiler, get_profiler, profiling, stage
+
+    windows = load_windows("configs/eligibility_windows.yml")
+    assert not get_profiler().enabled
+    with stage("ignored") as st:
+        st.add_rows(1)
+
+    with profiling(Profiler(sample_interval=0.001, log=False)) as prof:
+        annotate_frame(canonicalize(load_csv("data/samples/sample_catalogs.csv")), windows, current_year=2025)
+    assert not get_profiler().enabled
+
+    totals = {t["stage"]: t for t in prof.totals()}
+    assert list(totals) == ["load", "canonicalize", "classify", "nlp", "featurize", "score"]
+    assert all(t["rows"] == 5 and t["peak_rss_mb"] > 0 for t in totals.values())
+    assert "classify" in prof.summary()
+    prof.write_json(str(tmp_path / "profile.json"))
+    assert len(json.loads((tmp_path / "profile.json").read_text())["stages"]) == 6
+
+
+def test_worker_processes_do_not_profile(tmp_path):
+    import logging
+    from catalogwatch.pipeline import annotate_chunks
+    from catalogwatch.services.instrumentation import Profiler, logger, profiling
+
+    windows = load_windows("configs/eligibility_windows.yml")
+    raw = load_csv("data/samples/sample_catalogs.csv")
+    # forked workers inherit this handler, so any stage they log lands in the file
+    handler = logging.FileHandler(tmp_path / "stages.log")
+    logger.addHandler(handler)
+    try:
+        with profiling(Profiler(sample_interval=0)) as prof:
+            frames = list(annotate_chunks([raw.iloc[:2], raw.iloc[2:]], windows, workers=2, current_year=2025))
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    assert sum(len(f) for f in frames) == 5
+    assert prof.records == []
+    assert (tmp_path / "stages.log").read_text() == ""
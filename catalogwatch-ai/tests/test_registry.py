@@ -0,0 +1,112 @@
+import os
+import shutil
+
+import pytest
+
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.registry import ConfigError, ConfigRegistry
+
+
+def _registry(tmp_path):
+    for name in ("eligibility_windows.yml", "keywords.yml", "scoring.yml"):
+        shutil.copy(os.path.join("configs", name), tmp_path / name)
+    return ConfigRegistry(
+        windows_path=str(tmp_path / "eligibility_windows.yml"),
+        keywords_path=str(tmp_path / "keywords.yml"),
+        scoring_path=str(tmp_path / "scoring.yml"),
+        poll_interval=0,
+    )
+
+
+def _edit(path, old, new):
+    text = path.read_text().replace(old, new)
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_registry_reuses_snapshot_until_files_change(tmp_path):
+    registry = _registry(tmp_path)
+    rules = registry.current()
+    assert registry.current() is rules
+    assert not rules.matcher.match("masters recaptured")["signals"]["reversion"]
+
+    _edit(tmp_path / "keywords.yml", "    - reverted\n", "    - reverted\n    - recaptured\n")
+    reloaded = registry.current()
+    assert reloaded.version != rules.version and reloaded.keywords_version != rules.keywords_version
+    assert reloaded.matcher.match("masters recaptured")["signals"]["reversion"]
+    assert reloaded.engine is not rules.engine
+
+    _edit(tmp_path / "scoring.yml", "eligibility: 0.6", "eligibility: 0.5")
+    weighted = registry.current()
+    assert weighted.engine.weights[0] == 0.5 and weighted.matcher is not rules.matcher
+
+
+def test_registry_keeps_last_valid_snapshot(tmp_path):
+    registry = _registry(tmp_path)
+    rules = registry.current()
+
+    _edit(tmp_path / "eligibility_windows.yml", "max_years: 30", "max_years: 29")
+    assert registry.current() is rules
+    assert "Gap between windows" in registry.last_error
+
+    _edit(tmp_path / "eligibility_windows.yml", "max_years: 29", "max_years: 30")
+    assert registry.current() is rules and registry.last_error is None
+
+    _edit(tmp_path / "keywords.yml", "  ambiguous:", "  unclear:")
+    with pytest.raises(ConfigError, match="must define exactly"):
+        ConfigRegistry(keywords_path=str(tmp_path / "keywords.yml")).current()
+
+
+def test_load_windows_is_validated_and_cached(tmp_path):
+    path = tmp_path / "windows.yml"
+    shutil.copy(os.path.join("configs", "eligibility_windows.yml"), path)
+    windows = load_windows(str(path))
+    assert load_windows(str(path)) is windows
+    assert [w["name"] for w in windows["windows"]][0] == "Not Eligible"
+
+    _edit(path, "name: Imminent", "name: Unknown")
+    with pytest.raises(ConfigError, match="reserved"):
+        load_windows(str(path))
+
+
+def test_chunked_run_keeps_one_snapshot(tmp_path):
+    import pandas as pd
+
+    from catalogwatch.pipeline import annotate_chunks
+    from catalogwatch.registry import set_registry
+
+    registry = _registry(tmp_path)
+    windows = load_windows("configs/eligibility_windows.yml")
+    raw = pd.DataFrame({
+        "catalog_id": ["A", "B"],
+        "artist_name": "x",
+        "track_title": "y",
+        "release_year": 1990,
+        "rights_holder": "r",
+        "territory": "US",
+        "ownership_notes": "masters recaptured",
+    })
+    previous = set_registry(registry)
+    try:
+        chunks = annotate_chunks([raw.iloc[:1], raw.iloc[1:]], windows, current_year=2025)
+        first = next(chunks)
+        _edit(tmp_path / "keywords.yml", "    - reverted\n", "    - reverted\n    - recaptured\n")
+        assert registry.current().matcher.match("masters recaptured")["signals"]["reversion"]
+        second = next(chunks)
+    finally:
+        set_registry(previous)
+    assert not first["signal_reversion"].any() and not second["signal_reversion"].any()
+
+
+def test_parser_import_does_not_read_configs(tmp_path):
+    import subprocess
+    import sys
+
+    code = (
+        "import catalogwatch.pipeline, catalogwatch.nlp.parser as parser, catalogwatch.registry as registry;"
+        "assert registry._active is None;"
+        "assert set(parser.KEYWORDS) == set(registry.SIGNALS)"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.abspath("src"))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env, cwd=tmp_path)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from catalogwatch.modeling.scoring import NNScorer, simple_score_batch
+
+
+def test_nn_scorer_learns_simple_score_and_round_trips(tmp_path):
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(-1, 70, 3000), rng.random((3000, 4)) < 0.3]).astype(float)
+    y = simple_score_batch(X)
+
+    model = NNScorer(hidden=16, max_epochs=60, patience=5).fit(X, y)
+    pred = model.predict(X)
+    assert isinstance(pred, np.ndarray) and pred.shape == (3000,)
+    assert np.abs(pred - y).mean() < 0.05
+    assert len(model.history["val_loss"]) <= 60
+
+    loaded = NNScorer.load(model.save(str(tmp_path / "model")))
+    assert np.allclose(loaded.predict(X[:10], block_size=3), pred[:10])
+    with pytest.raises(ValueError):
+        NNScorer().save(str(tmp_path / "untrained"))
+
+
+def test_nn_scorer_rejects_non_finite_targets_and_keeps_weights_without_epochs():
+    X = np.array([[30, 1, 0, 0, 0], [5, 0, 1, 0, 1], [45, 0, 0, 1, 0]], dtype=float)
+    y = simple_score_batch(X)
+    with pytest.raises(ValueError):
+        NNScorer().fit(X, np.array([0.5, np.nan, 0.2]))
+
+    model = NNScorer(max_epochs=0).fit(X, y)
+    assert model.is_trained and model.history["val_loss"] == []
+    assert np.isfinite(model.predict(X)).all()
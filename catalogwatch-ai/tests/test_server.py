@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from catalogwatch.eligibility.config import load_windows
+from catalogwatch.services.server import CatalogService, make_server
+from catalogwatch.services.store import read_dataset
+
+
+SAMPLE = "data/samples/sample_catalogs.csv"
+
+
+@pytest.fixture
+def server(tmp_path):
+    service = CatalogService(load_windows("configs/eligibility_windows.yml"), data_dir=str(tmp_path))
+    httpd = make_server(service, port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def _request(url, data=None, content_type="application/json"):
+    if data is not None and not isinstance(data, bytes):
+        data = json.dumps(data).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+def _wait(url, job_id):
+    for _ in range(200):
+        _, job = _request(f"{url}/jobs/{job_id}")
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_score_endpoint(server):
+    status, out = _request(f"{server}/score", {"catalog_id": "X", "release_year": 1980, "ownership_notes": "reverted; disputed"})
+    assert status == 200
+    assert out["ownership_signals"]["reversion"] and out["ownership_signals"]["ambiguous"]
+    assert 0.0 <= out["score"] <= 1.0 and "eligibility_contribution" in out["contributions"]
+
+    _, many = _request(f"{server}/score", [{"release_year": None}, {"release_year": "2001"}])
+    assert many[0]["years_since_release"] is None and len(many) == 2
+
+    years = [True, 1990.7, "1990.5", 1990.0, "1990"]
+    _, many = _request(f"{server}/score", [{"release_year": y} for y in years])
+    assert [out["eligibility_window"] == "Unknown" for out in many] == [True, True, True, False, False]
+    assert many[3]["years_since_release"] == many[4]["years_since_release"]
+
+
+def test_ingest_jobs_from_path_and_upload(server, tmp_path):
+    status, job = _request(f"{server}/ingest", {"path": SAMPLE, "name": "from_path"})
+    assert status == 202 and job["status"] in ("queued", "running", "done")
+    assert _wait(server, job["id"])["result"]["rows"] == 5
+
+    with open(SAMPLE, "rb") as fh:
+        _, job = _request(f"{server}/ingest?name=uploaded", fh.read(), content_type="text/csv")
+    assert _wait(server, job["id"])["status"] == "done"
+    assert len(read_dataset(str(tmp_path / "uploaded"))) == 5
+    assert (tmp_path / "uploaded.ann").is_dir()
+
+    _, job = _request(f"{server}/ingest", {"path": "missing.csv"})
+    assert "FileNotFoundError" in _wait(server, job["id"])["error"]
+    with open(SAMPLE, "rb") as fh:
+        header = fh.readline()
+    _, job = _request(f"{server}/ingest?name=uploaded", header, content_type="text/csv")
+    assert "no data rows" in _wait(server, job["id"])["error"]
+    assert len(read_dataset(str(tmp_path / "uploaded"))) == 5 and (tmp_path / "uploaded.ann").is_dir()
+    _, jobs = _request(f"{server}/jobs")
+    assert len(jobs) == 4
+
+
+def test_ingest_rejects_names_outside_data_dir(server, tmp_path):
+    victim = tmp_path.parent / f"{tmp_path.name}-victim"
+    victim.mkdir()
+    (victim / "keep.txt").write_text("x")
+    for name in ["../" + victim.name, "a/b", "", ".."]:
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _request(f"{server}/ingest", {"path": SAMPLE, "name": name})
+        assert err.value.code == 400
+    with open(SAMPLE, "rb") as fh:
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _request(f"{server}/ingest?name=..%2F{victim.name}", fh.read(), content_type="text/csv")
+    assert err.value.code == 400
+    assert (victim / "keep.txt").read_text() == "x"
+    _, jobs = _request(f"{server}/jobs")
+    assert jobs == []
+
+
+def test_job_table_is_bounded(tmp_path, monkeypatch):
+    import catalogwatch.services.server as server_mod
+
+    monkeypatch.setattr(server_mod, "MAX_JOBS", 3)
+    service = CatalogService(load_windows("configs/eligibility_windows.yml"), data_dir=str(tmp_path), workers=1)
+    ids = [service.submit("missing.csv", "ds", label="missing.csv")["id"] for _ in range(5)]
+    service.shutdown()
+    assert list(service.jobs) == ids[-3:]
+    assert all(job["status"] == "failed" for job in service.list_jobs())